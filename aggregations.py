@@ -0,0 +1,230 @@
+"""
+Declarative aggregation engine for the analytics dashboards.
+
+A report is declared as a ``Query`` (metric, group keys, time bucket,
+aggregation and equality filters) and answered by ``AggregationEngine``.
+Results are memoized by (source, data version, query).  Every query is
+derived from a cached *daily base* — sum + row count of the metric per
+group keys per day — so a new dashboard over the same rows reuses the
+daily sums instead of rescanning the raw sheet.
+"""
+import threading
+from dataclasses import dataclass
+
+import pandas as pd
+
+# Columns derived from the day of each row; filters on these are applied
+# to the daily base, so "current month" queries reuse the all-time base.
+DATE_KEYS = ("date_only", "year", "month", "week")
+
+BUCKETS = {
+    None: [],
+    "day": ["date_only"],
+    "week": ["year", "week"],
+    "month": ["year", "month"],
+    "year": ["year"],
+}
+
+AGGS = ("sum", "mean", "count", "daily_mean")
+
+
+@dataclass(frozen=True)
+class Query:
+    metric: str
+    group_by: tuple = ()
+    bucket: str = None
+    agg: str = "sum"
+    where: tuple = ()       # ((column, value), ...) — equality filters
+
+    def __post_init__(self):
+        if self.bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {self.bucket!r}")
+        if self.agg not in AGGS:
+            raise ValueError(f"Unknown aggregation: {self.agg!r}")
+
+
+def frame_version(df):
+    """Cheap content fingerprint, used when the caller has no better version."""
+    if df.empty:
+        return (0, 0)
+    return (len(df), int(pd.util.hash_pandas_object(df, index=False).sum()))
+
+
+def _add_date_keys(frame, day_col):
+    days = frame[day_col]
+    return frame.assign(
+        year=days.dt.year,
+        month=days.dt.month,
+        week=days.dt.isocalendar().week.astype(int),
+    )
+
+
+class AggregationEngine:
+
+    def __init__(self):
+        self._sources = {}      # name -> (version, prepared frame)
+        self._bases = {}        # (name, version, metric, keys, row_where) -> daily base
+        self._results = {}      # (name, version, query) -> result frame
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Sources
+    # -------------------------------------------------
+    def register(self, name, df, date_col, version=None):
+        """Register (or refresh) a typed frame; returns the version in use."""
+        if version is None:
+            version = frame_version(df)
+
+        with self._lock:
+            current = self._sources.get(name)
+            if current is not None and current[0] == version:
+                return version
+
+            prepared = df.assign(_day=df[date_col].dt.normalize())
+            self._sources[name] = (version, prepared)
+
+            # Drop memoized work for older versions of this source
+            self._bases = {k: v for k, v in self._bases.items() if k[0] != name}
+            self._results = {k: v for k, v in self._results.items() if k[0] != name}
+
+        return version
+
+    def __contains__(self, name):
+        return name in self._sources
+
+    def version(self, name):
+        return self._sources[name][0]
+
+    def frame(self, name):
+        return self._sources[name][1]
+
+    # -------------------------------------------------
+    # Persistence (nightly snapshots)
+    # -------------------------------------------------
+    def export_state(self):
+        """Picklable copy of every source, daily base and memoized result."""
+        with self._lock:
+            return {
+                "sources": dict(self._sources),
+                "bases": dict(self._bases),
+                "results": dict(self._results),
+            }
+
+    def restore_state(self, state):
+        """Seed the memo from ``export_state``; live sources are kept."""
+        with self._lock:
+            for name, source in state["sources"].items():
+                self._sources.setdefault(name, source)
+
+            live = {name: source[0] for name, source in self._sources.items()}
+
+            for store, saved in (
+                (self._bases, state["bases"]),
+                (self._results, state["results"]),
+            ):
+                for key, value in saved.items():
+                    if live.get(key[0]) == key[1]:
+                        store.setdefault(key, value)
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def run(self, name, query):
+        version, _ = self._sources[name]
+        key = (name, version, query)
+
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached.copy()
+
+        result = self._compute(name, version, query)
+
+        with self._lock:
+            if self._sources.get(name, (None,))[0] == version:
+                self._results[key] = result
+
+        return result.copy()
+
+    def scalar(self, name, query):
+        """Single value of an ungrouped, unbucketed query (0.0 when empty)."""
+        result = self.run(name, query)
+        return float(result[query.metric].sum()) if not result.empty else 0.0
+
+    def _compute(self, name, version, query):
+        date_where = tuple((c, v) for c, v in query.where if c in DATE_KEYS)
+        row_where = tuple((c, v) for c, v in query.where if c not in DATE_KEYS)
+
+        keys = list(query.group_by)
+        base = self._daily_base(name, version, query.metric, tuple(keys), row_where)
+
+        for col, value in date_where:
+            base = base[base[col] == value]
+
+        out_keys = keys + BUCKETS[query.bucket]
+        metric = query.metric
+
+        if query.agg == "daily_mean":
+            # Base is already one row per keys + day → mean of daily sums
+            if out_keys:
+                result = (
+                    base.groupby(out_keys, as_index=False, observed=True)["_sum"]
+                    .mean()
+                    .rename(columns={"_sum": metric})
+                )
+            else:
+                result = pd.DataFrame({metric: [base["_sum"].mean()]})
+        else:
+            if out_keys:
+                result = (
+                    base.groupby(out_keys, as_index=False, observed=True)[["_sum", "_count"]]
+                    .sum()
+                )
+            else:
+                result = pd.DataFrame({
+                    "_sum": [base["_sum"].sum()],
+                    "_count": [base["_count"].sum()],
+                })
+
+            if query.agg == "sum":
+                result[metric] = result["_sum"]
+            elif query.agg == "count":
+                result[metric] = result["_count"]
+            else:  # mean
+                result[metric] = result["_sum"] / result["_count"]
+
+            result = result.drop(columns=["_sum", "_count"])
+
+        if "date_only" in result.columns:
+            result["date_only"] = result["date_only"].dt.date
+
+        if query.bucket is not None:
+            result = result.sort_values(BUCKETS[query.bucket], ascending=False)
+        else:
+            result = result.sort_values(metric, ascending=False)
+
+        return result.reset_index(drop=True)
+
+    def _daily_base(self, name, version, metric, keys, row_where):
+        key = (name, version, metric, keys, row_where)
+
+        cached = self._bases.get(key)
+        if cached is not None:
+            return cached
+
+        frame = self._sources[name][1]
+        for col, value in row_where:
+            frame = frame[frame[col] == value]
+
+        base = (
+            frame
+            .groupby(list(keys) + ["_day"], as_index=False, observed=True)[metric]
+            .agg(_sum="sum", _count="count")
+            .rename(columns={"_day": "date_only"})
+        )
+        base = _add_date_keys(base, "date_only")
+
+        with self._lock:
+            if self._sources.get(name, (None,))[0] == version:
+                self._bases[key] = base
+
+        return base
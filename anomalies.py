@@ -0,0 +1,207 @@
+"""
+Write-time anomaly checks for expense entries.
+
+Keeps a running count / mean / variance (Welford) of log10(amount) per
+category and per category + sub-category, so each new entry is scored
+in O(1) before it is saved — no history scan.  On the log scale an extra
+zero is the same distance from normal whether the category is Milk or
+Rent.
+
+``ExpenseMonitor.sync`` follows the cached Sheet1 frame with the same
+``incremental.FrameCursor`` as ``RollingStats``: appended rows are
+folded in one by one, anything else rebuilds once with a groupby.  Rows saved through the
+entry form are added at once and skipped when the refetched sheet
+brings them back.
+"""
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from incremental import FrameCursor
+
+# Entries a category / sub-category needs before it can flag anything
+MIN_HISTORY = 8
+
+# Flag beyond this many standard deviations (log scale) ...
+Z_LIMIT = 3.0
+
+# ... and only when at least this many times off the typical amount
+MIN_RATIO = 3.0
+
+# Sheet1 leaves sub-category blank for these (see frames.expense_frame)
+DEFAULT_SUB_CATEGORY = "Miscellaneous Expenses"
+
+ROW_COLS = ["Date & Time", "Category", "Sub-Category", "Expense Amount"]
+
+
+def _sub_key(sub):
+    return (str(sub or "").strip() or DEFAULT_SUB_CATEGORY).lower()
+
+
+class RunningStats:
+    """Welford running mean / variance of log10 amounts."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def sd(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+@dataclass(frozen=True)
+class Flag:
+    row: int            # position in the checked rows
+    key: str            # "Gas" or "Gas · Cylinder"
+    amount: float
+    typical: float      # geometric mean of past entries
+    low: float          # usual range (±Z_LIMIT sd on the log scale)
+    high: float
+    history: int
+
+    @property
+    def message(self):
+        direction = "higher" if self.amount > self.typical else "lower"
+        return (
+            f"{self.key}: ₹ {self.amount:,.0f} is {direction} than usual "
+            f"(typically ₹ {self.typical:,.0f}, range ₹ {self.low:,.0f} – "
+            f"₹ {self.high:,.0f} over {self.history:,} entries)"
+        )
+
+
+class ExpenseMonitor:
+
+    def __init__(self):
+        self._stats = {}                # (category,) / (category, sub) -> RunningStats
+        self._unconfirmed = Counter()   # rows added by ``add_rows``, not yet synced
+        self._cursor = FrameCursor(ROW_COLS)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(when, category, sub, amount):
+        return (str(when), str(category), _sub_key(sub), round(float(amount), 2))
+
+    # -------------------------------------------------
+    # Updates
+    # -------------------------------------------------
+    def _add(self, category, sub, amount):
+        if not amount or amount <= 0:
+            return
+        x = math.log10(amount)
+        for key in ((category,), (category, _sub_key(sub))):
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = RunningStats()
+            stats.add(x)
+
+    def add_rows(self, rows):
+        """Fold in Sheet1 rows just saved (header order) — O(1) per row."""
+        with self._lock:
+            for when, category, sub, amount, *_ in rows:
+                self._add(str(category), sub, float(amount))
+                self._unconfirmed[self._fingerprint(when, category, sub, amount)] += 1
+
+    def sync(self, frame, version):
+        """Bring the statistics up to the cached Sheet1 ``frame``."""
+        with self._lock:
+            pending = self._cursor.pending(frame, version)
+            if pending is None:
+                return
+
+            rows, appended = pending
+            if appended:
+                self._apply(rows)
+            else:
+                self._rebuild(frame)
+
+            self._cursor.advance(frame, version)
+
+    def _apply(self, rows):
+        for when, category, sub, amount in rows[ROW_COLS].itertuples(index=False):
+            fingerprint = self._fingerprint(when, category, sub, amount)
+            if self._unconfirmed[fingerprint] > 0:
+                self._unconfirmed[fingerprint] -= 1     # already added at save time
+                continue
+            self._add(str(category), sub, float(amount))
+
+    def _rebuild(self, frame):
+        self._stats = {}
+        self._unconfirmed.clear()
+        if frame.empty:
+            return
+
+        df = frame[frame["Expense Amount"] > 0]
+        df = pd.DataFrame({
+            "category": df["Category"].astype(str),
+            "sub": df["Sub-Category"].map(_sub_key),
+            "x": np.log10(df["Expense Amount"].astype(float)),
+        })
+
+        for keys in (["category"], ["category", "sub"]):
+            grouped = df.groupby(keys)["x"].agg(["count", "mean", "var"])
+            for key, r in grouped.iterrows():
+                key = key if isinstance(key, tuple) else (key,)
+                m2 = 0.0 if pd.isna(r["var"]) else r["var"] * (r["count"] - 1)
+                self._stats[key] = RunningStats(int(r["count"]), float(r["mean"]), m2)
+
+    # -------------------------------------------------
+    # Checks
+    # -------------------------------------------------
+    def check(self, category, sub, amount, row=0):
+        """
+        ``Flag`` when ``amount`` is out of line for the most specific key
+        (sub-category, else category) with enough history, else None.
+        O(1): at most two dict lookups.
+        """
+        if not amount or amount <= 0:
+            return None
+
+        x = math.log10(amount)
+        shown = str(sub or "").strip() or DEFAULT_SUB_CATEGORY
+        for key, label in (
+            ((category, _sub_key(sub)), f"{category} · {shown}"),
+            ((category,), category),
+        ):
+            stats = self._stats.get(key)
+            if stats is None or stats.count < MIN_HISTORY:
+                continue
+
+            spread = Z_LIMIT * stats.sd
+            off = abs(x - stats.mean)
+            if off <= max(spread, math.log10(MIN_RATIO)):
+                return None
+
+            return Flag(
+                row=row,
+                key=label,
+                amount=float(amount),
+                typical=10 ** stats.mean,
+                low=10 ** (stats.mean - spread),
+                high=10 ** (stats.mean + spread),
+                history=stats.count,
+            )
+        return None
+
+    def check_rows(self, rows):
+        """``Flag`` per Sheet1 row (header order) that looks mistyped."""
+        flags = []
+        with self._lock:
+            for i, (_, category, sub, amount, *_) in enumerate(rows):
+                flag = self.check(str(category), sub, float(amount), row=i)
+                if flag is not None:
+                    flags.append(flag)
+        return flags
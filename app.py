@@ -1,15 +1,27 @@
 import streamlit as st
-import gspread
 import pandas as pd
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
+from functools import partial
 import pytz
 
-# =================================================
-# GLOBAL DATE STANDARDS (DO NOT CHANGE)
-# =================================================
-DATE_FMT = "%d/%m/%Y"
-DATETIME_FMT = "%d/%m/%Y %H:%M"
+from aggregations import AggregationEngine, Query
+from anomalies import ExpenseMonitor
+from branches import BRANCH_COL, load_branch_registry
+from charts import RANGES, ChartRenderer, ChartSpec, chart_range, fallback_frame
+from constants import (
+    DATE_FMT, TIMEZONE,
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET,
+    EXPENSE_CATEGORIES, PAYMENT_MODES, EXPENSE_BY, EMPLOYEES,
+)
+from entries import record_expenses, record_sales
+from leave import FREQUENT_LEAVE_DAYS, LeaveCounters
+from ledger import ledger_lock, new_submission_key
+from pagination import PAGE_SIZE, PAGE_SIZES, paginate
+from reports import period_label, report_tables, to_excel, to_pdf
+from rolling import RollingStats
+from schema import date_keys, encode_date, encode_datetime, validate_rows
+from snapshots import load_snapshot
+from storage import find_rows, open_branch_set, start_sheets_sync
 
 # -------------------------------------------------
 # Page Configuration
@@ -38,142 +50,254 @@ if not st.session_state.authenticated:
 
     st.stop()
 
-# -------------------------------------------------
-# Google Sheets Connection
-# -------------------------------------------------
-SCOPE = [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/drive"
-]
-
-CREDS = ServiceAccountCredentials.from_json_keyfile_dict(
-    st.secrets["gcp_service_account"], SCOPE
-)
-
-client = gspread.authorize(CREDS)
-spreadsheet = client.open("MTC-Digitization")
-
-expense_sheet = spreadsheet.sheet1
-attendance_sheet = spreadsheet.worksheet("Attendance")
-sales_sheet = spreadsheet.worksheet("Sales")
-balance_sheet = spreadsheet.worksheet("Daily_Balance")
-
 # -------------------------------------------------
 # Time Handling (IST)
 # -------------------------------------------------
-ist = pytz.timezone("Asia/Kolkata")
+ist = pytz.timezone(TIMEZONE)
 now = datetime.now(ist)
 
 today_date = now.date()
 today_str = today_date.strftime(DATE_FMT)
-now_str = now.strftime(DATETIME_FMT)
+now_str = encode_datetime(now)          # stored Entry Timestamp
 
 
 # =================================================
-# 🔁 DAILY BALANCE UPSERT HELPER
+# 🏬 BRANCHES + AGGREGATION ENGINES + SHEET CACHES
 # =================================================
-def upsert_daily_balance(
-    balance_sheet,
-    target_date,
-    delta_sales=0.0,
-    delta_expense=0.0,
-    now_str=""
-):
-    import pandas as pd
+BRANCHES = load_branch_registry(st.secrets)
+ALL_BRANCHES = "🌐 All Branches"
 
-    date_str = target_date.strftime(DATE_FMT)
 
-    records = balance_sheet.get_all_records()
-    df = pd.DataFrame(records)
+@st.cache_resource
+def get_aggregation_engines():
+    # Shared across sessions → memoized aggregates survive reruns
+    return {name: AggregationEngine() for name in [*BRANCHES, ALL_BRANCHES]}
 
-    # -------------------------------------------------
-    # If sheet is empty → first ever entry
-    # -------------------------------------------------
-    if df.empty:
-        opening_balance = 0.0
-        total_sales = float(delta_sales)
-        total_expense = float(delta_expense)
-        closing_balance = opening_balance + total_sales - total_expense
-
-        balance_sheet.append_row([
-            date_str,
-            opening_balance,
-            total_sales,
-            total_expense,
-            closing_balance,
-            now_str
-        ])
-        return
 
-    # -------------------------------------------------
-    # Normalize date column
-    # -------------------------------------------------
-    df["Date"] = pd.to_datetime(df["Date"], format=DATE_FMT, errors="coerce")
-    target_dt = pd.to_datetime(target_date)
+engines = get_aggregation_engines()
+
+
+@st.cache_resource
+def get_rolling_stats():
+    # Running 7 / 30 / 90-day windows per branch, updated per appended row
+    return {name: RollingStats() for name in [*BRANCHES, ALL_BRANCHES]}
+
+
+@st.cache_resource
+def get_expense_monitors():
+    # Running per-category amount stats → unusual entries flagged at submit
+    return {name: ExpenseMonitor() for name in BRANCHES}
+
+
+@st.cache_resource
+def get_leave_counters():
+    # Per-employee day / month absence counters, updated on each save
+    return {name: LeaveCounters() for name in [*BRANCHES, ALL_BRANCHES]}
+
+
+@st.cache_resource
+def get_chart_renderer():
+    # Rendered PNGs shared by every session, keyed by data version + range
+    return ChartRenderer()
+
+
+chart_renderer = get_chart_renderer()
+
+
+@st.cache_resource
+def get_branch_set():
+    # Spreadsheets opened concurrently, once per process; one warm
+    # SheetCache per branch shared by every session
+    branch_set = open_branch_set(st.secrets, BRANCHES)
+
+    # Precomputed by nightly_close.py → first load skips fetch + aggregation
+    for branch, cache in branch_set.caches.items():
+        snapshot = load_snapshot(branch=branch)
+        if snapshot is None:
+            continue
+
+        engines[branch].restore_state(snapshot["engine"])
+        for name, frame in snapshot["frames"].items():
+            cache.seed(name, frame, fetched_at=snapshot["generated_at"])
+
+    branch_set.start_refreshers()
+    return branch_set
+
 
-    # -------------------------------------------------
-    # CASE 1: DATE EXISTS → UPDATE
-    # -------------------------------------------------
-    if target_dt in df["Date"].values:
+branch_set = get_branch_set()
 
-        row_idx = df.index[df["Date"] == target_dt][0] + 2
 
-        opening_balance = float(df.loc[row_idx - 2, "Opening Balance"])
-        total_sales = float(df.loc[row_idx - 2, "Total Sales"]) + float(delta_sales)
-        total_expense = float(df.loc[row_idx - 2, "Total Expense"]) + float(delta_expense)
+@st.cache_resource
+def get_sheets_sync():
+    # SQLite backend → optionally mirrored to Google Sheets in the background
+    return start_sheets_sync(st.secrets, BRANCHES, branch_set)
 
-        closing_balance = opening_balance + total_sales - total_expense
 
-        balance_sheet.update(f"C{row_idx}", [[total_sales]])
-        balance_sheet.update(f"D{row_idx}", [[total_expense]])
-        balance_sheet.update(f"E{row_idx}", [[closing_balance]])
-        balance_sheet.update(f"F{row_idx}", [[now_str]])
+# Sync status stays visible: a failing mirror is not silently ignored
+for sync_branch, sync in get_sheets_sync().items():
+    prefix = f"{sync_branch}: " if len(BRANCHES) > 1 else ""
+    if sync.error:
+        st.sidebar.warning(f"☁️ {prefix}Google Sheets sync failing — {sync.error}")
+    elif sync.synced_at:
+        synced = datetime.fromtimestamp(sync.synced_at, ist).strftime("%H:%M")
+        st.sidebar.caption(f"☁️ {prefix}Synced to Google Sheets at {synced}")
+    else:
+        st.sidebar.caption(f"☁️ {prefix}Google Sheets sync starting…")
+
 
+# -------------------------------------------------
+# Paged tables (only the visible page goes to the browser)
+# -------------------------------------------------
+def paged_table(
+    df,
+    key,
+    sort_options,
+    ascending=False,
+    search_cols=None,
+    group_col=None,
+    render=None
+):
+    """
+    Filter / sort / paginate ``df`` in pandas and show one page.
+
+    ``sort_options`` maps a label to the column(s) sorted on; ``render``
+    turns the page frame into what is displayed.
+    """
+    c1, c2 = st.columns(2)
+    search = c1.text_input("🔎 Filter", key=f"{key}_search")
+    sort_label = c2.selectbox("Sort by", list(sort_options), key=f"{key}_sort")
+
+    c3, c4, c5 = st.columns(3)
+    order = c3.selectbox(
+        "Order",
+        ["Descending", "Ascending"],
+        index=0 if not ascending else 1,
+        key=f"{key}_order"
+    )
+    page_size = c4.selectbox(
+        "Rows per page",
+        PAGE_SIZES,
+        index=PAGE_SIZES.index(PAGE_SIZE),
+        key=f"{key}_size"
+    )
+    page_no = c5.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+
+    page_df, page = paginate(
+        df,
+        page=page_no,
+        page_size=page_size,
+        sort_by=sort_options[sort_label],
+        ascending=order == "Ascending",
+        search=search,
+        search_cols=search_cols,
+        group_col=group_col
+    )
+
+    if page.total:
+        st.dataframe(
+            render(page_df) if render else page_df,
+            use_container_width=True,
+            hide_index=True
+        )
+    st.caption(page.label)
+
+
+def show_forecast(rolling, source, dimension):
+    forecast = rolling.forecast(source)
+    if forecast.empty:
+        st.info("Not enough data for a forecast yet.")
         return
 
-    # -------------------------------------------------
-    # CASE 2: DATE DOES NOT EXIST → INSERT
-    # -------------------------------------------------
-    prev_days = df[df["Date"] < target_dt]
+    total = forecast[forecast["Dimension"] == "Total"].iloc[0]
+
+    col1, col2 = st.columns(2)
+    col1.metric("🔮 Next Day", f"₹ {total['Next Day']:,.0f}")
+    col1.caption(f"₹ {total['Next Day Low']:,.0f} – ₹ {total['Next Day High']:,.0f}")
+    col2.metric("🔮 Next Week", f"₹ {total['Next Week']:,.0f}")
+    col2.caption(f"₹ {total['Next Week Low']:,.0f} – ₹ {total['Next Week High']:,.0f}")
+
+    st.dataframe(
+        forecast.loc[
+            forecast["Dimension"] == dimension, ["Key", "Next Day", "Next Week"]
+        ].rename(columns={"Key": dimension}).sort_values("Next Day", ascending=False),
+        use_container_width=True,
+        hide_index=True
+    )
 
-    if not prev_days.empty:
-        opening_balance = float(
-            prev_days.sort_values("Date").iloc[-1]["Closing Balance"]
+    with st.expander("📐 Rolling 7 / 30 / 90-day daily averages"):
+        stats = rolling.stats(source)
+        st.dataframe(
+            stats.pivot_table(
+                index=["Dimension", "Key"], columns="Window", values="Mean", sort=False
+            ),
+            use_container_width=True
         )
-    else:
-        opening_balance = 0.0
 
-    total_sales = float(delta_sales)
-    total_expense = float(delta_expense)
-    closing_balance = opening_balance + total_sales - total_expense
+    st.caption(f"Based on data up to {rolling.as_of(source).strftime(DATE_FMT)}")
+
 
-    balance_sheet.append_row([
-        date_str,
-        opening_balance,
-        total_sales,
-        total_expense,
-        closing_balance,
-        now_str
-    ])
+def show_chart(engine, spec):
+    try:
+        png = chart_renderer.get(engine, spec)
+    except Exception:
+        # Render failed on the worker → plain interactive chart instead
+        st.warning("⚠️ This chart could not be drawn — showing a simpler version.")
+        try:
+            st.line_chart(fallback_frame(engine, spec))
+        except Exception:
+            st.caption("📉 No chart available for this range.")
+        return
 
+    if png is None:
+        st.caption("📉 Chart is being prepared — it will show on the next refresh.")
+    elif not png:
+        st.info("No data for this range.")
+    else:
+        st.image(png, use_container_width=True)
 
 
 # -------------------------------------------------
 # Navigation
 # -------------------------------------------------
+if len(BRANCHES) > 1:
+    branch = st.selectbox("🏬 Branch", [*BRANCHES, ALL_BRANCHES])
+else:
+    branch = next(iter(BRANCHES))
+
+ENTRY_SECTIONS = ["🧾 Expense Entry", "💰 Sales Entry", "🧑‍🍳 Attendance"]
+
 section = st.selectbox(
     "📢 Select Section",
     [
         "📊 Today's Summary",
-        "🧾 Expense Entry",
-        "💰 Sales Entry",
-        "🧑‍🍳 Attendance",
+        *ENTRY_SECTIONS,
         "📊 Expense Analytics",
         "📈 Attendance Analytics",
         "📊 Sales Analytics",
+        "📤 Export Reports",
     ],
 )
 
+engine = engines[branch]
+rolling = get_rolling_stats()[branch]
+leave = get_leave_counters()[branch]
+
+if branch == ALL_BRANCHES:
+    if section in ENTRY_SECTIONS:
+        st.info("Select a single branch to enter data.")
+        st.stop()
+
+    # Read-only view stacking every branch (adds a "Branch" column)
+    sheet_cache = branch_set.consolidated
+else:
+    sheet_cache = branch_set.caches[branch]
+
+    worksheets = branch_set.worksheets[branch]
+    expense_sheet = worksheets[EXPENSE_SHEET]
+    attendance_sheet = worksheets[ATTENDANCE_SHEET]
+    sales_sheet = worksheets[SALES_SHEET]
+    balance_sheet = worksheets[BALANCE_SHEET]
+
 # =================================================
 # 📊 TODAY'S SUMMARY
 # =================================================
@@ -181,50 +305,47 @@ if section == "📊 Today's Summary":
 
     st.markdown("## 📊 Today's Summary")
 
+    this_day = (("date_only", pd.Timestamp(today_date)),)
+
     # ---------- SALES ----------
-    sales_df = pd.DataFrame(sales_sheet.get_all_records())
+    sales_df, sales_version = sheet_cache.read(SALES_SHEET)
     if not sales_df.empty:
-        sales_df["Cash Total"] = pd.to_numeric(sales_df["Cash Total"], errors="coerce")
-        sales_df["date"] = pd.to_datetime(
-            sales_df["Date"], format=DATE_FMT, errors="coerce"
-        ).dt.date
-        total_sales_today = sales_df[sales_df["date"] == today_date]["Cash Total"].sum()
+        engine.register("sales", sales_df, date_col="date", version=sales_version)
+        total_sales_today = engine.scalar(
+            "sales", Query("Cash Total", where=this_day)
+        )
     else:
         total_sales_today = 0.0
 
     # ---------- EXPENSE ----------
-    expense_df = pd.DataFrame(expense_sheet.get_all_records())
+    expense_df, expense_version = sheet_cache.read(EXPENSE_SHEET)
     if not expense_df.empty:
-        expense_df["Expense Amount"] = pd.to_numeric(
-            expense_df["Expense Amount"], errors="coerce"
+        engine.register(
+            "expenses", expense_df, date_col="datetime", version=expense_version
+        )
+        total_expense_today = engine.scalar(
+            "expenses", Query("Expense Amount", where=this_day)
         )
-        expense_df["date"] = pd.to_datetime(
-            expense_df["Date & Time"], format=DATETIME_FMT, errors="coerce"
-        ).dt.date
-        total_expense_today = expense_df[
-            expense_df["date"] == today_date
-        ]["Expense Amount"].sum()
     else:
         total_expense_today = 0.0
 
-   # ---------- OPENING BALANCE ----------
-    balance_df = pd.DataFrame(balance_sheet.get_all_records())
-    
+    # ---------- OPENING BALANCE ----------
+    balance_df = sheet_cache.get(BALANCE_SHEET)
+    today_dt = pd.to_datetime(today_date)
+
     if not balance_df.empty:
-        balance_df["date"] = pd.to_datetime(
-            balance_df["Date"],
-            format=DATE_FMT,
-            errors="coerce"
-        )
-    
-        today_dt = pd.to_datetime(today_date)
-    
-        prev_days = balance_df[balance_df["date"] < today_dt]
-    
-        opening_balance = (
-            int(prev_days.sort_values("date").iloc[-1]["Closing Balance"])
-            if not prev_days.empty else 0
-        )
+        prev_days = balance_df[balance_df["date"] < today_dt].sort_values("date")
+
+        if BRANCH_COL in prev_days.columns:
+            # Each branch carries its own cash → sum of latest closings
+            opening_balance = int(
+                prev_days.groupby(BRANCH_COL)["Closing Balance"].last().sum()
+            )
+        else:
+            opening_balance = (
+                int(prev_days.iloc[-1]["Closing Balance"])
+                if not prev_days.empty else 0
+            )
     else:
         opening_balance = 0
 
@@ -246,8 +367,13 @@ if section == "📊 Today's Summary":
         ]
     
         if not today_row.empty:
-            saved_closing = float(today_row.iloc[0]["Closing Balance"])
-            saved_ts = today_row.iloc[0]["Entry Timestamp"]
+            # Last saved row per branch; duplicates must not add up
+            if BRANCH_COL in today_row.columns:
+                latest = today_row.groupby(BRANCH_COL).tail(1)
+                saved_closing = float(latest["Closing Balance"].sum())
+            else:
+                saved_closing = float(today_row["Closing Balance"].iloc[-1])
+            saved_ts = today_row["Entry Timestamp"].max()
     
     # ---------- UI ----------
     if saved_closing is not None:
@@ -263,6 +389,35 @@ if section == "📊 Today's Summary":
         )
         st.caption("No closing balance recorded for today")
 
+    # ---------- BRANCH-WISE (CONSOLIDATED VIEW) ----------
+    if branch == ALL_BRANCHES:
+        st.markdown("---")
+        st.subheader("🏬 Branch-wise Today")
+
+        branch_df = pd.DataFrame({BRANCH_COL: list(BRANCHES)})
+
+        if not sales_df.empty:
+            branch_df = branch_df.merge(
+                engine.run(
+                    "sales",
+                    Query("Cash Total", group_by=(BRANCH_COL,), where=this_day)
+                ).rename(columns={"Cash Total": "Total Sales"}),
+                on=BRANCH_COL,
+                how="left"
+            )
+
+        if not expense_df.empty:
+            branch_df = branch_df.merge(
+                engine.run(
+                    "expenses",
+                    Query("Expense Amount", group_by=(BRANCH_COL,), where=this_day)
+                ).rename(columns={"Expense Amount": "Total Expense"}),
+                on=BRANCH_COL,
+                how="left"
+            )
+
+        st.dataframe(branch_df.fillna(0), use_container_width=True)
+
 
 # =================================================
 # 🧾 EXPENSE ENTRY (BULK)
@@ -271,16 +426,20 @@ elif section == "🧾 Expense Entry":
 
     st.markdown("## 🧾 Expense Entry")
 
-    EXPENSE_CATEGORIES = [
-        "Groceries","Vegetables","Gas","Oil & Ghee","Non-Veg",
-        "Milk","Banana Leaf","Maintenance","Electricity",
-        "Rent","Salary and Advance","Transportation","Others"
-    ]
+    monitor = get_expense_monitors()[branch]
+
+    # Caught up with Sheet1 on page load (a no-op until Sheet1 changes,
+    # then one row hash plus the new rows), so a submit only scores its rows
+    monitor.sync(*sheet_cache.read(EXPENSE_SHEET))
+
+    # Idempotency key of the form on screen; renewed after each save
+    if "expense_submission" not in st.session_state:
+        st.session_state.expense_submission = new_submission_key()
 
     with st.form("expense_form"):
         exp_date = st.date_input("Expense Date", value=today_date)
         exp_time = st.time_input("Expense Time", value=now.time().replace(second=0))
-        exp_dt = datetime.combine(exp_date, exp_time).strftime(DATETIME_FMT)
+        exp_dt = encode_datetime(datetime.combine(exp_date, exp_time))
         st.markdown("---")
 
         expense_rows = []
@@ -289,34 +448,63 @@ elif section == "🧾 Expense Entry":
             sel = st.checkbox(cat, key=f"sel_{cat}")
             sub = st.text_input("Sub-category", key=f"sub_{cat}")
             amt = st.number_input("Amount", min_value=0, key=f"amt_{cat}")
-            pay = st.selectbox("Payment", ["Cash","UPI","Cheque"], key=f"pay_{cat}")
-            by = st.selectbox("Expense By", ["RK","AR","YS"], key=f"by_{cat}")
+            pay = st.selectbox("Payment", PAYMENT_MODES, key=f"pay_{cat}")
+            by = st.selectbox("Expense By", EXPENSE_BY, key=f"by_{cat}")
             expense_rows.append((sel, cat, sub, amt, pay, by))
             st.markdown("---")
 
         submit = st.form_submit_button("✅ Submit")
 
+    def save_expenses(submission, new_rows, day):
+        # Key is handed back if the append fails → the retry is saved
+        if not record_expenses(
+            expense_sheet, balance_sheet, submission, new_rows, day, now_str
+        ):
+            st.info("This submission was already recorded.")
+            return
+
+        count = len(new_rows)
+        if new_rows:
+            monitor.add_rows(new_rows)
+            sheet_cache.invalidate(EXPENSE_SHEET, BALANCE_SHEET)
+
+        st.session_state.expense_submission = new_submission_key()
+        st.success(f"{count} expense(s) recorded" if count else "No expenses submitted")
+
     if submit:
-        count = 0
-        total_expense_added = 0.0
-
-        for sel, cat, sub, amt, pay, by in expense_rows:
-            if sel and amt > 0:
-                expense_sheet.append_row([
-                    exp_dt, cat, sub, amt, pay, by
-                ])
-                total_expense_added += float(amt)
-                count += 1
-    
-        if total_expense_added > 0:
-            upsert_daily_balance(
-                balance_sheet=balance_sheet,
-                target_date=exp_date,
-                delta_expense=total_expense_added,
-                now_str=now_str
+        new_rows = validate_rows(EXPENSE_SHEET, [
+            [exp_dt, cat, sub, amt, pay, by]
+            for sel, cat, sub, amt, pay, by in expense_rows
+            if sel and amt > 0
+        ])
+
+        # O(1) per new row against the running per-category stats
+        flags = monitor.check_rows(new_rows)
+
+        st.session_state.pop("expense_review", None)
+        if flags:
+            st.session_state.expense_review = (
+                st.session_state.expense_submission, new_rows, exp_date, flags
             )
-    
-        st.success(f"{count} expense(s) recorded" if count else "No expenses submitted")
+        else:
+            save_expenses(st.session_state.expense_submission, new_rows, exp_date)
+
+    # ---------- Unusual amounts → confirm before saving ----------
+    review = st.session_state.get("expense_review")
+    if review is not None:
+        submission, new_rows, day, flags = review
+        st.warning(
+            "⚠️ Unusual amount(s) — check for a missing or extra zero:\n\n"
+            + "\n".join(f"- {flag.message}" for flag in flags)
+        )
+
+        c1, c2 = st.columns(2)
+        if c1.button("✅ Save anyway"):
+            st.session_state.pop("expense_review", None)
+            save_expenses(submission, new_rows, day)
+        if c2.button("✏️ Edit"):
+            st.session_state.pop("expense_review", None)
+            st.rerun()
 
 
 # =================================================
@@ -326,6 +514,10 @@ elif section == "💰 Sales Entry":
 
     st.markdown("## 💰 Sales Entry")
 
+    # Idempotency key of the form on screen; renewed after each save
+    if "sales_submission" not in st.session_state:
+        st.session_state.sales_submission = new_submission_key()
+
     with st.form("sales_form"):
 
         sale_date = st.date_input(
@@ -333,7 +525,7 @@ elif section == "💰 Sales Entry":
             value=today_date
         )
 
-        sale_date_str = sale_date.strftime(DATE_FMT)
+        sale_date_str = encode_date(sale_date)
 
         st.markdown("### 🏪 Store-wise Sales Entry")
 
@@ -389,45 +581,26 @@ elif section == "💰 Sales Entry":
             ("Orders", "Full Day", orders_full),
         ]
 
-        total_sales_added = 0.0
-        rows_written = 0
-
-        existing_rows = sales_sheet.get_all_values() or []
-
-        for store, slot, amount in sales_rows:
-
-            if amount and amount > 0:
-                safe_amount = round(float(amount), 2)
-
-                # ---------- Remove existing entry for same date/store/slot ----------
-                for i in reversed([
-                    idx for idx, r in enumerate(existing_rows[1:], start=2)
-                    if r[0] == sale_date_str and r[1] == store and r[2] == slot
-                ]):
-                    sales_sheet.delete_rows(i)
-
-                # ---------- Append new row ----------
-                sales_sheet.append_row([
-                    str(sale_date_str),
-                    str(store),
-                    str(slot),
-                    safe_amount,
-                    str(now_str)
-                ])
-
-                total_sales_added += safe_amount
-                rows_written += 1
-
-        # ---------- Update Daily Balance ----------
-        if total_sales_added > 0:
-            upsert_daily_balance(
-                balance_sheet=balance_sheet,
-                target_date=sale_date,
-                delta_sales=total_sales_added,
-                now_str=now_str
-            )
+        new_rows = validate_rows(SALES_SHEET, [
+            [sale_date_str, store, slot, amount, now_str]
+            for store, slot, amount in sales_rows
+            if amount and amount > 0
+        ])
+        rows_written = len(new_rows)
+
+        # Key is handed back if the sheet write fails → the retry is saved
+        if not record_sales(
+            sales_sheet, balance_sheet, st.session_state.sales_submission,
+            new_rows, sale_date, now_str
+        ):
+            st.info("This submission was already recorded.")
+        else:
+            if new_rows:
+                sheet_cache.invalidate(SALES_SHEET, BALANCE_SHEET)
+
+            st.session_state.sales_submission = new_submission_key()
 
-        st.success(f"✅ {rows_written} sales entries recorded successfully")
+            st.success(f"✅ {rows_written} sales entries recorded successfully")
 
 
 # =================================================
@@ -437,16 +610,11 @@ elif section == "🧑‍🍳 Attendance":
 
     st.markdown("## 🧑‍🍳 Attendance")
 
-    EMPLOYEES = [
-        "Vinoth","Ravi","Mani","Ansari","Kumar","Sakthi","Vijaya","Hari",
-        "Samuthuram","Ramesh","Punitha","Vembu","Babu","Latha",
-        "Indhra","Ambika","RY","YS","Poosari","Balaji"
-    ]
-
-    att_date = st.date_input(
+    att_day = st.date_input(
         "Attendance Date",
         value=today_date
-    ).strftime(DATE_FMT)
+    )
+    att_date = encode_date(att_day)
 
     st.markdown("---")
 
@@ -477,24 +645,29 @@ elif section == "🧑‍🍳 Attendance":
     # =================================================
     if st.button("✅ Submit Attendance"):
 
-        # Remove existing entries for this date
-        rows = attendance_sheet.get_all_values()
-        for i in reversed([
-            idx for idx, r in enumerate(rows[1:], start=2)
-            if r[0] == att_date
-        ]):
-            attendance_sheet.delete_rows(i)
-
-        # Insert fresh records
-        for e in EMPLOYEES:
-            attendance_sheet.append_row([
-                att_date,
-                e,
-                "✖" if morning[e] else "✔",
-                "✖" if night[e] else "✔",
-                now_str
-            ])
-
+        # Row deletes shift indices → one writer per Attendance sheet at a time
+        with ledger_lock(attendance_sheet):
+
+            # Remove existing entries for this date
+            for i, _ in reversed(find_rows(attendance_sheet, Date=date_keys(att_day))):
+                attendance_sheet.delete_rows(i)
+
+            # Insert fresh records
+            attendance_sheet.append_rows(validate_rows(ATTENDANCE_SHEET, [
+                [
+                    att_date,
+                    e,
+                    "✖" if morning[e] else "✔",
+                    "✖" if night[e] else "✔",
+                    now_str
+                ]
+                for e in EMPLOYEES
+            ]))
+
+        # Overwrites replace the day in the counters → no rescan
+        leave.record_day(att_day, {e: (morning[e], night[e]) for e in EMPLOYEES})
+
+        sheet_cache.invalidate(ATTENDANCE_SHEET)
         st.success("Attendance saved ✅")
 
 
@@ -505,48 +678,32 @@ elif section == "📊 Expense Analytics":
 
     st.markdown("## 📊 Expense Analytics")
 
-    df = pd.DataFrame(expense_sheet.get_all_records())
+    df, version = sheet_cache.read(EXPENSE_SHEET)
     if df.empty:
         st.info("No expense data available yet.")
         st.stop()
 
-    # -------------------------------------------------
-    # Data Cleaning & Date Normalization
-    # -------------------------------------------------
-    df["Expense Amount"] = pd.to_numeric(df["Expense Amount"], errors="coerce")
-
-    df["datetime"] = pd.to_datetime(
-        df["Date & Time"],
-        format=DATETIME_FMT,      # DD/MM/YYYY HH:MM
-        errors="coerce"
-    )
-
-    df = df.dropna(subset=["datetime", "Expense Amount"])
-
-    # 🔑 Normalize once — reuse everywhere
-    df["date"] = df["datetime"].dt.date
-    df["year"] = df["datetime"].dt.year
-    df["month"] = df["datetime"].dt.month
-    df["week"] = df["datetime"].dt.isocalendar().week
+    engine.register("expenses", df, date_col="datetime", version=version)
 
     current_year = now.year
     current_month = now.month
     current_week = now.isocalendar().week
 
+    this_month = (("year", current_year), ("month", current_month))
+    this_week = (("year", current_year), ("week", current_week))
+
     # =================================================
     # 📌 EXPENSE KPI SUMMARY
     # =================================================
-    overall_expense = df["Expense Amount"].sum()
+    overall_expense = engine.scalar("expenses", Query("Expense Amount"))
 
-    monthly_expense = df[
-        (df["year"] == current_year) &
-        (df["month"] == current_month)
-    ]["Expense Amount"].sum()
+    monthly_expense = engine.scalar(
+        "expenses", Query("Expense Amount", where=this_month)
+    )
 
-    weekly_expense = df[
-        (df["year"] == current_year) &
-        (df["week"] == current_week)
-    ]["Expense Amount"].sum()
+    weekly_expense = engine.scalar(
+        "expenses", Query("Expense Amount", where=this_week)
+    )
 
     col1, col2, col3 = st.columns(3)
 
@@ -556,48 +713,55 @@ elif section == "📊 Expense Analytics":
 
     st.markdown("---")
 
+    # =================================================
+    # 🔮 Expense Forecast (rolling 7 / 30 / 90-day state)
+    # =================================================
+    st.subheader("🔮 Expense Forecast")
+
+    rolling.sync("expenses", df, version)
+    show_forecast(rolling, "expenses", "Category")
+
+    st.markdown("---")
+
     # =================================================
     # 1️⃣ Category-wise Expense
     # =================================================
     st.subheader("📂 Category-wise Expense")
 
-    cat_expense = (
-        df.groupby("Category", as_index=False)["Expense Amount"]
-        .sum()
-        .sort_values("Expense Amount", ascending=False)
-        .reset_index(drop=True)
+    cat_expense = engine.run(
+        "expenses", Query("Expense Amount", group_by=("Category",))
     )
 
     st.dataframe(cat_expense, use_container_width=True)
 
+    if branch == ALL_BRANCHES:
+        st.subheader("🏬 Branch-wise Expense")
+
+        branch_expense = engine.run(
+            "expenses", Query("Expense Amount", group_by=(BRANCH_COL,))
+        )
+
+        st.dataframe(branch_expense, use_container_width=True)
+
     # =================================================
     # 🧾 Other Expenses – Sub-Category Breakdown
     # =================================================
     st.subheader("🧾 Other Expenses Breakdown")
-    
-    other_df = df[df["Category"] == "Others"].copy()
-    
-    if other_df.empty:
+
+    other_summary = engine.run(
+        "expenses",
+        Query(
+            "Expense Amount",
+            group_by=("Sub-Category",),
+            where=(("Category", "Others"),)
+        )
+    )
+
+    if other_summary.empty:
         st.info("No 'Other' expenses recorded yet.")
     else:
-        # 🔑 Normalize missing sub-categories
-        other_df["Sub-Category"] = (
-            other_df["Sub-Category"]
-            .fillna("")
-            .str.strip()
-            .replace("", "Miscellaneous Expenses")
-        )
-    
-        other_summary = (
-            other_df
-            .groupby("Sub-Category", as_index=False)["Expense Amount"]
-            .sum()
-            .sort_values("Expense Amount", ascending=False)
-            .reset_index(drop=True)
-        )
-    
         st.dataframe(other_summary, use_container_width=True)
-    
+
     st.markdown("---")
 
 
@@ -611,22 +775,15 @@ elif section == "📊 Expense Analytics":
         ["Daily", "Weekly", "Monthly"],
         horizontal=True
     )
-    
-    # Filter once — reuse everywhere
-    month_df = df[
-        (df["year"] == current_year) &
-        (df["month"] == current_month)
-    ]
-    
+
     if trend == "Daily":
         # ✅ Daily expenses — CURRENT MONTH ONLY
         trend_df = (
-            month_df
-            .groupby("date", as_index=False)["Expense Amount"]
-            .sum()
-            .rename(columns={"date": "Date"})
-            .sort_values("Date", ascending=False)
-            .reset_index(drop=True)
+            engine.run(
+                "expenses",
+                Query("Expense Amount", bucket="day", where=this_month)
+            )
+            .rename(columns={"date_only": "Date"})
         )
     
         trend_df["Date"] = trend_df["Date"].apply(
@@ -636,25 +793,33 @@ elif section == "📊 Expense Analytics":
     elif trend == "Weekly":
         # ✅ Weekly expenses — CURRENT MONTH ONLY (ISO week)
         trend_df = (
-            month_df
-            .groupby("week", as_index=False)["Expense Amount"]
-            .sum()
+            engine.run(
+                "expenses",
+                Query("Expense Amount", bucket="week", where=this_month)
+            )
+            .drop(columns=["year"])
             .rename(columns={"week": "Week (ISO)"})
-            .sort_values("Week (ISO)", ascending=False)
-            .reset_index(drop=True)
         )
     
     else:  # Monthly
         # ✅ Monthly trend — YEAR-WISE (this one is okay to be broader)
         trend_df = (
-            df.groupby(["year", "month"], as_index=False)["Expense Amount"]
-            .sum()
+            engine.run("expenses", Query("Expense Amount", bucket="month"))
             .rename(columns={"month": "Month"})
-            .sort_values(["year", "Month"], ascending=False)
-            .reset_index(drop=True)
         )
     
     st.dataframe(trend_df, use_container_width=True)
+
+    # ---------- Long-range chart (rendered off the request path) ----------
+    expense_span = st.radio(
+        "Chart Range", list(RANGES), horizontal=True, key="expense_chart_range"
+    )
+    show_chart(engine, ChartSpec(
+        "expenses",
+        "Expense Amount",
+        f"Daily Expenses – {expense_span}",
+        *chart_range(expense_span, today_date)
+    ))
     st.markdown("---")
 
     # =================================================
@@ -662,11 +827,8 @@ elif section == "📊 Expense Analytics":
     # =================================================
     st.subheader("💳 Payment Mode")
 
-    payment_df = (
-        df.groupby("Payment Mode", as_index=False)["Expense Amount"]
-        .sum()
-        .sort_values("Expense Amount", ascending=False)
-        .reset_index(drop=True)
+    payment_df = engine.run(
+        "expenses", Query("Expense Amount", group_by=("Payment Mode",))
     )
 
     st.dataframe(payment_df, use_container_width=True)
@@ -678,11 +840,8 @@ elif section == "📊 Expense Analytics":
     # =================================================
     st.subheader("👤 Expense By")
 
-    by_df = (
-        df.groupby("Expense By", as_index=False)["Expense Amount"]
-        .sum()
-        .sort_values("Expense Amount", ascending=False)
-        .reset_index(drop=True)
+    by_df = engine.run(
+        "expenses", Query("Expense Amount", group_by=("Expense By",))
     )
 
     st.dataframe(by_df, use_container_width=True)
@@ -696,44 +855,18 @@ elif section == "📈 Attendance Analytics":
 
     st.markdown("## 📈 Attendance Analytics")
 
-    records = attendance_sheet.get_all_records()
-    if not records:
+    # Typed frame (dates parsed, absent_shifts / leave_days derived)
+    df, version = sheet_cache.read(ATTENDANCE_SHEET)
+    if df.empty:
         st.info("No attendance data available yet.")
         st.stop()
 
-    df = pd.DataFrame(records)
-
-    # -------------------------------------------------
-    # Date Cleaning (DD/MM/YYYY)
-    # -------------------------------------------------
-    df["date"] = pd.to_datetime(
-        df["Date"],
-        format=DATE_FMT,
-        errors="coerce"
-    )
-
-    df = df.dropna(subset=["date"])
-
-    df["year"] = df["date"].dt.year
-    df["month"] = df["date"].dt.month
-    df["date_only"] = df["date"].dt.date
+    # Built once, then kept in step by each save
+    leave.sync(df, version)
 
     current_year = now.year
     current_month = now.month
 
-    # -------------------------------------------------
-    # Absence Calculation
-    # Morning ✖ = 1 shift
-    # Night ✖ = 1 shift
-    # 2 shifts = 1 leave day
-    # -------------------------------------------------
-    df["absent_shifts"] = (
-        (df["Morning"] == "✖").astype(int) +
-        (df["Night"] == "✖").astype(int)
-    )
-
-    df["leave_days"] = df["absent_shifts"] / 2
-
     # =================================================
     # 1️⃣ Leave Analysis (Month / Year)
     # =================================================
@@ -741,34 +874,57 @@ elif section == "📈 Attendance Analytics":
 
     view_type = st.radio(
         "View leave data for:",
-        ["Current Month", "Current Year"],
+        ["Current Month", "Current Year", "Custom Range"],
         horizontal=True
     )
 
+    # Counter lookups per employee — no pass over the history
     if view_type == "Current Month":
-        temp = df[
-            (df["year"] == current_year) &
-            (df["month"] == current_month)
-        ]
+        leave_df = leave.leave_table(year=current_year, month=current_month)
         caption = "Leave days taken per employee (Current Month)"
-    else:
-        temp = df[df["year"] == current_year]
+    elif view_type == "Current Year":
+        leave_df = leave.leave_table(year=current_year)
         caption = "Leave days taken per employee (Current Year)"
-
-    leave_df = (
-        temp.groupby("Employee Name", as_index=False)["leave_days"]
-        .sum()
-        .rename(columns={
-            "Employee Name": "Employee",
-            "leave_days": "Leave Days"
-        })
-        .sort_values("Leave Days", ascending=False)
-        .reset_index(drop=True)
-    )
+    else:
+        range_start, range_end = st.columns(2)
+        start = range_start.date_input(
+            "From", value=today_date - pd.Timedelta(days=90), key="leave_from"
+        )
+        end = range_end.date_input("To", value=today_date, key="leave_to")
+        leave_df = leave.leave_table(start=start, end=end)
+        caption = (
+            f"Leave days taken per employee "
+            f"({start.strftime(DATE_FMT)} – {end.strftime(DATE_FMT)})"
+        )
 
     st.caption(caption)
     st.dataframe(leave_df, use_container_width=True)
 
+    # ---------- One employee, month by month ----------
+    employee = st.selectbox("Employee", leave.employees, key="leave_employee")
+    st.caption(f"{employee}: leave per month ({current_year})")
+    st.dataframe(leave.monthly(employee, current_year), use_container_width=True)
+
+    st.markdown("---")
+
+    # =================================================
+    # 🔥 Absence Streaks & Frequent Absentees
+    # =================================================
+    st.subheader("🔥 Absence Streaks & Frequent Absentees")
+
+    st.caption("Longest run of consecutive days with an absent shift (all time)")
+    st.dataframe(leave.streaks(), use_container_width=True)
+
+    quarter_start = today_date - pd.Timedelta(days=90)
+    frequent_df = leave.frequent_absentees(quarter_start, today_date)
+    st.caption(
+        f"Employees with {FREQUENT_LEAVE_DAYS:g}+ leave days in the last 90 days"
+    )
+    if frequent_df.empty:
+        st.info("No frequent absentees in the last 90 days.")
+    else:
+        st.dataframe(frequent_df, use_container_width=True)
+
     st.markdown("---")
 
     # =================================================
@@ -808,6 +964,7 @@ elif section == "📈 Attendance Analytics":
     
         if morning_absent:
             rows.append({
+                "date_only": day,
                 "Date": day.strftime(DATE_FMT),
                 "Shift": "Morning",
                 "Absent Count": len(morning_absent),
@@ -821,6 +978,7 @@ elif section == "📈 Attendance Analytics":
     
         if night_absent:
             rows.append({
+                "date_only": day,
                 "Date": day.strftime(DATE_FMT),
                 "Shift": "Night",
                 "Absent Count": len(night_absent),
@@ -828,12 +986,17 @@ elif section == "📈 Attendance Analytics":
             })
     
     if rows:
-        abs_df = (
-            pd.DataFrame(rows)
-            .sort_values(["Date", "Shift"],ascending=False)
-            .reset_index(drop=True)
+        abs_df = pd.DataFrame(rows)
+        paged_table(
+            abs_df,
+            key="absentees",
+            sort_options={
+                "Date": ["date_only", "Shift"],
+                "Absent Count": ["Absent Count", "date_only"],
+            },
+            search_cols=["Date", "Shift", "Absent Employees"],
+            render=lambda page_df: page_df.drop(columns="date_only")
         )
-        st.dataframe(abs_df, use_container_width=True)
     else:
         st.info("No absentees recorded for the current month.")
 
@@ -848,65 +1011,34 @@ elif section == "📊 Sales Analytics":
     # =================================================
     # 📥 LOAD SALES DATA
     # =================================================
-    records = sales_sheet.get_all_records()
-    if not records:
+    df, version = sheet_cache.read(SALES_SHEET)
+    if df.empty:
         st.info("No sales data available yet.")
         st.stop()
 
-    df = pd.DataFrame(records)
-
-    # -------------------------------------------------
-    # Data Cleaning & Date Normalization
-    # -------------------------------------------------
-    df["Cash Total"] = pd.to_numeric(df["Cash Total"], errors="coerce")
+    engine.register("sales", df, date_col="date", version=version)
 
-    df["date"] = pd.to_datetime(
-        df["Date"],
-        format=DATE_FMT,       # DD/MM/YYYY
-        errors="coerce"
-    )
-
-    df = df.dropna(subset=["date", "Cash Total"])
-
-    df["year"] = df["date"].dt.year
-    df["month"] = df["date"].dt.month
-    df["date_only"] = df["date"].dt.date
+    expense_df, expense_version = sheet_cache.read(EXPENSE_SHEET)
+    if not expense_df.empty:
+        engine.register(
+            "expenses", expense_df, date_col="datetime", version=expense_version
+        )
 
     current_year = now.year
     current_month = now.month
 
+    this_month = (("year", current_year), ("month", current_month))
+
     # =================================================
     # 📌 MONTHLY KPI SUMMARY
     # =================================================
-    monthly_sales_df = df[
-        (df["year"] == current_year) &
-        (df["month"] == current_month)
-    ]
-
-    monthly_sales = monthly_sales_df["Cash Total"].sum()
+    monthly_sales = engine.scalar("sales", Query("Cash Total", where=this_month))
 
     # ---------- Monthly Expenses ----------
-    expense_df = pd.DataFrame(expense_sheet.get_all_records())
-
     if not expense_df.empty:
-        expense_df["Expense Amount"] = pd.to_numeric(
-            expense_df["Expense Amount"], errors="coerce"
+        monthly_expense = engine.scalar(
+            "expenses", Query("Expense Amount", where=this_month)
         )
-
-        expense_df["datetime"] = pd.to_datetime(
-            expense_df["Date & Time"],
-            format=DATETIME_FMT,
-            errors="coerce"
-        )
-
-        expense_df = expense_df.dropna(subset=["datetime", "Expense Amount"])
-        expense_df["year"] = expense_df["datetime"].dt.year
-        expense_df["month"] = expense_df["datetime"].dt.month
-
-        monthly_expense = expense_df[
-            (expense_df["year"] == current_year) &
-            (expense_df["month"] == current_month)
-        ]["Expense Amount"].sum()
     else:
         monthly_expense = 0.0
 
@@ -919,6 +1051,16 @@ elif section == "📊 Sales Analytics":
 
     st.markdown("---")
 
+    # =================================================
+    # 🔮 Sales Forecast (rolling 7 / 30 / 90-day state)
+    # =================================================
+    st.subheader("🔮 Sales Forecast")
+
+    rolling.sync("sales", df, version)
+    show_forecast(rolling, "sales", "Store")
+
+    st.markdown("---")
+
     # =================================================
     # 1️⃣ Store-wise Sales (Total / Average Per Day)
     # =================================================
@@ -932,32 +1074,62 @@ elif section == "📊 Sales Analytics":
 
     if metric_type == "Total":
         store_df = (
-            df.groupby("Store", as_index=False)["Cash Total"]
-            .sum()
+            engine.run("sales", Query("Cash Total", group_by=("Store",)))
             .rename(columns={"Cash Total": "Total Sales"})
-            .sort_values("Total Sales", ascending=False)
-            .reset_index(drop=True)
         )
         st.caption("Store-wise Total Sales")
 
     else:
-        daily_store_sales = (
-            df.groupby(["date_only", "Store"], as_index=False)["Cash Total"]
-            .sum()
-        )
-
         store_df = (
-            daily_store_sales
-            .groupby("Store", as_index=False)["Cash Total"]
-            .mean()
+            engine.run(
+                "sales",
+                Query("Cash Total", group_by=("Store",), agg="daily_mean")
+            )
             .rename(columns={"Cash Total": "Average Daily Sales"})
-            .sort_values("Average Daily Sales", ascending=False)
-            .reset_index(drop=True)
         )
         st.caption("Store-wise Average Daily Sales")
 
     st.dataframe(store_df, use_container_width=True)
 
+    if branch == ALL_BRANCHES:
+        st.subheader("🏬 Branch-wise Sales")
+
+        branch_sales = (
+            engine.run(
+                "sales",
+                Query(
+                    "Cash Total",
+                    group_by=(BRANCH_COL,),
+                    agg="sum" if metric_type == "Total" else "daily_mean"
+                )
+            )
+            .rename(columns={
+                "Cash Total":
+                    "Total Sales" if metric_type == "Total" else "Average Daily Sales"
+            })
+        )
+
+        st.dataframe(branch_sales, use_container_width=True)
+
+    st.markdown("---")
+
+    # =================================================
+    # 📉 Sales Trend (store-wise lines)
+    # =================================================
+    st.subheader("📉 Sales Trend")
+
+    sales_span = st.radio(
+        "Chart Range", list(RANGES), horizontal=True, key="sales_chart_range"
+    )
+    sales_line_by = BRANCH_COL if branch == ALL_BRANCHES else "Store"
+    show_chart(engine, ChartSpec(
+        "sales",
+        "Cash Total",
+        f"Daily Sales by {sales_line_by} – {sales_span}",
+        *chart_range(sales_span, today_date),
+        line_by=sales_line_by
+    ))
+
     st.markdown("---")
 
     # =================================================
@@ -965,39 +1137,33 @@ elif section == "📊 Sales Analytics":
     # =================================================
     st.subheader("📅 Day-wise Sales (Current Month)")
 
-    month_df = df[
-        (df["year"] == current_year) &
-        (df["month"] == current_month)
-    ]
+    # ---------- Sales per day & store ----------
+    day_store_df = engine.run(
+        "sales",
+        Query("Cash Total", group_by=("Store",), bucket="day", where=this_month)
+    )
 
-    if month_df.empty:
+    if day_store_df.empty:
         st.info("No sales data for the current month.")
         st.stop()
 
-    # ---------- Sales per day & store ----------
-    day_store_df = (
-        month_df
-        .groupby(["date_only", "Store"], as_index=False)["Cash Total"]
-        .sum()
-    )
-
     # ---------- Total sales per day ----------
     daily_sales = (
-        day_store_df
-        .groupby("date_only", as_index=False)["Cash Total"]
-        .sum()
+        engine.run("sales", Query("Cash Total", bucket="day", where=this_month))
         .rename(columns={"Cash Total": "Total Sales"})
     )
 
     # ---------- Expenses per day ----------
-    expense_df["date_only"] = expense_df["datetime"].dt.date
-
-    daily_expense = (
-        expense_df
-        .groupby("date_only", as_index=False)["Expense Amount"]
-        .sum()
-        .rename(columns={"Expense Amount": "Total Expense"})
-    )
+    if not expense_df.empty:
+        daily_expense = (
+            engine.run(
+                "expenses",
+                Query("Expense Amount", bucket="day", where=this_month)
+            )
+            .rename(columns={"Expense Amount": "Total Expense"})
+        )
+    else:
+        daily_expense = pd.DataFrame(columns=["date_only", "Total Expense"])
 
     # ---------- Merge ----------
     final_df = (
@@ -1009,27 +1175,115 @@ elif section == "📊 Sales Analytics":
     final_df["Total Expense"] = final_df["Total Expense"].fillna(0)
     final_df["Profit / Loss"] = final_df["Total Sales"] - final_df["Total Expense"]
 
-    # Show totals only once per date
-    for col in ["Total Sales", "Total Expense", "Profit / Loss"]:
-        final_df[col] = (
-            final_df.groupby("date_only")[col]
-            .transform(lambda x: [""] * (len(x) - 1) + [x.iloc[0]])
-        )
-
     final_df["Date"] = final_df["date_only"].apply(
         lambda x: x.strftime(DATE_FMT)
     )
 
-    final_df = final_df[[
-        "Date",
-        "Store",
-        "Cash Total",
-        "Total Sales",
-        "Total Expense",
-        "Profit / Loss"
-    ]].sort_values(["Date", "Store"],ascending=False).reset_index(drop=True)
+    def day_wise_page(page_df):
+        # Show totals only once per date (per page → whole dates only)
+        page_df = page_df.copy()
+        for col in ["Total Sales", "Total Expense", "Profit / Loss"]:
+            page_df[col] = (
+                page_df.groupby("date_only", sort=False)[col]
+                .transform(lambda x: [""] * (len(x) - 1) + [x.iloc[0]])
+            )
+
+        return page_df[[
+            "Date",
+            "Store",
+            "Cash Total",
+            "Total Sales",
+            "Total Expense",
+            "Profit / Loss"
+        ]]
+
+    # One page = whole days, so a date's store rows are never split
+    paged_table(
+        final_df,
+        key="sales_day_wise",
+        sort_options={
+            "Date": ["date_only", "Store"],
+            "Profit / Loss": ["Profit / Loss", "date_only", "Store"],
+            "Total Sales": ["Total Sales", "date_only", "Store"],
+        },
+        search_cols=["Date", "Store"],
+        group_col="date_only",
+        render=day_wise_page
+    )
 
-    st.dataframe(final_df, use_container_width=True)
+
+# =================================================
+# 📤 EXPORT REPORTS (EXCEL / PDF)
+# =================================================
+elif section == "📤 Export Reports":
+
+    st.markdown("## 📤 Export Reports")
+
+    @st.cache_data(max_entries=24, show_spinner=False)
+    def render_report(fmt, branch, year, month, versions, title, _tables):
+        # Keyed by data versions → re-rendered only when the data changes
+        return to_excel(_tables) if fmt == "xlsx" else to_pdf(_tables, title)
+
+    period_type = st.radio("Period", ["Month", "Year"], horizontal=True)
+
+    col1, col2 = st.columns(2)
+    year = int(col1.number_input(
+        "Year", min_value=2000, max_value=now.year, value=now.year, step=1
+    ))
+    month = None
+    if period_type == "Month":
+        month = col2.selectbox(
+            "Month",
+            list(range(1, 13)),
+            index=now.month - 1,
+            format_func=lambda m: datetime(2000, m, 1).strftime("%B")
+        )
+
+    # ---------- Cached frames → memoized aggregates (no re-fetch) ----------
+    versions = []
+    for source, name, date_col in [
+        ("sales", SALES_SHEET, "date"),
+        ("expenses", EXPENSE_SHEET, "datetime"),
+    ]:
+        df, version = sheet_cache.read(name)
+        if not df.empty:
+            engine.register(source, df, date_col=date_col, version=version)
+        versions.append(version)
+
+    attendance_df, attendance_version = sheet_cache.read(ATTENDANCE_SHEET)
+    versions.append(attendance_version)
+
+    tables = report_tables(engine, attendance_df, year, month)
+
+    label = period_label(year, month)
+    title = f"Monisha Tiffin Center – {label}"
+    if len(BRANCHES) > 1:
+        title += f" ({branch})"
+
+    st.caption(f"Report preview — {label}")
+    st.dataframe(tables["Summary"], use_container_width=True)
+
+    file_stem = f"MTC_Report_{label.replace(' ', '_')}"
+
+    # Files are rendered only when their button is clicked
+    render = partial(render_report, branch=branch, year=year, month=month,
+                     versions=tuple(versions), title=title, _tables=tables)
+
+    col1, col2 = st.columns(2)
+    col1.download_button(
+        "⬇️ Excel",
+        data=partial(render, "xlsx"),
+        file_name=f"{file_stem}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        use_container_width=True
+    )
+    col2.download_button(
+        "⬇️ PDF",
+        data=partial(render, "pdf"),
+        file_name=f"{file_stem}.pdf",
+        mime="application/pdf",
+        use_container_width=True
+    )
 
 
 
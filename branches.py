@@ -0,0 +1,136 @@
+"""
+Branch registry and cross-branch data access.
+
+Each outlet (branch) keeps its own spreadsheet with the usual Sheet1 /
+Attendance / Sales / Daily_Balance layout.  The registry lives in the
+Streamlit secrets:
+
+    [branches]
+    "Main Branch" = "MTC-Digitization"
+    "Anna Nagar" = "MTC-Digitization-AnnaNagar"
+
+and falls back to the single ``SPREADSHEET_NAME`` when absent.
+``BranchSet`` opens every branch concurrently and gives each one its own
+``SheetCache``; ``ConsolidatedCache`` reads all of them in parallel and
+stacks the frames with a ``Branch`` column, so going from one branch to
+several costs the slowest branch, not the sum.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from constants import DEFAULT_BRANCH, SPREADSHEET_NAME
+from sheet_cache import SheetCache, CacheRefresher, TailProbe
+from sheets import authorize, open_worksheets
+
+BRANCH_COL = "Branch"
+
+# Upper bound on concurrent Sheets calls across branches
+MAX_WORKERS = 8
+
+
+def load_branch_registry(secrets):
+    """``{branch name: spreadsheet name}`` in the order declared."""
+    registry = dict(secrets.get("branches", {}) or {})
+    return registry or {DEFAULT_BRANCH: SPREADSHEET_NAME}
+
+
+class BranchSet:
+
+    def __init__(self, spreadsheets, worksheets, caches):
+        self.spreadsheets = spreadsheets
+        self.worksheets = worksheets
+        self.caches = caches
+        self.consolidated = ConsolidatedCache(caches)
+
+    @classmethod
+    def open(cls, service_account_info, registry, probe=True):
+        client = authorize(service_account_info)
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            spreadsheets = dict(zip(
+                registry,
+                pool.map(client.open, registry.values())
+            ))
+            worksheets = dict(zip(
+                registry,
+                pool.map(open_worksheets, spreadsheets.values())
+            ))
+
+        return cls.from_worksheets(spreadsheets, worksheets, probe=probe)
+
+    @classmethod
+    def from_worksheets(cls, spreadsheets, worksheets, probe=True):
+        caches = {
+            branch: SheetCache(
+                worksheets[branch],
+                probe=TailProbe(spreadsheets[branch], worksheets[branch])
+                if probe else None
+            )
+            for branch in worksheets
+        }
+        return cls(spreadsheets, worksheets, caches)
+
+    @property
+    def names(self):
+        return list(self.caches)
+
+    def start_refreshers(self, **kwargs):
+        refreshers = {}
+        for branch, cache in self.caches.items():
+            refreshers[branch] = CacheRefresher(cache, **kwargs)
+            refreshers[branch].start()
+        return refreshers
+
+
+class ConsolidatedCache:
+    """
+    Read-only, ``SheetCache``-compatible view across every branch.
+
+    Versions are the tuple of branch versions, so the aggregation engine
+    memo stays valid until any one branch changes.
+    """
+
+    def __init__(self, caches):
+        self.caches = caches
+        self._pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        self._stacked = {}      # sheet name -> (version, frame)
+        self._lock = threading.Lock()
+
+    def read_each(self, name):
+        """``{branch: (frame, version)}``, fetched concurrently when cold."""
+        futures = {
+            branch: self._pool.submit(cache.read, name)
+            for branch, cache in self.caches.items()
+        }
+        return {branch: future.result() for branch, future in futures.items()}
+
+    def read(self, name):
+        parts = self.read_each(name)
+        version = tuple((branch, v) for branch, (_, v) in parts.items())
+
+        cached = self._stacked.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1], version
+
+        frames = [
+            frame.assign(**{BRANCH_COL: branch})
+            for branch, (frame, _) in parts.items()
+            if not frame.empty
+        ]
+        stacked = (
+            pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        )
+
+        with self._lock:
+            self._stacked[name] = (version, stacked)
+
+        return stacked, version
+
+    def get(self, name):
+        return self.read(name)[0]
+
+    def invalidate(self, *names):
+        for cache in self.caches.values():
+            cache.invalidate(*names)
@@ -0,0 +1,413 @@
+"""
+Streaming bulk import of historical notebook data.
+
+Reads a CSV or Excel file in chunks, validates every row against the
+entry-form choices, rewrites dates and timestamps (DD/MM/YYYY, ISO or
+Excel datetimes in the file) and amounts into the storage encoding of
+``schema`` — the same per-row check as ``validate_rows`` — appends the valid rows
+with one batched ``append_rows`` call per chunk and, when
+Sales or Sheet1 changed, rebuilds Daily_Balance once at the end in a
+single vectorized pass.
+
+    python bulk_import.py expenses notebook_2019.xlsx
+    python bulk_import.py sales sales_2020.csv --rejects bad_rows.csv
+    python bulk_import.py attendance att.csv --branch "Anna Nagar" --dry-run
+
+Input columns use the sheet headers (e.g. "Date & Time", "Category",
+"Expense Amount" ...).  Missing "Entry Timestamp" values are filled with
+the import time.
+
+Sales and Attendance rows whose (Date, Store, Slot) / (Date, Employee
+Name) is already in the sheet — or earlier in the file — are rejected as
+already recorded, so re-running an import adds nothing twice.  Expenses
+have no such key: an expense import is append-only.
+"""
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import gspread
+import pandas as pd
+import pytz
+
+from cli import job_parser, resolve_branches
+from constants import (
+    TIMEZONE,
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET,
+    SHEET_HEADERS, EXPENSE_CATEGORIES, PAYMENT_MODES, EXPENSE_BY,
+    SALES_SLOTS, ABSENT_MARK, PRESENT_MARK,
+)
+from reconcile import reconcile_worksheets
+from schema import (
+    LEGACY_FORMATS, STORED_FORMATS, encode_datetime, normalize_row, parse_dates,
+)
+from sheet_cache import read_records
+from storage import open_branch_set
+
+# Rows per append_rows call — 50k rows ≈ 25 write requests
+CHUNK_ROWS = 2000
+
+# Retries for quota (429) / transient (5xx) Sheets errors
+MAX_RETRIES = 6
+RETRY_STATUSES = {429, 500, 502, 503}
+
+ERROR_COL = "Import Error"
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    sheet: str
+    date_col: str
+    date_kind: str                                  # "date" or "datetime"
+    amount_col: str = None
+    choices: dict = field(default_factory=dict)     # column -> allowed values
+    key_cols: tuple = ()                            # one row per key (none: append-only)
+
+
+IMPORT_SPECS = {
+    "expenses": ImportSpec(
+        sheet=EXPENSE_SHEET,
+        date_col="Date & Time",
+        date_kind="datetime",
+        amount_col="Expense Amount",
+        choices={
+            "Category": EXPENSE_CATEGORIES,
+            "Payment Mode": PAYMENT_MODES,
+            "Expense By": EXPENSE_BY,
+        },
+    ),
+    "sales": ImportSpec(
+        sheet=SALES_SHEET,
+        date_col="Date",
+        date_kind="date",
+        amount_col="Cash Total",
+        key_cols=("Date", "Store", "Slot"),
+    ),
+    "attendance": ImportSpec(
+        sheet=ATTENDANCE_SHEET,
+        date_col="Date",
+        date_kind="date",
+        choices={
+            "Morning": [ABSENT_MARK, PRESENT_MARK],
+            "Night": [ABSENT_MARK, PRESENT_MARK],
+        },
+        key_cols=("Date", "Employee Name"),
+    ),
+}
+
+
+# =================================================
+# 📥 STREAMING READERS
+# =================================================
+def _excel_cell(value):
+    # Excel hands back real datetimes / numbers — keep them unparsed
+    return "" if value is None else value
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield DataFrames of at most ``chunk_rows`` rows without loading the file."""
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            while header and header[-1] is None:
+                header.pop()
+
+            # Blank header cells keep their position → columns stay aligned
+            header = [
+                f"Unnamed: {i}" if h is None else str(h).strip()
+                for i, h in enumerate(header)
+            ]
+
+            buffer = []
+            for row in rows:
+                if not any(v not in (None, "") for v in row):
+                    continue
+                row = list(row[:len(header)]) + [None] * (len(header) - len(row))
+                buffer.append([_excel_cell(v) for v in row])
+                if len(buffer) >= chunk_rows:
+                    yield pd.DataFrame(buffer, columns=header)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header)
+        finally:
+            workbook.close()
+        return
+
+    reader = pd.read_csv(
+        path,
+        dtype=str,
+        keep_default_na=False,
+        chunksize=chunk_rows,
+        skipinitialspace=True,
+    )
+    for chunk in reader:
+        chunk.columns = [c.strip() for c in chunk.columns]
+        yield chunk
+
+
+# =================================================
+# ✅ VALIDATION (VECTORIZED PER CHUNK)
+# =================================================
+def _canonical_dates(values, kind):
+    """Legacy / ISO strings (or real datetimes) → stored ISO strings / NaN."""
+    fmt = STORED_FORMATS[kind]
+    parsed = parse_dates(
+        values.map(lambda v: v.strftime(fmt) if hasattr(v, "strftime") else str(v).strip()),
+        kind
+    )
+    return parsed.dt.strftime(fmt)
+
+
+def validate_chunk(chunk, spec, now_str):
+    """Split a chunk into (rows ready to append, rejected rows with reasons)."""
+    header = SHEET_HEADERS[spec.sheet]
+
+    missing = [c for c in header if c not in chunk.columns and c != "Entry Timestamp"]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    df = chunk.copy()
+    if "Entry Timestamp" in header:
+        if "Entry Timestamp" not in df.columns:
+            df["Entry Timestamp"] = ""
+        df["Entry Timestamp"] = df["Entry Timestamp"].replace("", now_str)
+
+    errors = pd.Series("", index=df.index)
+
+    def flag(mask, message):
+        errors.loc[mask & (errors == "")] = message
+
+    # ---------- Date / Date & Time ----------
+    dates = _canonical_dates(df[spec.date_col], spec.date_kind)
+    flag(dates.isna(), (
+        f"{spec.date_col} not in {LEGACY_FORMATS[spec.date_kind]} "
+        f"or {STORED_FORMATS[spec.date_kind]}"
+    ))
+    df[spec.date_col] = dates
+
+    # ---------- Amount ----------
+    if spec.amount_col:
+        amounts = pd.to_numeric(
+            df[spec.amount_col].astype(str).str.replace(",", "").str.strip(),
+            errors="coerce"
+        )
+        flag(amounts.isna(), f"{spec.amount_col} is not a number")
+        flag(amounts < 0, f"{spec.amount_col} is negative")
+        df[spec.amount_col] = amounts.round(2)
+
+    # ---------- Fixed choices ----------
+    for col, allowed in spec.choices.items():
+        values = df[col].astype(str).str.strip()
+        flag(~values.isin(allowed), f"{col} not one of {', '.join(allowed)}")
+        df[col] = values
+
+    if spec.sheet == SALES_SHEET:
+        df["Store"] = df["Store"].astype(str).str.strip()
+        df["Slot"] = df["Slot"].astype(str).str.strip()
+        pairs = pd.Series(list(zip(df["Store"], df["Slot"])), index=df.index)
+        flag(~pairs.isin(SALES_SLOTS), "Store / Slot is not a Sales Entry slot")
+
+    if spec.sheet == ATTENDANCE_SHEET:
+        df["Employee Name"] = df["Employee Name"].astype(str).str.strip()
+        flag(df["Employee Name"] == "", "Employee Name is empty")
+
+    # ---------- Storage encoding (as validate_rows, one row at a time) ----------
+    # Also covers the columns checked nowhere above, e.g. an "Entry
+    # Timestamp" that Excel hands back as a datetime or in DD/MM/YYYY HH:MM
+    ok = errors == ""
+    encoded = []
+    for idx, row in zip(df.index[ok], df.loc[ok, header].values.tolist()):
+        values, problems = normalize_row(spec.sheet, row)
+        if problems:
+            col, message = problems[0]
+            errors.loc[idx] = f"{col}: {message}"
+        encoded.append(values)
+    rows = pd.DataFrame(encoded, index=df.index[ok], columns=header)
+
+    bad = errors != ""
+    rejects = chunk[bad].assign(**{ERROR_COL: errors[bad]})
+    return rows.loc[~bad[ok]], rejects
+
+
+def recorded_keys(worksheet, spec):
+    """Keys of the rows already in ``worksheet`` (dates in storage encoding)."""
+    if not spec.key_cols:
+        return set()
+
+    df = pd.DataFrame(read_records(worksheet))
+    if df.empty:
+        return set()
+
+    df[spec.date_col] = _canonical_dates(df[spec.date_col], spec.date_kind)
+    keys = df[list(spec.key_cols)].astype(str).apply(lambda c: c.str.strip())
+    return set(keys.itertuples(index=False, name=None))
+
+
+def drop_recorded(chunk, rows, spec, seen):
+    """
+    Split validated ``rows`` into new ones and rejects whose key is in
+    ``seen`` (already in the sheet or earlier in the file); new keys are
+    added to ``seen``.
+    """
+    if not spec.key_cols or rows.empty:
+        return rows, chunk.iloc[:0].assign(**{ERROR_COL: ""})
+
+    keys = list(rows[list(spec.key_cols)].astype(str).itertuples(index=False, name=None))
+
+    duplicate = []
+    for key in keys:
+        duplicate.append(key in seen)
+        seen.add(key)
+
+    duplicate = pd.Series(duplicate, index=rows.index)
+    rejects = chunk.loc[duplicate[duplicate].index].assign(
+        **{ERROR_COL: f"{' / '.join(spec.key_cols)} already recorded"}
+    )
+    return rows[~duplicate], rejects
+
+
+# =================================================
+# ✍️ BATCHED WRITES
+# =================================================
+def _with_backoff(fn, *args, **kwargs):
+    for attempt in range(MAX_RETRIES):
+        try:
+            return fn(*args, **kwargs)
+        except gspread.exceptions.APIError as exc:
+            status = getattr(getattr(exc, "response", None), "status_code", None)
+            if status not in RETRY_STATUSES or attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(min(2 ** attempt, 60))
+
+
+def import_file(
+    worksheets,
+    kind,
+    path,
+    now_str,
+    chunk_rows=CHUNK_ROWS,
+    rejects_path=None,
+    dry_run=False,
+    rebuild_balance=True,
+    progress=None
+):
+    """Stream ``path`` into the ``kind`` sheet; returns (imported, rejected)."""
+    spec = IMPORT_SPECS[kind]
+    worksheet = worksheets[spec.sheet]
+
+    imported = rejected = 0
+    wrote_header = False
+    seen = _with_backoff(recorded_keys, worksheet, spec)
+
+    for chunk in iter_chunks(path, chunk_rows):
+        rows, rejects = validate_chunk(chunk, spec, now_str)
+
+        # Re-runs / repeated rows would double-count Sales and leave
+        rows, recorded = drop_recorded(chunk, rows, spec, seen)
+        rejects = pd.concat([rejects, recorded]) if not recorded.empty else rejects
+
+        if not rows.empty and not dry_run:
+            _with_backoff(
+                worksheet.append_rows,
+                rows.astype(object).values.tolist(),
+                value_input_option="RAW"
+            )
+
+        if not rejects.empty and rejects_path:
+            rejects.to_csv(
+                rejects_path,
+                mode="a" if wrote_header else "w",
+                header=not wrote_header,
+                index=False
+            )
+            wrote_header = True
+
+        imported += len(rows)
+        rejected += len(rejects)
+
+        if progress is not None:
+            progress(imported, rejected)
+
+    # ---------- Daily_Balance: one vectorized rebuild at the end ----------
+    if rebuild_balance and not dry_run and imported and spec.sheet in (
+        EXPENSE_SHEET, SALES_SHEET
+    ):
+        rebuild_daily_balance(worksheets, now_str)
+
+    return imported, rejected
+
+
+def rebuild_daily_balance(worksheets, now_str):
+    # Full reconcile: rewritten in one batch only if anything drifted
+    return _with_backoff(reconcile_worksheets, worksheets, now_str, apply=True)
+
+
+# =================================================
+# 🖥️ CLI
+# =================================================
+def parse_args(argv=None):
+    parser = job_parser(
+        __doc__, "Target branch (default: the first registered branch)", single_branch=True
+    )
+    parser.add_argument("kind", choices=sorted(IMPORT_SPECS))
+    parser.add_argument("path", help="CSV or Excel (.xlsx) file")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument(
+        "--rejects",
+        help="CSV file for rows that failed validation (with the reason)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate only; write nothing"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    secrets, registry = resolve_branches(args)
+    if registry is None:
+        return 2
+    branch = next(iter(registry))
+
+    branch_set = open_branch_set(
+        secrets, {branch: registry[branch]}, probe=False
+    )
+
+    now_str = encode_datetime(datetime.now(pytz.timezone(TIMEZONE)))
+    started = time.time()
+
+    def progress(imported, rejected):
+        print(f"\r{imported:,} imported, {rejected:,} rejected", end="", flush=True)
+
+    imported, rejected = import_file(
+        branch_set.worksheets[branch],
+        args.kind,
+        args.path,
+        now_str,
+        chunk_rows=args.chunk_rows,
+        rejects_path=args.rejects,
+        dry_run=args.dry_run,
+        progress=progress
+    )
+
+    print(
+        f"\n[{branch}] {imported:,} row(s) "
+        f"{'validated' if args.dry_run else 'imported'}, "
+        f"{rejected:,} rejected in {time.time() - started:,.1f}s"
+    )
+    return 1 if rejected and not imported else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Cached, downsampled trend charts for the analytics pages.
+
+Series come from the aggregation engine's memoized daily results, are
+cut to the requested date range and downsampled with
+Largest-Triangle-Three-Buckets (keeps peaks, dips and overall shape)
+before plotting.  PNGs are rendered on a background worker and cached
+by (source, data version, chart spec) — so a chart is drawn once per
+data change and every later page load just sends the bytes.  Only a
+cold chart holds up the page, for at most ``RENDER_WAIT``; a render that
+fails is reported to the caller, which falls back to ``fallback_frame``.
+"""
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from aggregations import Query
+
+# Points per line after downsampling (≈ pixels across a phone chart)
+MAX_POINTS = 300
+
+# Rendered charts kept per process
+MAX_CHARTS = 64
+
+# How long a page waits for a chart that is not cached yet (most renders
+# finish within it; slower ones show on the next rerun)
+RENDER_WAIT = 0.5
+
+RANGES = {
+    "3 Months": 91,
+    "1 Year": 365,
+    "All": None,
+}
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    source: str
+    metric: str
+    title: str
+    start: object = None        # date or None (from the first day)
+    end: object = None          # date or None (to the last day)
+    line_by: str = None         # one line per value, e.g. "Store"
+    total: bool = True          # add a line for the total across lines
+
+
+def chart_range(label, today):
+    """(start, end) dates for a ``RANGES`` label ending ``today``."""
+    days = RANGES[label]
+    if days is None:
+        return None, today
+    return today - pd.Timedelta(days=days - 1), today
+
+
+# =================================================
+# 📉 DOWNSAMPLING (LTTB)
+# =================================================
+def downsample(x, y, max_points=MAX_POINTS):
+    """
+    Largest-Triangle-Three-Buckets on numeric ``x`` / ``y`` arrays;
+    returns the indices of the points to keep (first and last always).
+    """
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Interior buckets (first / last points are fixed)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = [0]
+
+    for i in range(len(edges) - 1):
+        lo, hi = edges[i], edges[i + 1]
+        if hi <= lo:
+            continue
+
+        # Average of the next bucket (or the last point)
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        ax, ay = x[keep[-1]], y[keep[-1]]
+        area = np.abs(
+            (ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay)
+        )
+        keep.append(lo + int(area.argmax()))
+
+    keep.append(n - 1)
+    return np.asarray(keep)
+
+
+# =================================================
+# 🧮 SERIES
+# =================================================
+def chart_series(engine, spec):
+    """``{line label: Series indexed by day}`` for ``spec`` (not downsampled)."""
+    group_by = (spec.line_by,) if spec.line_by else ()
+    daily = engine.run(spec.source, Query(spec.metric, group_by=group_by, bucket="day"))
+    if daily.empty:
+        return {}
+
+    daily["date_only"] = pd.to_datetime(daily["date_only"])
+    if spec.start is not None:
+        daily = daily[daily["date_only"] >= pd.Timestamp(spec.start)]
+    if spec.end is not None:
+        daily = daily[daily["date_only"] <= pd.Timestamp(spec.end)]
+    if daily.empty:
+        return {}
+
+    if not spec.line_by:
+        return {spec.metric: daily.groupby("date_only")[spec.metric].sum().sort_index()}
+
+    wide = (
+        daily.pivot_table(
+            index="date_only", columns=spec.line_by, values=spec.metric, aggfunc="sum",
+            observed=True,
+        )
+        .fillna(0.0)
+        .sort_index()
+    )
+    lines = {str(col): wide[col] for col in wide.columns}
+    if spec.total and len(lines) > 1:
+        lines["Total"] = wide.sum(axis=1)
+    return lines
+
+
+def fallback_frame(engine, spec, max_points=MAX_POINTS):
+    """
+    ``spec``'s lines as one wide frame for a native (``st.line_chart``)
+    chart when the PNG cannot be rendered — downsampled on the sum of
+    the lines.
+    """
+    lines = chart_series(engine, spec)
+    if not lines:
+        return pd.DataFrame()
+
+    wide = pd.DataFrame(lines).fillna(0.0)
+    days = wide.index.to_numpy(dtype="datetime64[D]").astype(float)
+    return wide.iloc[downsample(days, wide.sum(axis=1).to_numpy(), max_points)]
+
+
+# =================================================
+# 🖼️ RENDERING
+# =================================================
+def render_png(lines, title):
+    from matplotlib.figure import Figure
+    import matplotlib.dates as mdates
+
+    fig = Figure(figsize=(6.4, 3.4), dpi=110)
+    ax = fig.add_subplot(111)
+
+    for label, series in lines.items():
+        days = mdates.date2num(series.index.to_pydatetime())
+        idx = downsample(days, series.values)
+        ax.plot(
+            series.index[idx],
+            series.values[idx],
+            label=label,
+            linewidth=2.0 if label == "Total" else 1.2,
+        )
+
+    ax.set_title(title, fontsize=11, loc="left")
+    ax.grid(alpha=0.3)
+    ax.yaxis.set_major_formatter(lambda v, _: f"₹{v:,.0f}")
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=6))
+    ax.xaxis.set_major_formatter(
+        mdates.ConciseDateFormatter(ax.xaxis.get_major_locator())
+    )
+    if len(lines) > 1:
+        ax.legend(fontsize=8, ncol=min(len(lines), 4), frameon=False, loc="upper left")
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    """
+    Process-wide PNG cache with a background render worker.
+
+    ``get`` never renders on the caller's thread: it returns cached
+    bytes (``b""`` when the range has no data), or schedules the render
+    and waits at most ``wait`` seconds (None → not ready yet; the next
+    rerun picks it up).  A failed render re-raises its error in the
+    caller and is retried on the next ``get``.
+    """
+
+    def __init__(self, max_charts=MAX_CHARTS, workers=1):
+        self.max_charts = max_charts
+        self._charts = OrderedDict()    # (engine, version, spec) -> PNG (b"" = no data)
+        self._pending = {}              # (engine, version, spec) -> Future
+        self._lock = threading.Lock()
+
+        # matplotlib is not thread-safe across figures → one worker
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="charts")
+
+    def get(self, engine, spec, wait=RENDER_WAIT):
+        key = (id(engine), engine.version(spec.source), spec)
+
+        with self._lock:
+            png = self._charts.get(key)
+            if png is not None:
+                self._charts.move_to_end(key)
+                return png
+
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pool.submit(self._render, engine, key)
+                self._pending[key] = future
+
+        try:
+            return future.result(timeout=wait)
+        except TimeoutError:
+            return None
+
+    def _render(self, engine, key):
+        engine_id, _, spec = key
+        try:
+            lines = chart_series(engine, spec)
+            png = render_png(lines, spec.title) if lines else b""
+        except Exception:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+
+        with self._lock:
+            self._pending.pop(key, None)
+
+            # Older versions of the same chart are never asked for again
+            for old in [k for k in self._charts if k[0] == engine_id and k[2] == spec]:
+                del self._charts[old]
+
+            self._charts[key] = png
+            while len(self._charts) > self.max_charts:
+                self._charts.popitem(last=False)
+
+        return png
@@ -0,0 +1,60 @@
+"""
+Command-line plumbing shared by the headless jobs.
+
+Every job reads the Streamlit secrets file (``--secrets``) and works on
+the registered branches, optionally narrowed with ``--branch``:
+
+    parser = job_parser(__doc__, branch_help="Branch to close")
+    args = parser.parse_args(argv)
+    secrets, registry = resolve_branches(args)
+"""
+import argparse
+import sys
+import tomllib
+
+from branches import load_branch_registry
+
+SECRETS_FILE = ".streamlit/secrets.toml"
+
+
+def job_parser(doc, branch_help, single_branch=False):
+    """Parser with ``--secrets`` and ``--branch`` (repeatable unless ``single_branch``)."""
+    parser = argparse.ArgumentParser(description=doc.strip().splitlines()[0])
+    parser.add_argument(
+        "--secrets",
+        default=SECRETS_FILE,
+        help="Streamlit secrets file holding [gcp_service_account] / [storage]"
+    )
+    parser.add_argument(
+        "--branch",
+        action="store" if single_branch else "append",
+        help=branch_help
+    )
+    return parser
+
+
+def load_secrets(path):
+    with open(path, "rb") as fh:
+        return tomllib.load(fh)
+
+
+def resolve_branches(args):
+    """
+    ``(secrets, registry)`` for parsed job ``args``; the registry is
+    narrowed to ``--branch`` and is None (reported on stderr) when a
+    branch is not registered.
+    """
+    secrets = load_secrets(args.secrets)
+    registry = load_branch_registry(secrets)
+
+    names = args.branch
+    if not names:
+        return secrets, registry
+    if isinstance(names, str):
+        names = [names]
+
+    unknown = [b for b in names if b not in registry]
+    if unknown:
+        print(f"Unknown branch: {', '.join(unknown)}", file=sys.stderr)
+        return secrets, None
+    return secrets, {b: registry[b] for b in names}
@@ -0,0 +1,80 @@
+# =================================================
+# GLOBAL DATE STANDARDS (DO NOT CHANGE)
+# =================================================
+DATE_FMT = "%d/%m/%Y"
+DATETIME_FMT = "%d/%m/%Y %H:%M"
+
+TIMEZONE = "Asia/Kolkata"
+
+# -------------------------------------------------
+# Storage Encoding (what is written to the sheets)
+# DATE_FMT / DATETIME_FMT stay the display + entry formats; rows are
+# stored as ISO so reads parse on pandas' vectorized fast path
+# -------------------------------------------------
+STORED_DATE_FMT = "%Y-%m-%d"
+STORED_DATETIME_FMT = "%Y-%m-%d %H:%M"
+
+# -------------------------------------------------
+# Google Sheets Layout
+# -------------------------------------------------
+SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive"
+]
+
+SPREADSHEET_NAME = "MTC-Digitization"
+
+# Branch used when secrets define no [branches] registry
+DEFAULT_BRANCH = "Main Branch"
+
+EXPENSE_SHEET = "Sheet1"
+ATTENDANCE_SHEET = "Attendance"
+SALES_SHEET = "Sales"
+BALANCE_SHEET = "Daily_Balance"
+
+SHEET_HEADERS = {
+    EXPENSE_SHEET: [
+        "Date & Time", "Category", "Sub-Category",
+        "Expense Amount", "Payment Mode", "Expense By",
+    ],
+    ATTENDANCE_SHEET: [
+        "Date", "Employee Name", "Morning", "Night", "Entry Timestamp",
+    ],
+    SALES_SHEET: [
+        "Date", "Store", "Slot", "Cash Total", "Entry Timestamp",
+    ],
+    BALANCE_SHEET: [
+        "Date", "Opening Balance", "Total Sales", "Total Expense",
+        "Closing Balance", "Entry Timestamp",
+    ],
+}
+
+# -------------------------------------------------
+# Entry Form Choices
+# -------------------------------------------------
+EXPENSE_CATEGORIES = [
+    "Groceries","Vegetables","Gas","Oil & Ghee","Non-Veg",
+    "Milk","Banana Leaf","Maintenance","Electricity",
+    "Rent","Salary and Advance","Transportation","Others"
+]
+
+PAYMENT_MODES = ["Cash","UPI","Cheque"]
+
+EXPENSE_BY = ["RK","AR","YS"]
+
+# (Store, Slot) pairs recorded by the Sales Entry form
+SALES_SLOTS = [
+    ("Bigstreet", "Morning"),
+    ("Bigstreet", "Night"),
+    ("Main", "Full Day"),
+    ("Orders", "Full Day"),
+]
+
+EMPLOYEES = [
+    "Vinoth","Ravi","Mani","Ansari","Kumar","Sakthi","Vijaya","Hari",
+    "Samuthuram","Ramesh","Punitha","Vembu","Babu","Latha",
+    "Indhra","Ambika","RY","YS","Poosari","Balaji"
+]
+
+ABSENT_MARK = "✖"
+PRESENT_MARK = "✔"
@@ -0,0 +1,107 @@
+"""
+Expense and Sales entry saves shared by the Streamlit app and the load test.
+
+Each save claims its submission key before writing (double-tap / rerun
+protection) and hands it back when the sheet write fails — a retry
+after a Sheets error (429, network) is then saved instead of being
+reported as already recorded.  Once the rows are in, the key stays
+claimed: a Daily_Balance update failing after that is left to the
+reconciliation audit rather than writing the rows a second time.
+
+A Sales overwrite appends the new rows before deleting the ones they
+replace, so a failure at any step leaves Sales and Daily_Balance in
+agreement: nothing changed, or both the old and the new rows are kept
+and counted.
+"""
+import pandas as pd
+
+from ledger import claim_submission, ledger_lock, release_submission, upsert_daily_balance
+from schema import date_keys
+from storage import find_rows
+
+
+def record_expenses(expense_sheet, balance_sheet, submission, rows, target_date, now_str=""):
+    """
+    Append validated Sheet1 ``rows`` and add their total to the day's
+    Daily_Balance.  False when ``submission`` was already recorded.
+    """
+    if not claim_submission(submission):
+        return False
+
+    # One append for the whole batch → no half-written submits
+    if rows:
+        try:
+            expense_sheet.append_rows(rows)
+        except Exception:
+            release_submission(submission)
+            raise
+
+    total_expense = float(sum(r[3] for r in rows))
+    if total_expense > 0:
+        upsert_daily_balance(
+            balance_sheet=balance_sheet,
+            target_date=target_date,
+            delta_expense=total_expense,
+            now_str=now_str
+        )
+    return True
+
+
+def record_sales(sales_sheet, balance_sheet, submission, rows, target_date, now_str=""):
+    """
+    Replace the day's Sales rows for the (store, slot) pairs in ``rows``
+    and add the difference to Daily_Balance.  False when ``submission``
+    was already recorded.
+    """
+    if not claim_submission(submission):
+        return False
+
+    slots = {(r[1], r[2]) for r in rows}
+    appended = False
+    removed = []
+
+    try:
+        # Row deletes shift indices → one writer per Sales sheet at a time
+        with ledger_lock(sales_sheet):
+            # New rows go in first: a failed append leaves the day as it was
+            try:
+                replaced = [
+                    (idx, r) for idx, r in find_rows(sales_sheet, Date=date_keys(target_date))
+                    if (r[1], r[2]) in slots
+                ]
+                if rows:
+                    sales_sheet.append_rows(rows)
+            except Exception:
+                release_submission(submission)
+                raise
+            appended = True
+
+            # ---------- Remove existing entries for same date/store/slot ----------
+            # They sit above the appended rows, so their row numbers still hold
+            for idx, r in reversed(replaced):
+                sales_sheet.delete_rows(idx)
+                removed.append(r)
+    finally:
+        # ---------- Update Daily Balance ----------
+        # Books the rows actually removed, even when a later delete
+        # failed, so Daily_Balance keeps matching the Sales rows left
+        if appended and rows:
+            # Overwrites only add the difference → no double counting
+            upsert_daily_balance(
+                balance_sheet=balance_sheet,
+                target_date=target_date,
+                delta_sales=sum(r[3] for r in rows) - _total(removed),
+                now_str=now_str
+            )
+    return True
+
+
+def _total(rows):
+    """Sum of the Cash Total cells of sheet ``rows`` (blanks count as 0)."""
+    return float(
+        pd.to_numeric(
+            pd.Series([r[3] for r in rows], dtype=object)
+            .astype(str).str.replace(",", ""),
+            errors="coerce"
+        ).fillna(0).sum()
+    )
@@ -0,0 +1,111 @@
+"""
+Typed DataFrames built from raw worksheet records.
+
+Parsing lives here once so the app, the analytics engine and headless
+jobs all agree on the storage encoding in ``schema``: ISO dates parsed in
+one vectorized pass, numeric amounts, and the fixed entry-form choices
+loaded as categoricals.
+"""
+import pandas as pd
+
+from constants import (
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET,
+    EXPENSE_CATEGORIES, PAYMENT_MODES, EXPENSE_BY,
+)
+from schema import STORES, SLOTS, as_category, parse_amounts, parse_dates
+
+
+def expense_frame(records):
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+
+    df["Expense Amount"] = parse_amounts(df["Expense Amount"])
+    df["datetime"] = parse_dates(df["Date & Time"], "datetime")
+
+    # Only rows written before the validator (unmigrated) can fail here
+    df = df.dropna(subset=["datetime", "Expense Amount"])
+
+    df["Category"] = as_category(df["Category"], EXPENSE_CATEGORIES)
+    df["Payment Mode"] = as_category(df["Payment Mode"], PAYMENT_MODES)
+    df["Expense By"] = as_category(df["Expense By"], EXPENSE_BY)
+
+    # 🔑 Normalize missing sub-categories
+    df["Sub-Category"] = (
+        df["Sub-Category"]
+        .fillna("")
+        .astype(str)
+        .str.strip()
+        .replace("", "Miscellaneous Expenses")
+    )
+
+    return df
+
+
+def sales_frame(records):
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+
+    df["Cash Total"] = parse_amounts(df["Cash Total"])
+    df["date"] = parse_dates(df["Date"])
+
+    df = df.dropna(subset=["date", "Cash Total"])
+
+    df["Store"] = as_category(df["Store"], STORES)
+    df["Slot"] = as_category(df["Slot"], SLOTS)
+
+    return df
+
+
+def balance_frame(records):
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+
+    df["date"] = parse_dates(df["Date"])
+
+    for col in ["Opening Balance", "Total Sales", "Total Expense", "Closing Balance"]:
+        df[col] = parse_amounts(df[col])
+
+    return df
+
+
+def attendance_frame(records):
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+
+    # -------------------------------------------------
+    # Date Cleaning (ISO; legacy DD/MM/YYYY rows still accepted)
+    # -------------------------------------------------
+    df["date"] = parse_dates(df["Date"])
+    df = df.dropna(subset=["date"])
+
+    df["year"] = df["date"].dt.year
+    df["month"] = df["date"].dt.month
+    df["date_only"] = df["date"].dt.date
+
+    # -------------------------------------------------
+    # Absence Calculation
+    # Morning ✖ = 1 shift
+    # Night ✖ = 1 shift
+    # 2 shifts = 1 leave day
+    # -------------------------------------------------
+    df["absent_shifts"] = (
+        (df["Morning"] == "✖").astype(int) +
+        (df["Night"] == "✖").astype(int)
+    )
+
+    df["leave_days"] = df["absent_shifts"] / 2
+
+    return df
+
+
+# Worksheet name → parser for its typed frame
+PARSERS = {
+    EXPENSE_SHEET: expense_frame,
+    ATTENDANCE_SHEET: attendance_frame,
+    SALES_SHEET: sales_frame,
+    BALANCE_SHEET: balance_frame,
+}
@@ -0,0 +1,49 @@
+"""
+Incremental sync of running state with a cached, append-mostly frame.
+
+Shared by ``rolling.RollingStats`` and ``anomalies.ExpenseMonitor``: a
+``FrameCursor`` keeps the version, the row count and a hash of the last
+row of the frame it was last synced to.  When a newer frame is longer
+and still holds that row at the same position, only the rows after it
+are new (the common case — submits append); anything else (a Sales
+overwrite, a delete, an edit with no new rows) calls for one rebuild.
+The check costs one row hash whatever the frame's length.  An edit to
+an older row that lands together with an append is not seen until the
+next rebuild — the price of not re-hashing the whole history.
+"""
+import pandas as pd
+
+
+class FrameCursor:
+
+    def __init__(self, columns):
+        self.columns = list(columns)        # columns identifying a row's content
+        self._version = None
+        self._count = None                  # rows in the synced frame
+        self._last = None                   # hash of its last row
+
+    def _row_hash(self, frame, position):
+        row = frame[self.columns].iloc[position:position + 1]
+        return int(pd.util.hash_pandas_object(row, index=False).iloc[0])
+
+    def pending(self, frame, version):
+        """
+        What ``frame`` brings since the last ``advance``: None when it is
+        still at ``version``, ``(new rows, True)`` when rows were only
+        appended, ``(frame, False)`` when the state must be rebuilt.
+        """
+        if self._count is not None and version == self._version:
+            return None
+
+        count = self._count
+        if count is not None and len(frame) > count and (
+            count == 0 or self._row_hash(frame, count - 1) == self._last
+        ):
+            return frame.iloc[count:], True
+        return frame, False
+
+    def advance(self, frame, version):
+        """Mark ``frame`` (at ``version``) as applied."""
+        self._version = version
+        self._count = len(frame)
+        self._last = self._row_hash(frame, len(frame) - 1) if len(frame) else None
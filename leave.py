@@ -0,0 +1,314 @@
+"""
+Per-employee attendance counters for the leave reports.
+
+Keeps, per employee, the absent shifts of every day in a dense array
+next to its running (prefix) sums, plus per-month totals.  Month and
+year views read the monthly counters; any custom date range is one
+subtraction of two prefix sums — O(1) per employee either way.  Saving a
+day's attendance (overwrites included) updates the day in place: the
+prefix sums from that day on shift by the difference in one vectorized
+add, with no pass over the rest of the history.
+
+``LeaveCounters.sync`` builds the counters once from the cached
+Attendance frame and only rebuilds when the sheet disagrees with them
+(e.g. rows edited by hand); saves made through the app are recorded
+with ``record_day`` and adopted without a rebuild.
+"""
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Extra days allocated whenever a later day arrives (amortizes growth)
+GROWTH_DAYS = 366
+
+# date.toordinal() of 1970-01-01 (datetime64[D] counts days from it)
+EPOCH_ORDINAL = 719163
+
+# Leave days in the range that make someone a frequent absentee
+FREQUENT_LEAVE_DAYS = 3.0
+
+
+def _ordinal(day):
+    return pd.Timestamp(day).toordinal()
+
+
+def _month_key(ordinal):
+    day = pd.Timestamp.fromordinal(ordinal)
+    return day.year, day.month
+
+
+def _pad_running(cum, rows, before, after):
+    # Running sums start at 0 before the old first day and carry the
+    # last total forward past the old last day
+    cum = np.pad(cum, ((0, rows), (before, 0)))
+    if after:
+        last = cum[:, -1:] if cum.shape[1] else np.zeros((cum.shape[0], 1), cum.dtype)
+        cum = np.hstack([cum, np.repeat(last, after, axis=1)])
+    return cum
+
+
+class LeaveCounters:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._employees = {}                    # name -> row in the arrays
+        self._origin = None                     # ordinal of column 0
+        self._last = None                       # latest recorded ordinal
+        self._shifts = np.zeros((0, 0), dtype=np.int16)     # absent shifts per day
+        self._cum_shifts = np.zeros((0, 0), dtype=np.int32)  # running sums of _shifts
+        self._cum_days = np.zeros((0, 0), dtype=np.int32)    # running days with an absence
+        self._months = defaultdict(Counter)     # name -> (year, month) -> absent shifts
+        self._day_rows = {}                     # ordinal -> attendance rows that day
+        self._rows = 0
+        self._total = 0
+        self._version = None
+
+    # -------------------------------------------------
+    # Storage
+    # -------------------------------------------------
+    def _ensure(self, names, first, last):
+        """Grow the arrays to cover ``names`` and ordinals ``first..last``."""
+        for name in names:
+            if name not in self._employees:
+                self._employees[name] = len(self._employees)
+
+        if self._origin is None:
+            self._origin = first
+
+        before = max(0, self._origin - first)
+        after = max(0, last - self._origin - self._shifts.shape[1] + 1)
+        if after:
+            after += GROWTH_DAYS
+        rows = len(self._employees) - self._shifts.shape[0]
+        if not (before or after or rows):
+            return
+
+        self._shifts = np.pad(self._shifts, ((0, rows), (before, after)))
+        self._cum_shifts = _pad_running(self._cum_shifts, rows, before, after)
+        self._cum_days = _pad_running(self._cum_days, rows, before, after)
+        self._origin -= before
+
+    def _set(self, name, ordinal, shifts):
+        row = self._employees[name]
+        col = ordinal - self._origin
+        old = int(self._shifts[row, col])
+        if old == shifts:
+            return
+
+        self._shifts[row, col] = shifts
+        self._cum_shifts[row, col:] += shifts - old
+        self._cum_days[row, col:] += int(shifts > 0) - int(old > 0)
+        self._months[name][_month_key(ordinal)] += shifts - old
+        self._total += shifts - old
+
+    # -------------------------------------------------
+    # Updates
+    # -------------------------------------------------
+    def record_day(self, day, absences):
+        """
+        Replace ``day`` with ``{employee: (morning absent, night absent)}``
+        — the rows the Attendance form just wrote for that date.
+        """
+        ordinal = _ordinal(day)
+        with self._lock:
+            self._ensure(absences, ordinal, ordinal)
+
+            col = ordinal - self._origin
+            for name, row in self._employees.items():
+                if name not in absences and self._shifts[row, col]:
+                    self._set(name, ordinal, 0)
+
+            for name, (morning, night) in absences.items():
+                self._set(name, ordinal, int(bool(morning)) + int(bool(night)))
+
+            self._last = ordinal if self._last is None else max(self._last, ordinal)
+            self._rows += len(absences) - self._day_rows.get(ordinal, 0)
+            self._day_rows[ordinal] = len(absences)
+
+    def sync(self, frame, version):
+        """Build from the cached Attendance ``frame`` unless already in step."""
+        with self._lock:
+            if version == self._version:
+                return
+
+            rows = len(frame)
+            total = int(frame["absent_shifts"].sum()) if rows else 0
+            if self._version is None or (rows, total) != (self._rows, self._total):
+                self._rebuild(frame)
+
+            self._version = version
+
+    def _rebuild(self, frame):
+        self._reset()
+        if frame.empty:
+            return
+
+        # datetime64 → day ordinal without a per-row conversion
+        days = (
+            frame["date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+            + EPOCH_ORDINAL
+        )
+        daily = (
+            pd.DataFrame({
+                "name": frame["Employee Name"].astype(str).to_numpy(),
+                "year": frame["year"].to_numpy(),
+                "month": frame["month"].to_numpy(),
+                "day": days,
+                "shifts": frame["absent_shifts"].astype(int).to_numpy(),
+            })
+            .groupby(["name", "year", "month", "day"], as_index=False)["shifts"].sum()
+        )
+
+        self._ensure(sorted(daily["name"].unique()), int(days.min()), int(days.max()))
+
+        rows = daily["name"].map(self._employees).to_numpy()
+        cols = daily["day"].to_numpy() - self._origin
+        np.add.at(self._shifts, (rows, cols), daily["shifts"].to_numpy())
+
+        self._cum_shifts = np.cumsum(self._shifts, axis=1, dtype=np.int32)
+        self._cum_days = np.cumsum(self._shifts > 0, axis=1, dtype=np.int32)
+
+        months = daily.groupby(["name", "year", "month"])["shifts"].sum()
+        for (name, year, month), shifts in months.items():
+            self._months[name][(int(year), int(month))] = int(shifts)
+
+        self._last = int(days.max())
+        self._day_rows = Counter(days.tolist())
+        self._rows = len(frame)
+        self._total = int(daily["shifts"].sum())
+
+    # -------------------------------------------------
+    # Queries (no pass over the history)
+    # -------------------------------------------------
+    @property
+    def employees(self):
+        return list(self._employees)
+
+    def _range_sum(self, cum, row, start, end):
+        """Sum of ``cum``'s daily values over ordinals ``start..end``."""
+        if self._origin is None:
+            return 0
+        width = cum.shape[1]
+        hi = min(end - self._origin, width - 1)
+        lo = max(start - self._origin, 0)
+        if hi < lo:
+            return 0
+        return int(cum[row, hi] - (cum[row, lo - 1] if lo else 0))
+
+    def _month_total(self, name, year, month=None):
+        months = self._months.get(name, {})
+        if month is not None:
+            return months.get((year, month), 0)
+        return sum(months.get((year, m), 0) for m in range(1, 13))
+
+    def shifts(self, name, start, end):
+        """Absent shifts of ``name`` between two dates (inclusive) — O(1)."""
+        with self._lock:
+            row = self._employees.get(name)
+            if row is None:
+                return 0
+            return self._range_sum(self._cum_shifts, row, _ordinal(start), _ordinal(end))
+
+    def month_shifts(self, name, year, month=None):
+        """Absent shifts in a month, or a whole year — ≤ 12 counter reads."""
+        with self._lock:
+            return self._month_total(name, year, month)
+
+    def leave_table(self, start=None, end=None, year=None, month=None):
+        """
+        Absent shifts / leave days / days with an absence per employee,
+        for a ``year`` (optionally one ``month``) from the monthly
+        counters, or for any ``start``..``end`` range from the prefix sums.
+        """
+        if year is not None:
+            start = pd.Timestamp(year, month or 1, 1)
+            end = start + pd.offsets.MonthEnd(1) if month else pd.Timestamp(year, 12, 31)
+
+        rows = []
+        with self._lock:
+            if self._origin is not None:
+                lo = self._origin if start is None else _ordinal(start)
+                hi = self._last if end is None else _ordinal(end)
+
+            for name, row in self._employees.items():
+                if year is not None:
+                    shifts = self._month_total(name, year, month)
+                else:
+                    shifts = self._range_sum(self._cum_shifts, row, lo, hi)
+                rows.append({
+                    "Employee": name,
+                    "Absent Shifts": shifts,
+                    "Leave Days": shifts / 2,
+                    "Days Absent": self._range_sum(self._cum_days, row, lo, hi),
+                })
+
+        if not rows:
+            return pd.DataFrame(columns=["Employee", "Absent Shifts", "Leave Days", "Days Absent"])
+        return (
+            pd.DataFrame(rows)
+            .sort_values(["Leave Days", "Employee"], ascending=[False, True])
+            .reset_index(drop=True)
+        )
+
+    def monthly(self, name, year):
+        """Absent shifts / leave days of ``name`` for each month of ``year``."""
+        with self._lock:
+            shifts = [self._month_total(name, year, m) for m in range(1, 13)]
+        return pd.DataFrame({
+            "Month": [pd.Timestamp(year, m, 1).strftime("%B") for m in range(1, 13)],
+            "Absent Shifts": shifts,
+            "Leave Days": [s / 2 for s in shifts],
+        })
+
+    def frequent_absentees(self, start, end, min_leave_days=FREQUENT_LEAVE_DAYS):
+        """Employees with at least ``min_leave_days`` of leave in the range."""
+        table = self.leave_table(start=start, end=end)
+        return table[table["Leave Days"] >= min_leave_days].reset_index(drop=True)
+
+    def streaks(self, start=None, end=None):
+        """
+        Longest run of consecutive days with an absent shift per employee
+        (and the current run up to ``end``) — one vectorized pass over
+        each employee's day row inside the range.
+        """
+        out = []
+        with self._lock:
+            if self._origin is None:
+                return pd.DataFrame(columns=["Employee", "Longest Streak", "From", "To", "Current Streak"])
+
+            lo = 0 if start is None else max(0, _ordinal(start) - self._origin)
+            hi = min(self._last, self._last if end is None else _ordinal(end)) - self._origin
+
+            for name, row in self._employees.items():
+                absent = np.concatenate([[False], self._shifts[row, lo:hi + 1] > 0, [False]])
+                edges = np.flatnonzero(np.diff(absent.astype(np.int8)))
+                starts, stops = edges[0::2], edges[1::2]        # runs [start, stop)
+
+                longest, first, last, current = 0, None, None, 0
+                if len(starts):
+                    lengths = stops - starts
+                    best = int(lengths.argmax())
+                    longest = int(lengths[best])
+                    first = pd.Timestamp.fromordinal(self._origin + lo + int(starts[best])).date()
+                    last = pd.Timestamp.fromordinal(self._origin + lo + int(stops[best]) - 1).date()
+                    if stops[-1] == hi - lo + 1:
+                        current = int(lengths[-1])
+
+                out.append({
+                    "Employee": name,
+                    "Longest Streak": longest,
+                    "From": first,
+                    "To": last,
+                    "Current Streak": current,
+                })
+
+        return (
+            pd.DataFrame(out)
+            .sort_values(["Longest Streak", "Employee"], ascending=[False, True])
+            .reset_index(drop=True)
+        )
@@ -0,0 +1,475 @@
+"""
+Daily_Balance ledger: opening / closing cash balance per day.
+
+Shared by the Streamlit submit paths (``upsert_daily_balance``), the
+headless nightly close job (``write_day_close``), and bulk imports and
+the reconciliation audit (``rebuild_balance_table`` /
+``write_balance_table``).
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+
+from constants import BALANCE_SHEET, STORED_DATE_FMT
+from schema import encode_date, parse_dates, validate_rows
+from storage import ensure_rows
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+# Lock files shared by every process on this host (Streamlit servers, cron jobs)
+LOCK_DIR = os.environ.get(
+    "MTC_LOCK_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".locks")
+)
+
+# Optimistic-update retries before giving up with LedgerConflictError
+MAX_ATTEMPTS = 5
+
+# Submission keys remembered per process (double-tap / rerun protection)
+MAX_SUBMISSION_KEYS = 5000
+
+
+class LedgerConflictError(RuntimeError):
+    """Daily_Balance kept changing underneath an update."""
+
+
+# =================================================
+# 🔒 LOCKS + SUBMISSION KEYS
+# =================================================
+_locks = {}
+_locks_guard = threading.Lock()
+
+_submissions = OrderedDict()
+_submissions_guard = threading.Lock()
+
+
+def sheet_key(worksheet):
+    """
+    Name of ``worksheet`` that every process opening it agrees on:
+    spreadsheet + sheet id on Google Sheets, database path + title on
+    SQLite.  In-memory sheets only exist inside this process.
+    """
+    spreadsheet = getattr(worksheet, "spreadsheet", None)
+
+    path = getattr(spreadsheet, "path", None)
+    if path is not None:
+        return ("sqlite", os.path.abspath(path), worksheet.title)
+
+    spreadsheet_id = getattr(spreadsheet, "id", None)
+    if spreadsheet_id is not None:
+        return ("sheets", spreadsheet_id, worksheet.id)
+
+    return ("local", id(worksheet))
+
+
+def _lock_file(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fh = open(path, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:     # LK_LOCK gives up after ~10 s
+                    pass
+    except BaseException:
+        fh.close()
+        raise
+    return fh
+
+
+def _unlock_file(fh):
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        fh.close()
+
+
+class _LedgerLock:
+    """
+    Re-entrant thread lock, plus an exclusive lock on ``path`` (if any)
+    held while the outermost ``with`` block runs.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fh = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0 and self.path is not None:
+            try:
+                self._fh = _lock_file(self.path)
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        try:
+            if self._depth == 0 and self._fh is not None:
+                fh, self._fh = self._fh, None
+                _unlock_file(fh)
+        finally:
+            self._lock.release()
+
+
+def ledger_lock(worksheet, *key):
+    """
+    Re-entrant lock for ``key`` (e.g. a date) on ``worksheet``.
+
+    Threads of this process — every Streamlit session — take it in turn.
+    For Google / SQLite sheets it also holds a lock file in ``LOCK_DIR``
+    (one per sheet), so a second Streamlit server or the nightly close
+    job on the same host waits as well.  Writers on other hosts are not
+    covered; the ledger's optimistic checks are the only guard there.
+    """
+    name = sheet_key(worksheet)
+    with _locks_guard:
+        lock = _locks.get(name + key)
+        if lock is None:
+            path = None
+            if name[0] != "local":
+                digest = hashlib.sha1(repr(name).encode()).hexdigest()[:16]
+                path = os.path.join(LOCK_DIR, f"{digest}.lock")
+            lock = _locks[name + key] = _LedgerLock(path)
+        return lock
+
+
+def new_submission_key():
+    return uuid.uuid4().hex
+
+
+def claim_submission(key):
+    """True the first time ``key`` is seen; False for a repeat submit."""
+    with _submissions_guard:
+        if key in _submissions:
+            return False
+
+        _submissions[key] = time.time()
+        while len(_submissions) > MAX_SUBMISSION_KEYS:
+            _submissions.popitem(last=False)
+        return True
+
+
+def release_submission(key):
+    """Forget ``key`` so a submission whose write failed can be retried."""
+    with _submissions_guard:
+        _submissions.pop(key, None)
+
+
+def _same_cell(a, b):
+    try:
+        return float(str(a).replace(",", "")) == float(str(b).replace(",", ""))
+    except ValueError:
+        return str(a).strip() == str(b).strip()
+
+
+def _amount(value):
+    if value in ("", None):
+        return 0.0
+    return float(str(value).replace(",", ""))
+
+
+def _balance_df(balance_sheet, records=None):
+    if records is None:
+        records = balance_sheet.get_all_records()
+
+    df = pd.DataFrame(records)
+    if not df.empty:
+        df["Date"] = parse_dates(df["Date"])
+    return df
+
+
+def _sheet_row(df, target_dt):
+    """1-based sheet row of ``target_dt`` (header is row 1), or None."""
+    if df.empty or target_dt not in df["Date"].values:
+        return None
+    return df.index[df["Date"] == target_dt][0] + 2
+
+
+def _prev_row(df, target_dt):
+    """Sheet row of the latest day before ``target_dt``, or None."""
+    if df.empty:
+        return None
+
+    prev_days = df[df["Date"] < target_dt]
+    if prev_days.empty:
+        return None
+    return prev_days.sort_values("Date", kind="stable").index[-1] + 2
+
+
+def _unchanged(values, expected):
+    """A row read back (trailing blanks trimmed) still holds ``expected``."""
+    row = list((values or [[]])[0])
+    row += [""] * (len(expected) - len(row))
+    return (
+        parse_dates([row[0]])[0] == expected[0]
+        and all(_same_cell(a, b) for a, b in zip(row[1:], expected[1:]))
+    )
+
+
+def _set_day(
+    balance_sheet,
+    target_date,
+    totals,
+    now_str="",
+    records=None,
+    attempts=MAX_ATTEMPTS
+):
+    """
+    Write the day's row with ``totals(sales, expense)`` applied to its
+    current totals; opening = the previous day's closing.
+
+    The day's row and the previous day's row are read back in one batch
+    right before the write, and the attempt starts over if either one
+    changed since ``records`` were read.
+    """
+    date_str = encode_date(target_date)
+    target_dt = pd.to_datetime(target_date)
+    columns = ["Date", "Opening Balance", "Total Sales", "Total Expense", "Closing Balance"]
+
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(random.uniform(0.2, 0.5) * attempt)
+            records = None
+
+        df = _balance_df(balance_sheet, records)
+        row_idx = _sheet_row(df, target_dt)
+        prev_idx = _prev_row(df, target_dt)
+
+        current = None
+        if row_idx is not None:
+            current = df.loc[row_idx - 2, columns[:4]].tolist()
+            ranges = [f"A{row_idx}:D{row_idx}"]
+        else:
+            ranges = ["A2:A"]
+
+        previous = None
+        if prev_idx is not None:
+            previous = df.loc[prev_idx - 2, columns].tolist()
+            ranges.append(f"A{prev_idx}:E{prev_idx}")
+
+        if previous is not None:
+            opening_balance = _amount(previous[4])
+        elif current is not None:
+            # First ever day → keep whatever opening was entered by hand
+            opening_balance = _amount(current[1])
+        else:
+            opening_balance = 0.0
+
+        total_sales, total_expense = totals(
+            _amount(current[2]) if current else 0.0,
+            _amount(current[3]) if current else 0.0,
+        )
+        row = validate_rows(BALANCE_SHEET, [[
+            date_str,
+            opening_balance,
+            float(total_sales),
+            float(total_expense),
+            opening_balance + float(total_sales) - float(total_expense),
+            now_str
+        ]])[0]
+
+        # Version check: both rows still hold what we read
+        latest = balance_sheet.batch_get(ranges)
+        if current is not None:
+            fresh = _unchanged(latest[0], current)
+        else:
+            # ... and nobody inserted the day meanwhile
+            fresh = not (parse_dates([r[0] for r in latest[0] if r]) == target_dt).any()
+        if previous is not None:
+            fresh = fresh and _unchanged(latest[1], previous)
+        if not fresh:
+            continue
+
+        if row_idx is not None:
+            balance_sheet.update(f"A{row_idx}:F{row_idx}", [row])
+        else:
+            balance_sheet.append_row(row)
+
+        return dict(zip(columns + ["Entry Timestamp"], row))
+
+    raise LedgerConflictError(
+        f"Daily_Balance for {date_str} changed during {attempts} attempt(s)"
+    )
+
+
+# =================================================
+# 🔁 DAILY BALANCE UPSERT HELPER
+# =================================================
+def upsert_daily_balance(
+    balance_sheet,
+    target_date,
+    delta_sales=0.0,
+    delta_expense=0.0,
+    now_str=""
+):
+    """
+    Add ``delta_sales`` / ``delta_expense`` to the day's row (inserting it
+    if missing).  Serialized per date through ``ledger_lock``, and checked
+    optimistically against the sheet before writing so a writer the lock
+    does not cover (another host) forces a retry instead of a lost
+    update.
+    """
+    with ledger_lock(balance_sheet, encode_date(target_date)):
+        _set_day(
+            balance_sheet,
+            target_date,
+            lambda sales, expense: (sales + float(delta_sales), expense + float(delta_expense)),
+            now_str=now_str
+        )
+
+
+# =================================================
+# 🌙 DAY CLOSE (ABSOLUTE TOTALS)
+# =================================================
+def day_totals(sales_df, expense_df, target_date):
+    """Total sales and expense of ``target_date`` from the typed frames."""
+    total_sales = 0.0
+    if not sales_df.empty:
+        total_sales = float(
+            sales_df.loc[sales_df["date"].dt.date == target_date, "Cash Total"].sum()
+        )
+
+    total_expense = 0.0
+    if not expense_df.empty:
+        total_expense = float(
+            expense_df.loc[
+                expense_df["datetime"].dt.date == target_date, "Expense Amount"
+            ].sum()
+        )
+
+    return total_sales, total_expense
+
+
+def write_day_close(
+    balance_sheet,
+    target_date,
+    total_sales,
+    total_expense,
+    now_str="",
+    records=None
+):
+    """
+    Set the day's totals (not deltas) in a single write and return the
+    saved row as a dict.
+
+    Same lock and version check as ``upsert_daily_balance``, but a single
+    attempt: if the day's (or the previous day's) row changed since
+    ``records`` were read, a submit landed after the totals were summed,
+    so LedgerConflictError is raised for the caller to re-read and retry.
+    """
+    with ledger_lock(balance_sheet, encode_date(target_date)):
+        return _set_day(
+            balance_sheet,
+            target_date,
+            lambda sales, expense: (total_sales, total_expense),
+            now_str=now_str,
+            records=records,
+            attempts=1
+        )
+
+
+# =================================================
+# 🧮 FULL REBUILD (VECTORIZED)
+# =================================================
+def _daily_sum(df, date_col, amount_col):
+    if df.empty:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+    return df.groupby(df[date_col].dt.normalize())[amount_col].sum()
+
+
+def daily_totals(sales_df, expense_df):
+    """Total Sales / Total Expense per day — one groupby per source."""
+    totals = pd.DataFrame({
+        "Total Sales": _daily_sum(sales_df, "date", "Cash Total"),
+        "Total Expense": _daily_sum(expense_df, "datetime", "Expense Amount"),
+    })
+    totals.index.name = "date"
+    return totals.fillna(0.0).sort_index()
+
+
+def rebuild_balance_table(sales_df, expense_df, balance_df=None):
+    """
+    Recompute every Daily_Balance row from the typed Sales / Sheet1
+    frames: opening = previous closing, closing = opening + cumulative
+    (sales - expense).  Days already in ``balance_df`` are kept, and its
+    earliest opening balance seeds the running total.
+    """
+    totals = daily_totals(sales_df, expense_df)
+
+    seed = 0.0
+    if balance_df is not None and not balance_df.empty:
+        known = balance_df.dropna(subset=["date"]).sort_values("date")
+        if not known.empty:
+            totals = totals.reindex(
+                totals.index.union(pd.DatetimeIndex(known["date"].unique())),
+                fill_value=0.0
+            )
+            if totals.empty or known["date"].iloc[0] <= totals.index[0]:
+                seed = float(known["Opening Balance"].fillna(0).iloc[0])
+
+    net = (totals["Total Sales"] - totals["Total Expense"]).round(2)
+    closing = (seed + net.cumsum()).round(2)
+    opening = closing.shift(1, fill_value=seed)
+
+    table = pd.DataFrame({
+        "date": totals.index,
+        "Date": totals.index.strftime(STORED_DATE_FMT),
+        "Opening Balance": opening.values,
+        "Total Sales": totals["Total Sales"].round(2).values,
+        "Total Expense": totals["Total Expense"].round(2).values,
+        "Closing Balance": closing.values,
+    })
+    return table
+
+
+def write_balance_table(balance_sheet, table, now_str="", existing_rows=None):
+    """
+    Replace the Daily_Balance body with ``table`` in one range write.
+    Rows without their own "Entry Timestamp" are stamped ``now_str``.
+    """
+    rows = validate_rows(BALANCE_SHEET, [
+        [
+            r["Date"],
+            float(r["Opening Balance"]),
+            float(r["Total Sales"]),
+            float(r["Total Expense"]),
+            float(r["Closing Balance"]),
+            r.get("Entry Timestamp") or now_str,
+        ]
+        for r in table.to_dict("records")
+    ])
+
+    if rows:
+        ensure_rows(balance_sheet, len(rows) + 1)
+        balance_sheet.update(f"A2:F{len(rows) + 1}", rows)
+
+    # Drop stale rows left below the rebuilt table
+    if existing_rows is not None and existing_rows > len(rows):
+        balance_sheet.delete_rows(len(rows) + 2, existing_rows + 1)
+
+    return len(rows)
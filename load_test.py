@@ -0,0 +1,412 @@
+"""
+Multi-session load test against the local Sheets emulator.
+
+Simulates N staff sessions sharing one process — exactly like Streamlit —
+with the app's own code paths: one shared SheetCache (tail probe +
+background refresher), one AggregationEngine and the Daily_Balance
+ledger.  Every session loops over a weighted mix of Expense Entry
+submits, Attendance saves and analytics views until the run ends.
+
+The emulator (``local_sheets.SheetsLimits``) enforces per-minute read /
+write quotas and a randomized round-trip latency, so quota errors show
+up the same way they would against Google Sheets.
+
+    python load_test.py --sessions 10 --duration 120
+    python load_test.py --sessions 25 --mix expense=2,attendance=1,analytics=7
+    python load_test.py --reads-per-minute 300 --writes-per-minute 300
+
+Prints throughput, p50 / p95 / p99 latency and error rate per action.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+
+from aggregations import AggregationEngine
+from branches import BranchSet
+from constants import (
+    TIMEZONE, DEFAULT_BRANCH,
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET,
+    EXPENSE_CATEGORIES, PAYMENT_MODES, EXPENSE_BY, EMPLOYEES,
+    SALES_SLOTS, ABSENT_MARK, PRESENT_MARK,
+)
+from entries import record_expenses
+from frames import expense_frame, sales_frame
+from ledger import (
+    ledger_lock, new_submission_key, rebuild_balance_table, write_balance_table,
+)
+from local_sheets import LocalSpreadsheet, RequestMeter, SheetsLimits
+from schema import date_keys, encode_date, encode_datetime, validate_rows
+from sheet_cache import read_records
+from sheets import open_worksheets
+from snapshots import warm_rollups
+from storage import find_rows
+
+DEFAULT_MIX = {"expense": 3, "attendance": 1, "analytics": 6}
+
+# Seconds a staff member spends on a form / page between actions
+THINK_TIME = (1.0, 4.0)
+
+
+# =================================================
+# 🌱 SEED DATA (written before quotas are switched on)
+# =================================================
+def seed_history(worksheets, today, days, now_str, rng):
+    expenses, sales, attendance = [], [], []
+
+    for offset in range(days, 0, -1):
+        day = today - timedelta(days=offset)
+        date_str = encode_date(day)
+
+        for _ in range(rng.randint(3, 8)):
+            at = datetime.combine(day, datetime.min.time()) + timedelta(
+                minutes=rng.randint(6 * 60, 22 * 60)
+            )
+            expenses.append([
+                encode_datetime(at),
+                rng.choice(EXPENSE_CATEGORIES),
+                "",
+                rng.randint(50, 2500),
+                rng.choice(PAYMENT_MODES),
+                rng.choice(EXPENSE_BY),
+            ])
+
+        for store, slot in SALES_SLOTS:
+            sales.append([date_str, store, slot, rng.randint(1500, 9000), now_str])
+
+        for name in EMPLOYEES:
+            attendance.append([
+                date_str,
+                name,
+                ABSENT_MARK if rng.random() < 0.08 else PRESENT_MARK,
+                ABSENT_MARK if rng.random() < 0.08 else PRESENT_MARK,
+                now_str,
+            ])
+
+    worksheets[EXPENSE_SHEET].append_rows(expenses)
+    worksheets[SALES_SHEET].append_rows(sales)
+    worksheets[ATTENDANCE_SHEET].append_rows(attendance)
+
+    table = rebuild_balance_table(
+        sales_frame(read_records(worksheets[SALES_SHEET])),
+        expense_frame(read_records(worksheets[EXPENSE_SHEET])),
+    )
+    write_balance_table(worksheets[BALANCE_SHEET], table, now_str=now_str)
+
+
+# =================================================
+# 🧑‍💼 ACTIONS (mirror app.py's submit / view paths)
+# =================================================
+class AppProcess:
+    """The state one Streamlit process shares across every session."""
+
+    def __init__(self, spreadsheet, today):
+        self.today = today
+        self.worksheets = open_worksheets(spreadsheet)
+        self.branch_set = BranchSet.from_worksheets(
+            {DEFAULT_BRANCH: spreadsheet}, {DEFAULT_BRANCH: self.worksheets}
+        )
+        self.cache = self.branch_set.caches[DEFAULT_BRANCH]
+        self.engine = AggregationEngine()
+
+        self.refresher_errors = 0
+        self._errors_lock = threading.Lock()
+
+    def start(self):
+        def on_error(name, exc):
+            with self._errors_lock:
+                self.refresher_errors += 1
+
+        return self.branch_set.start_refreshers(on_error=on_error)
+
+    def now_str(self):
+        return encode_datetime(datetime.now(pytz.timezone(TIMEZONE)))
+
+    def expense(self, rng):
+        at = datetime.now(pytz.timezone(TIMEZONE))
+        rows = validate_rows(EXPENSE_SHEET, [
+            [
+                encode_datetime(at),
+                rng.choice(EXPENSE_CATEGORIES),
+                "",
+                rng.randint(20, 1500),
+                rng.choice(PAYMENT_MODES),
+                rng.choice(EXPENSE_BY),
+            ]
+            for _ in range(rng.randint(1, 3))
+        ])
+
+        record_expenses(
+            self.worksheets[EXPENSE_SHEET],
+            self.worksheets[BALANCE_SHEET],
+            new_submission_key(),
+            rows,
+            self.today,
+            self.now_str()
+        )
+        self.cache.invalidate(EXPENSE_SHEET, BALANCE_SHEET)
+
+    def attendance(self, rng):
+        sheet = self.worksheets[ATTENDANCE_SHEET]
+        date_str = encode_date(self.today)
+
+        with ledger_lock(sheet):
+            for i, _ in reversed(find_rows(sheet, Date=date_keys(self.today))):
+                sheet.delete_rows(i)
+
+            sheet.append_rows(validate_rows(ATTENDANCE_SHEET, [
+                [
+                    date_str,
+                    name,
+                    ABSENT_MARK if rng.random() < 0.1 else PRESENT_MARK,
+                    ABSENT_MARK if rng.random() < 0.1 else PRESENT_MARK,
+                    self.now_str(),
+                ]
+                for name in EMPLOYEES
+            ]))
+
+        self.cache.invalidate(ATTENDANCE_SHEET)
+
+    def analytics(self, rng):
+        sales_df, sales_version = self.cache.read(SALES_SHEET)
+        expense_df, expense_version = self.cache.read(EXPENSE_SHEET)
+        self.cache.read(ATTENDANCE_SHEET)
+        self.cache.read(BALANCE_SHEET)
+
+        if not sales_df.empty:
+            self.engine.register("sales", sales_df, date_col="date", version=sales_version)
+        if not expense_df.empty:
+            self.engine.register(
+                "expenses", expense_df, date_col="datetime", version=expense_version
+            )
+
+        warm_rollups(self.engine, self.today)
+
+
+# =================================================
+# 🏃 SESSIONS
+# =================================================
+def run_session(process, actions, weights, deadline, think, samples, seed):
+    rng = random.Random(seed)
+
+    while time.monotonic() < deadline:
+        action = rng.choices(actions, weights=weights)[0]
+
+        started = time.perf_counter()
+        error = ""
+        try:
+            getattr(process, action)(rng)
+        except Exception as exc:
+            status = getattr(getattr(exc, "response", None), "status_code", None)
+            error = f"{type(exc).__name__} {status}" if status else type(exc).__name__
+
+        samples.append((action, time.perf_counter() - started, error))
+
+        pause = rng.uniform(*think)
+        time.sleep(max(0.0, min(pause, deadline - time.monotonic())))
+
+
+def run_load_test(
+    sessions=10,
+    duration=60.0,
+    mix=None,
+    limits=SheetsLimits(),
+    think=THINK_TIME,
+    seed_days=90,
+    seed=0
+):
+    """Run the simulation; returns (samples frame, summary dict)."""
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    today = datetime.now(pytz.timezone(TIMEZONE)).date()
+
+    spreadsheet = LocalSpreadsheet.with_default_layout()
+    seed_history(
+        open_worksheets(spreadsheet), today, seed_days,
+        encode_datetime(datetime.now(pytz.timezone(TIMEZONE))), rng
+    )
+
+    # Quotas / latency apply from here on
+    if limits is not None:
+        spreadsheet.meter = RequestMeter(limits)
+
+    process = AppProcess(spreadsheet, today)
+    refreshers = process.start()
+
+    actions = [a for a, w in mix.items() if w > 0]
+    weights = [mix[a] for a in actions]
+
+    samples = []
+    started = time.monotonic()
+    deadline = started + duration
+
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(process, actions, weights, deadline, think, samples, seed + i + 1),
+            name=f"session-{i + 1}",
+            daemon=True,
+        )
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - started
+    for refresher in refreshers.values():
+        refresher.stop()
+
+    meter = spreadsheet.meter
+    summary = {
+        "sessions": sessions,
+        "elapsed": elapsed,
+        "refresher_errors": process.refresher_errors,
+        "requests": dict(meter.served) if meter else {},
+        "throttled": dict(meter.throttled) if meter else {},
+    }
+    return pd.DataFrame(samples, columns=["action", "latency", "error"]), summary
+
+
+# =================================================
+# 📋 REPORT
+# =================================================
+def summarize(samples, elapsed):
+    """Per-action ops, throughput, error rate and latency percentiles (ms)."""
+    if samples.empty:
+        return pd.DataFrame()
+
+    def stats(df):
+        ms = df["latency"] * 1000
+        errors = int((df["error"] != "").sum())
+        return pd.Series({
+            "ops": len(df),
+            "ops/s": len(df) / elapsed,
+            "errors": errors,
+            "error %": 100.0 * errors / len(df),
+            "p50 ms": ms.quantile(0.50),
+            "p95 ms": ms.quantile(0.95),
+            "p99 ms": ms.quantile(0.99),
+        })
+
+    table = pd.DataFrame({
+        action: stats(df) for action, df in samples.groupby("action")
+    }).T
+    table.loc["all"] = stats(samples)
+
+    for col in ["ops", "errors"]:
+        table[col] = table[col].astype(int)
+    return table.round(2)
+
+
+def print_report(samples, summary, out=sys.stdout):
+    print(
+        f"\n{summary['sessions']} session(s), {summary['elapsed']:.1f}s",
+        file=out
+    )
+
+    table = summarize(samples, summary["elapsed"])
+    print(table.to_string() if not table.empty else "No actions completed.", file=out)
+
+    errors = samples.loc[samples["error"] != "", "error"].value_counts()
+    if not errors.empty:
+        print("\nErrors:", file=out)
+        for name, count in errors.items():
+            print(f"  {name}: {count}", file=out)
+
+    if summary["requests"]:
+        served, throttled = summary["requests"], summary["throttled"]
+        minutes = summary["elapsed"] / 60
+        print(
+            "\nSheets API: "
+            f"{served['read']} reads ({served['read'] / minutes:.0f}/min), "
+            f"{served['write']} writes ({served['write'] / minutes:.0f}/min), "
+            f"throttled {throttled['read']} read / {throttled['write']} write",
+            file=out
+        )
+    print(f"Background refresher errors: {summary['refresher_errors']}", file=out)
+
+
+# =================================================
+# 🖥️ CLI
+# =================================================
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown action: {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_range(text):
+    low, _, high = text.partition(",")
+    return float(low), float(high or low)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="Action weights, e.g. expense=3,attendance=1,analytics=6"
+    )
+    parser.add_argument(
+        "--think",
+        type=parse_range,
+        default=THINK_TIME,
+        help="Pause between actions in seconds, as MIN,MAX"
+    )
+    parser.add_argument("--reads-per-minute", type=int, default=SheetsLimits.reads_per_minute)
+    parser.add_argument("--writes-per-minute", type=int, default=SheetsLimits.writes_per_minute)
+    parser.add_argument(
+        "--latency-ms",
+        type=parse_range,
+        default=tuple(s * 1000 for s in SheetsLimits.latency),
+        help="Sheets round trip in ms, as MIN,MAX"
+    )
+    parser.add_argument(
+        "--no-limits",
+        action="store_true",
+        help="Disable quotas and latency (measures the app's own overhead)"
+    )
+    parser.add_argument("--seed-days", type=int, default=90, help="Days of history")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    limits = None if args.no_limits else SheetsLimits(
+        reads_per_minute=args.reads_per_minute,
+        writes_per_minute=args.writes_per_minute,
+        latency=tuple(ms / 1000 for ms in args.latency_ms),
+    )
+
+    samples, summary = run_load_test(
+        sessions=args.sessions,
+        duration=args.duration,
+        mix=args.mix,
+        limits=limits,
+        think=args.think,
+        seed_days=args.seed_days,
+        seed=args.seed
+    )
+    print_report(samples, summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+In-memory stand-in for the subset of gspread the app uses.
+
+``LocalSpreadsheet`` / ``LocalWorksheet`` mirror the gspread calls made
+by the app, the sheet cache and the headless jobs, so they can run
+without Google credentials or network access:
+
+    spreadsheet = LocalSpreadsheet.with_default_layout()
+    worksheets = open_worksheets(spreadsheet)
+
+Pass ``limits=SheetsLimits()`` to emulate the Sheets API as well: every
+call then costs one read or write request against a per-minute quota
+(exceeding it raises ``LocalAPIError`` with status 429, like gspread's
+``APIError``) and sleeps a randomized round-trip latency.
+
+Pass ``grid_rows=1000`` to model the sheet grid too: ``row_count`` is then
+the grid size, as in gspread, and an ``update`` past it fails with status
+400 until ``add_rows`` grows the grid (appends grow it on their own).
+"""
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from constants import SHEET_HEADERS
+from sheet_protocol import batch_get, parse_a1, trim_range
+
+
+# =================================================
+# ⏱️ QUOTAS + LATENCY
+# =================================================
+@dataclass(frozen=True)
+class SheetsLimits:
+    # Sheets API defaults per user per project (one service account →
+    # every app session shares these)
+    reads_per_minute: int = 60
+    writes_per_minute: int = 60
+    latency: tuple = (0.08, 0.35)       # seconds, uniform per request
+    window: float = 60.0
+
+
+class LocalAPIError(Exception):
+    """Quota error shaped like gspread's APIError (``response.status_code``)."""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.code = status_code
+        self.response = SimpleNamespace(status_code=status_code)
+
+
+class RequestMeter:
+    """Sliding-window request counter enforcing ``SheetsLimits``."""
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.served = {"read": 0, "write": 0}
+        self.throttled = {"read": 0, "write": 0}
+        self._windows = {"read": deque(), "write": deque()}
+        self._lock = threading.Lock()
+
+    def request(self, kind):
+        limit = (
+            self.limits.reads_per_minute if kind == "read"
+            else self.limits.writes_per_minute
+        )
+
+        with self._lock:
+            now = time.monotonic()
+            window = self._windows[kind]
+            while window and now - window[0] >= self.limits.window:
+                window.popleft()
+
+            if len(window) >= limit:
+                self.throttled[kind] += 1
+                raise LocalAPIError(
+                    429, f"Quota exceeded for {kind} requests per minute"
+                )
+
+            window.append(now)
+            self.served[kind] += 1
+
+        time.sleep(random.uniform(*self.limits.latency))
+
+
+class LocalWorksheet:
+
+    def __init__(self, title, rows=None, spreadsheet=None, grid_rows=None):
+        self.title = title
+        self.spreadsheet = spreadsheet
+        self._rows = [list(r) for r in (rows or [])]
+        self._lock = threading.RLock()
+
+        # None: no grid, the sheet is exactly as long as its rows
+        self._grid = None if grid_rows is None else max(grid_rows, len(self._rows))
+
+    def _request(self, kind):
+        meter = getattr(self.spreadsheet, "meter", None)
+        if meter is not None:
+            meter.request(kind)
+
+    @property
+    def row_count(self):
+        if self._grid is not None:
+            return self._grid
+        return len(self._rows)
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def get_all_values(self, **kwargs):
+        self._request("read")
+        return self._values()
+
+    def _values(self):
+        with self._lock:
+            width = max((len(r) for r in self._rows), default=0)
+            return [
+                ["" if v is None else v for v in r] + [""] * (width - len(r))
+                for r in self._rows
+            ]
+
+    def get_all_records(self):
+        self._request("read")
+        values = self._values()
+        if not values:
+            return []
+
+        header = values[0]
+        return [dict(zip(header, row)) for row in values[1:]]
+
+    def get_values(self, a1):
+        self._request("read")
+        return self._range(a1)
+
+    def batch_get(self, ranges, **kwargs):
+        self._request("read")
+        return [self._range(a1) for a1 in ranges]
+
+    def _range(self, a1):
+        _, row1, col1, row2, col2 = parse_a1(a1)
+
+        with self._lock:
+            row1 = row1 or 1
+            row2 = row2 or len(self._rows)
+            col1 = col1 or 1
+            return trim_range(self._rows[row1 - 1:row2], col1, col2)
+
+    def col_values(self, col):
+        self._request("read")
+        with self._lock:
+            values = [
+                r[col - 1] if len(r) >= col else "" for r in self._rows
+            ]
+        while values and values[-1] in ("", None):
+            values.pop()
+        return values
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+    def append_row(self, values, **kwargs):
+        self.append_rows([values])
+
+    def append_rows(self, values, **kwargs):
+        self._request("write")
+        with self._lock:
+            self._rows.extend(list(r) for r in values)
+            if self._grid is not None:
+                self._grid = max(self._grid, len(self._rows))
+
+    def update(self, a1, values, **kwargs):
+        _, row1, col1, _, _ = parse_a1(a1)
+        row1 = row1 or 1
+        col1 = col1 or 1
+
+        self._request("write")
+        with self._lock:
+            if self._grid is not None and row1 - 1 + len(values) > self._grid:
+                raise LocalAPIError(
+                    400,
+                    f"Range ({self.title}!{a1}) exceeds grid limits. "
+                    f"Max rows: {self._grid}"
+                )
+
+            for r_off, new_row in enumerate(values):
+                r = row1 - 1 + r_off
+                while len(self._rows) <= r:
+                    self._rows.append([])
+
+                row = self._rows[r]
+                for c_off, value in enumerate(new_row):
+                    c = col1 - 1 + c_off
+                    while len(row) <= c:
+                        row.append("")
+                    row[c] = value
+
+    def delete_rows(self, start_index, end_index=None):
+        end_index = end_index or start_index
+        self._request("write")
+        with self._lock:
+            del self._rows[start_index - 1:end_index]
+            if self._grid is not None:
+                self._grid -= max(0, min(end_index, self._grid) - start_index + 1)
+
+    def add_rows(self, rows):
+        self._request("write")
+        with self._lock:
+            if self._grid is not None:
+                self._grid += rows
+
+
+class LocalSpreadsheet:
+
+    def __init__(self, title="MTC-Digitization", limits=None, grid_rows=None):
+        self.title = title
+        self.meter = RequestMeter(limits) if limits is not None else None
+        self.grid_rows = grid_rows
+        self._worksheets = {}
+
+    @classmethod
+    def with_default_layout(cls, limits=None, grid_rows=None):
+        spreadsheet = cls(limits=limits, grid_rows=grid_rows)
+        for title, header in SHEET_HEADERS.items():
+            spreadsheet.add_worksheet(title, rows=[header])
+        return spreadsheet
+
+    def add_worksheet(self, title, rows=None, **kwargs):
+        ws = LocalWorksheet(title, rows=rows, spreadsheet=self, grid_rows=self.grid_rows)
+        self._worksheets[title] = ws
+        return ws
+
+    @property
+    def sheet1(self):
+        return next(iter(self._worksheets.values()))
+
+    def worksheet(self, title):
+        return self._worksheets[title]
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def values_batch_get(self, ranges, params=None):
+        if self.meter is not None:
+            self.meter.request("read")      # one request for every range
+
+        return batch_get(
+            self.title, ranges, lambda title, a1: self._worksheets[title]._range(a1)
+        )
@@ -0,0 +1,109 @@
+"""
+One-time migration of existing sheets to the storage encoding.
+
+Rewrites DD/MM/YYYY dates and timestamps as ISO, "1,500"-style amounts
+as numbers and trims the fixed-choice columns (see ``schema``) — one
+read and one range write per sheet, rows stay where they are.  Cells
+that cannot be converted are left untouched and listed, so they can be
+fixed by hand.  Safe to re-run: already-encoded rows are not rewritten.
+
+Run it while nobody is entering data:
+
+    python migrate_encoding.py --dry-run
+    python migrate_encoding.py --branch "Anna Nagar"
+"""
+import sys
+
+from cli import job_parser, resolve_branches
+from constants import SHEET_HEADERS
+from schema import normalize_row
+from sheet_cache import read_values
+from storage import open_branch_set
+
+# Problems printed per sheet (the rest are counted)
+MAX_PROBLEMS_SHOWN = 20
+
+
+def _same(a, b):
+    return a == b or str(a) == str(b)
+
+
+def migrate_worksheet(name, worksheet, dry_run=False):
+    """
+    Re-encode every row of ``worksheet``; returns ``(rows, changed,
+    problems)`` with problems as ``(sheet row number, column, message)``.
+    """
+    values = read_values(worksheet)
+    if len(values) < 2:
+        return 0, 0, []
+
+    header = SHEET_HEADERS[name]
+    if list(values[0][:len(header)]) != header:
+        raise ValueError(f"{name}: header is not {', '.join(header)}")
+
+    rows, problems = [], []
+    changed = 0
+    for idx, row in enumerate(values[1:], start=2):
+        original = list(row)[:len(header)] + [""] * (len(header) - len(row))
+        clean, row_problems = normalize_row(name, original)
+
+        rows.append(clean)
+        problems.extend((idx, col, message) for col, message in row_problems)
+        if not all(_same(a, b) for a, b in zip(clean, original)):
+            changed += 1
+
+    if changed and not dry_run:
+        last_col = chr(ord("A") + len(header) - 1)
+        worksheet.update(f"A2:{last_col}{len(rows) + 1}", rows, value_input_option="RAW")
+
+    return len(rows), changed, problems
+
+
+# =================================================
+# 🖥️ CLI
+# =================================================
+def parse_args(argv=None):
+    parser = job_parser(
+        __doc__, "Branch to migrate (repeatable; default: every registered branch)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would change; write nothing"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    secrets, registry = resolve_branches(args)
+    if registry is None:
+        return 2
+
+    branch_set = open_branch_set(secrets, registry, probe=False)
+
+    failed = False
+    for branch, worksheets in branch_set.worksheets.items():
+        for name in SHEET_HEADERS:
+            rows, changed, problems = migrate_worksheet(
+                name, worksheets[name], dry_run=args.dry_run
+            )
+            verb = "would change" if args.dry_run else "changed"
+            print(
+                f"[{branch}] {name}: {rows:,} row(s), {changed:,} {verb}, "
+                f"{len(problems):,} cell(s) left as-is"
+            )
+
+            for idx, col, message in problems[:MAX_PROBLEMS_SHOWN]:
+                print(f"    row {idx} {col}: {message}")
+            if len(problems) > MAX_PROBLEMS_SHOWN:
+                print(f"    … {len(problems) - MAX_PROBLEMS_SHOWN:,} more")
+
+            failed = failed or bool(problems)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Headless nightly close job.
+
+Computes the day's close from Sheet1 and Sales, writes it to
+Daily_Balance in a single write, warms the analytics rollups and saves a
+snapshot that the app reads on its first page load.  Sheets are read
+and parsed exactly like the app's cache, so the snapshot's frame
+versions match the live ones and its memo survives the first refresh.
+
+Run on a schedule, e.g. cron at 23:55 IST:
+
+    python nightly_close.py --secrets .streamlit/secrets.toml
+"""
+import sys
+from datetime import datetime
+
+import pytz
+
+from aggregations import AggregationEngine
+from cli import job_parser, resolve_branches
+from constants import (
+    DATE_FMT, TIMEZONE, DEFAULT_BRANCH,
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET,
+)
+from frames import attendance_frame, balance_frame, expense_frame, sales_frame
+from ledger import MAX_ATTEMPTS, LedgerConflictError, day_totals, write_day_close
+from schema import encode_datetime
+from sheet_cache import read_records
+from snapshots import SNAPSHOT_DIR, save_snapshot, warm_rollups
+from storage import open_branch_set
+
+
+def parse_args(argv=None):
+    parser = job_parser(
+        __doc__, "Branch to close (repeatable; default: every registered branch)"
+    )
+    parser.add_argument(
+        "--date",
+        help="Day to close as DD/MM/YYYY (default: today, IST)"
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        default=SNAPSHOT_DIR,
+        help="Where the app looks for precomputed snapshots"
+    )
+    return parser.parse_args(argv)
+
+
+def run_close(
+    worksheets,
+    target_date,
+    now_str,
+    snapshot_dir=SNAPSHOT_DIR,
+    branch=DEFAULT_BRANCH
+):
+    for attempt in range(MAX_ATTEMPTS):
+        # ---------- Read each source sheet once ----------
+        # Daily_Balance first: a submit after this read also moves the
+        # day's balance row, which write_day_close then refuses to overwrite
+        balance_records = read_records(worksheets[BALANCE_SHEET])
+        expense_df = expense_frame(read_records(worksheets[EXPENSE_SHEET]))
+        sales_df = sales_frame(read_records(worksheets[SALES_SHEET]))
+
+        # ---------- Close the day (single write) ----------
+        total_sales, total_expense = day_totals(sales_df, expense_df, target_date)
+
+        try:
+            close = write_day_close(
+                worksheets[BALANCE_SHEET],
+                target_date,
+                total_sales,
+                total_expense,
+                now_str=now_str,
+                records=balance_records
+            )
+            break
+        except LedgerConflictError:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+
+    attendance_df = attendance_frame(read_records(worksheets[ATTENDANCE_SHEET]))
+
+    balance_df = balance_frame(read_records(worksheets[BALANCE_SHEET]))
+
+    # ---------- Rollups + snapshot ----------
+    engine = AggregationEngine()
+    if not expense_df.empty:
+        engine.register("expenses", expense_df, date_col="datetime")
+    if not sales_df.empty:
+        engine.register("sales", sales_df, date_col="date")
+
+    warm_rollups(engine, target_date)
+
+    frames = {
+        EXPENSE_SHEET: expense_df,
+        ATTENDANCE_SHEET: attendance_df,
+        SALES_SHEET: sales_df,
+        BALANCE_SHEET: balance_df,
+    }
+
+    path = save_snapshot(
+        frames, engine, close, directory=snapshot_dir, branch=branch
+    )
+    return close, path
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    ist = pytz.timezone(TIMEZONE)
+    now = datetime.now(ist)
+
+    if args.date:
+        target_date = datetime.strptime(args.date, DATE_FMT).date()
+    else:
+        target_date = now.date()
+
+    secrets, registry = resolve_branches(args)
+    if registry is None:
+        return 2
+
+    branch_set = open_branch_set(secrets, registry, probe=False)
+
+    for branch, worksheets in branch_set.worksheets.items():
+        close, path = run_close(
+            worksheets,
+            target_date,
+            encode_datetime(now),
+            snapshot_dir=args.snapshot_dir,
+            branch=branch
+        )
+
+        print(
+            f"[{branch}] Closed {close['Date']}: "
+            f"opening ₹ {close['Opening Balance']:,.0f}, "
+            f"sales ₹ {close['Total Sales']:,.0f}, "
+            f"expense ₹ {close['Total Expense']:,.0f}, "
+            f"closing ₹ {close['Closing Balance']:,.0f}"
+        )
+        print(f"[{branch}] Snapshot written to {path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Server-side pagination for the analytics tables.
+
+Filtering, sorting and slicing all happen in pandas on the server; only
+the visible page is handed to ``st.dataframe``, so a phone never has to
+receive (or render) a multi-month table in one go.
+"""
+import math
+from dataclasses import dataclass
+
+import pandas as pd
+
+PAGE_SIZES = (10, 25, 50, 100)
+PAGE_SIZE = 25
+
+
+@dataclass(frozen=True)
+class Page:
+    number: int         # 1-based, clamped to the available pages
+    pages: int
+    total: int          # rows (or groups) after filtering
+    start: int          # 1-based position of the first item on the page
+    end: int
+
+    @property
+    def label(self):
+        if not self.total:
+            return "No matching rows"
+        return f"{self.start}–{self.end} of {self.total} · page {self.number}/{self.pages}"
+
+
+def filter_rows(df, search, columns=None):
+    """Rows where any of ``columns`` contains ``search`` (case-insensitive)."""
+    search = (search or "").strip()
+    if not search or df.empty:
+        return df
+
+    columns = list(columns or df.columns)
+    mask = pd.Series(False, index=df.index)
+    for col in columns:
+        mask |= df[col].astype(str).str.contains(search, case=False, regex=False)
+    return df[mask]
+
+
+def paginate(
+    df,
+    page=1,
+    page_size=PAGE_SIZE,
+    sort_by=None,
+    ascending=True,
+    search=None,
+    search_cols=None,
+    group_col=None
+):
+    """
+    Filter, sort and slice ``df``; returns (page frame, Page).
+
+    With ``group_col`` a page holds ``page_size`` whole groups (e.g. every
+    store row of a date) so grouped tables are never split across pages.
+    """
+    df = filter_rows(df, search, search_cols)
+
+    if sort_by:
+        df = df.sort_values(sort_by, ascending=ascending, kind="mergesort")
+
+    if group_col is not None:
+        keys = df[group_col].drop_duplicates()
+        total = len(keys)
+    else:
+        total = len(df)
+
+    pages = max(1, math.ceil(total / page_size))
+    number = min(max(1, int(page)), pages)
+    lo = (number - 1) * page_size
+    hi = min(lo + page_size, total)
+
+    if group_col is not None:
+        visible = df[df[group_col].isin(keys.iloc[lo:hi])]
+    else:
+        visible = df.iloc[lo:hi]
+
+    return visible.reset_index(drop=True), Page(number, pages, total, lo + 1, hi)
@@ -0,0 +1,197 @@
+"""
+Daily_Balance reconciliation and audit.
+
+Recomputes every day's sales, expense, opening and closing balance from
+Sheet1 and Sales with ``ledger.rebuild_balance_table`` (one groupby per
+source + one cumulative sum), diffs the result against Daily_Balance
+column by column and, when asked, writes the corrected ledger back in a
+single range write.  Catches the drift left by backdated entries that
+never cascaded, races between writers and rows edited by hand.
+
+    python reconcile.py                     # audit every branch
+    python reconcile.py --apply             # audit and correct
+    python reconcile.py --branch "Anna Nagar" --show 50
+"""
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from cli import job_parser, resolve_branches
+from constants import DATE_FMT, TIMEZONE, EXPENSE_SHEET, SALES_SHEET, BALANCE_SHEET
+from frames import expense_frame, sales_frame, balance_frame
+from ledger import rebuild_balance_table, write_balance_table
+from schema import encode_datetime
+from sheet_cache import read_records
+from storage import open_branch_set
+
+BALANCE_COLS = ["Opening Balance", "Total Sales", "Total Expense", "Closing Balance"]
+
+# Amounts are kept to 2 decimals → anything below half a paisa is equal
+TOLERANCE = 0.005
+
+# Differences printed per branch by the CLI
+SHOW_DIFFERENCES = 20
+
+
+@dataclass(frozen=True)
+class Audit:
+    table: object           # corrected Daily_Balance, one row per day
+    differences: object     # one row per (day, column) that is off
+    duplicates: int         # extra rows for a day that already has one
+    unreadable: int         # rows whose Date cannot be parsed
+    in_order: bool          # recorded days are sorted
+
+    @property
+    def days(self):
+        return len(self.table)
+
+    @property
+    def days_off(self):
+        return self.differences["date"].nunique() if not self.differences.empty else 0
+
+    @property
+    def clean(self):
+        return (
+            self.differences.empty
+            and not self.duplicates
+            and not self.unreadable
+            and self.in_order
+        )
+
+
+def audit(sales_df, expense_df, balance_df):
+    """Compare Daily_Balance (``balance_df``) with a rebuild from the sources."""
+    table = rebuild_balance_table(sales_df, expense_df, balance_df)
+
+    if balance_df is None or balance_df.empty:
+        balance_df = pd.DataFrame(columns=["date", "Entry Timestamp"] + BALANCE_COLS)
+
+    unreadable = int(balance_df["date"].isna().sum())
+    known = balance_df.dropna(subset=["date"])
+    duplicates = int(known["date"].duplicated().sum())
+    recorded = known.drop_duplicates("date").set_index("date")
+
+    expected = table.set_index("date")[BALANCE_COLS]
+    actual = recorded[BALANCE_COLS].reindex(expected.index).astype(float)
+
+    # ---------- Every (day, column) that is off, in one pass ----------
+    exp_values = expected.to_numpy(dtype=float)
+    act_values = actual.to_numpy(dtype=float)
+    off = np.isnan(act_values) | (np.abs(exp_values - act_values) > TOLERANCE)
+    days, cols = np.nonzero(off)
+
+    differences = pd.DataFrame({
+        "date": expected.index[days],
+        "Column": np.asarray(BALANCE_COLS)[cols],
+        "Recorded": act_values[days, cols],
+        "Expected": exp_values[days, cols],
+    })
+    differences["Difference"] = differences["Expected"] - differences["Recorded"]
+
+    # Unchanged days keep their timestamp; corrected ones get the new one
+    stamps = recorded.get("Entry Timestamp", pd.Series(dtype=object))
+    table["Entry Timestamp"] = (
+        table["date"].map(stamps)
+        .where(~table["date"].isin(differences["date"]), "")
+        .fillna("")
+    )
+
+    return Audit(
+        table=table,
+        differences=differences,
+        duplicates=duplicates,
+        unreadable=unreadable,
+        in_order=bool(known["date"].is_monotonic_increasing),
+    )
+
+
+def reconcile_worksheets(worksheets, now_str, apply=False):
+    """Audit one branch; with ``apply`` write the corrections in one batch."""
+    balance_sheet = worksheets[BALANCE_SHEET]
+    balance_records = read_records(balance_sheet)
+
+    result = audit(
+        sales_frame(read_records(worksheets[SALES_SHEET])),
+        expense_frame(read_records(worksheets[EXPENSE_SHEET])),
+        balance_frame(balance_records),
+    )
+
+    if apply and not result.clean:
+        write_balance_table(
+            balance_sheet,
+            result.table,
+            now_str=now_str,
+            existing_rows=len(balance_records)
+        )
+
+    return result
+
+
+# =================================================
+# 🖥️ CLI
+# =================================================
+def _rupees(value):
+    return "—" if pd.isna(value) else f"₹ {value:,.2f}"
+
+
+def print_audit(branch, result, elapsed, show=SHOW_DIFFERENCES):
+    print(
+        f"[{branch}] {result.days:,} day(s) checked in {elapsed:,.2f}s: "
+        f"{result.days_off:,} day(s) off, "
+        f"{result.duplicates:,} duplicate row(s), "
+        f"{result.unreadable:,} unreadable date(s)"
+        + ("" if result.in_order else ", rows out of order")
+    )
+
+    for r in result.differences.head(show).to_dict("records"):
+        print(
+            f"    {r['date'].strftime(DATE_FMT)}  {r['Column']:<16} "
+            f"recorded {_rupees(r['Recorded']):>14}  expected {_rupees(r['Expected']):>14}"
+        )
+    if len(result.differences) > show:
+        print(f"    … {len(result.differences) - show:,} more")
+
+
+def parse_args(argv=None):
+    parser = job_parser(
+        __doc__, "Branch to audit (repeatable; default: every registered branch)"
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Write the corrected Daily_Balance (one batch write per branch)"
+    )
+    parser.add_argument("--show", type=int, default=SHOW_DIFFERENCES)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    secrets, registry = resolve_branches(args)
+    if registry is None:
+        return 2
+
+    branch_set = open_branch_set(secrets, registry, probe=False)
+    now_str = encode_datetime(datetime.now(pytz.timezone(TIMEZONE)))
+
+    drift = False
+    for branch, worksheets in branch_set.worksheets.items():
+        started = time.perf_counter()
+        result = reconcile_worksheets(worksheets, now_str, apply=args.apply)
+        print_audit(branch, result, time.perf_counter() - started, show=args.show)
+
+        if args.apply and not result.clean:
+            print(f"[{branch}] Daily_Balance rewritten ({result.days:,} day(s))")
+        drift = drift or not result.clean
+
+    return 1 if drift and not args.apply else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
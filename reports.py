@@ -0,0 +1,178 @@
+"""
+Excel / PDF report export for a chosen month or year.
+
+Every table comes from the aggregation engine's memoized results (and
+the cached attendance frame), so a report never re-fetches raw sheets.
+The workbook and PDF are rendered into in-memory buffers and handed to
+the download button as bytes.
+"""
+import io
+from datetime import datetime
+
+import pandas as pd
+
+from aggregations import Query
+from constants import DATE_FMT
+
+# Rows per PDF page (A4 portrait)
+PDF_ROWS_PER_PAGE = 32
+
+
+def period_filter(year, month=None):
+    return (("year", year),) + ((("month", month),) if month else ())
+
+
+def period_label(year, month=None):
+    if month:
+        return datetime(year, month, 1).strftime("%B %Y")
+    return str(year)
+
+
+# =================================================
+# 📋 TABLES
+# =================================================
+def report_tables(engine, attendance_df, year, month=None):
+    """Ordered ``{sheet title: DataFrame}`` for the period."""
+    where = period_filter(year, month)
+    has_sales = "sales" in engine
+    has_expenses = "expenses" in engine
+
+    def expense_by(col):
+        return engine.run("expenses", Query("Expense Amount", group_by=(col,), where=where))
+
+    total_sales = engine.scalar("sales", Query("Cash Total", where=where)) if has_sales else 0.0
+    total_expense = (
+        engine.scalar("expenses", Query("Expense Amount", where=where))
+        if has_expenses else 0.0
+    )
+
+    tables = {
+        "Summary": pd.DataFrame([
+            {"Metric": "Period", "Value": period_label(year, month)},
+            {"Metric": "Total Sales", "Value": round(total_sales, 2)},
+            {"Metric": "Total Expense", "Value": round(total_expense, 2)},
+            {"Metric": "Profit / Loss", "Value": round(total_sales - total_expense, 2)},
+        ])
+    }
+
+    if has_expenses:
+        tables["Category"] = expense_by("Category")
+        tables["Payment Mode"] = expense_by("Payment Mode")
+        tables["Expense By"] = expense_by("Expense By")
+
+    if has_sales:
+        tables["Store"] = (
+            engine.run("sales", Query("Cash Total", group_by=("Store",), where=where))
+            .rename(columns={"Cash Total": "Total Sales"})
+        )
+
+    # ---------- Day-wise profit ----------
+    daily = pd.DataFrame(columns=["date_only"])
+    if has_sales:
+        daily = daily.merge(
+            engine.run("sales", Query("Cash Total", bucket="day", where=where))
+            .rename(columns={"Cash Total": "Total Sales"}),
+            on="date_only",
+            how="outer"
+        )
+    if has_expenses:
+        daily = daily.merge(
+            engine.run("expenses", Query("Expense Amount", bucket="day", where=where))
+            .rename(columns={"Expense Amount": "Total Expense"}),
+            on="date_only",
+            how="outer"
+        )
+
+    if not daily.empty:
+        for col in ["Total Sales", "Total Expense"]:
+            if col not in daily.columns:
+                daily[col] = 0.0
+        daily = daily.fillna({"Total Sales": 0.0, "Total Expense": 0.0})
+        daily["Profit / Loss"] = daily["Total Sales"] - daily["Total Expense"]
+        daily = daily.sort_values("date_only").reset_index(drop=True)
+        daily.insert(0, "Date", daily.pop("date_only").map(lambda d: d.strftime(DATE_FMT)))
+        tables["Day-wise Profit"] = daily
+
+    # ---------- Leave days ----------
+    if attendance_df is not None and not attendance_df.empty:
+        att = attendance_df[attendance_df["year"] == year]
+        if month:
+            att = att[att["month"] == month]
+
+        tables["Leave Days"] = (
+            att.groupby("Employee Name", as_index=False)["leave_days"]
+            .sum()
+            .rename(columns={"Employee Name": "Employee", "leave_days": "Leave Days"})
+            .sort_values("Leave Days", ascending=False)
+            .reset_index(drop=True)
+        )
+
+    return tables
+
+
+# =================================================
+# 📗 EXCEL
+# =================================================
+def to_excel(tables):
+    buffer = io.BytesIO()
+
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for title, df in tables.items():
+            # Excel caps sheet names at 31 chars and forbids "/"
+            sheet = title.replace("/", "-")[:31]
+            df.to_excel(writer, sheet_name=sheet, index=False)
+
+            ws = writer.sheets[sheet]
+            for idx, col in enumerate(df.columns, start=1):
+                width = max([len(str(col))] + [len(str(v)) for v in df[col].head(200)])
+                ws.column_dimensions[ws.cell(1, idx).column_letter].width = min(width + 2, 40)
+
+    return buffer.getvalue()
+
+
+# =================================================
+# 📕 PDF (matplotlib tables, no extra dependency)
+# =================================================
+def _fmt_cell(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def to_pdf(tables, title):
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    buffer = io.BytesIO()
+
+    with PdfPages(buffer) as pdf:
+        for name, df in tables.items():
+            pages = max(1, -(-len(df) // PDF_ROWS_PER_PAGE))
+
+            for page in range(pages):
+                chunk = df.iloc[page * PDF_ROWS_PER_PAGE:(page + 1) * PDF_ROWS_PER_PAGE]
+
+                fig = Figure(figsize=(8.27, 11.69))
+                fig.suptitle(title, fontsize=14, y=0.97)
+
+                ax = fig.add_subplot(111)
+                ax.axis("off")
+                heading = name if pages == 1 else f"{name} ({page + 1}/{pages})"
+                ax.set_title(heading, fontsize=12, loc="left")
+
+                if chunk.empty:
+                    ax.text(0.0, 0.95, "No data for this period.", fontsize=10)
+                else:
+                    table = ax.table(
+                        cellText=[[_fmt_cell(v) for v in row] for row in chunk.values],
+                        colLabels=list(chunk.columns),
+                        loc="upper center",
+                        cellLoc="left",
+                    )
+                    table.auto_set_font_size(False)
+                    table.set_fontsize(8)
+                    table.scale(1, 1.3)
+
+                pdf.savefig(fig)
+
+    return buffer.getvalue()
@@ -0,0 +1,258 @@
+"""
+Incremental rolling statistics and short-term forecasts.
+
+Keeps running 7 / 30 / 90-day sums and sums of squares of *daily*
+totals per key — overall, per store and per store slot for Sales, and
+overall and per category for Sheet1 — so mean and variance of any
+window are O(1) reads.  Each appended row costs O(1) per key it touches;
+moving to a new day drops the days leaving each window once.
+
+``RollingStats.sync`` is fed the cached frames through an
+``incremental.FrameCursor``: when a sheet only grew just the new rows
+are applied; edits and deletes fall back to one rebuild from per-day
+totals.  Forecasts are a weighted blend of the window means with an
+80% band from the 30-day variance, memoized until the data changes.
+"""
+import math
+import threading
+
+import pandas as pd
+
+from incremental import FrameCursor
+
+WINDOWS = (7, 30, 90)
+
+# Next-day forecast = weighted mean of the window means
+FORECAST_WEIGHTS = {7: 0.5, 30: 0.3, 90: 0.2}
+FORECAST_SPREAD_WINDOW = 30
+FORECAST_Z = 1.28       # 80% band
+
+# source -> (date column, amount column, key builder, fingerprint columns)
+SOURCES = {
+    "sales": (
+        "date",
+        "Cash Total",
+        lambda r: [
+            ("Total", "All Stores"),
+            ("Store", r["Store"]),
+            ("Slot", f"{r['Store']} · {r['Slot']}"),
+        ],
+        ("Date", "Store", "Slot", "Cash Total"),
+    ),
+    "expenses": (
+        "datetime",
+        "Expense Amount",
+        lambda r: [
+            ("Total", "All Categories"),
+            ("Category", r["Category"]),
+        ],
+        ("Date & Time", "Category", "Sub-Category", "Expense Amount"),
+    ),
+}
+
+
+class RollingState:
+    """Daily totals of one key inside the largest window + running sums."""
+
+    __slots__ = ("daily", "first", "sums", "squares")
+
+    def __init__(self):
+        self.daily = {}                             # day ordinal -> total
+        self.first = None                           # first day ever seen
+        self.sums = dict.fromkeys(WINDOWS, 0.0)
+        self.squares = dict.fromkeys(WINDOWS, 0.0)
+
+    def add(self, day, amount, as_of):
+        if self.first is None or day < self.first:
+            self.first = day
+
+        if day <= as_of - max(WINDOWS):
+            return      # older than every window → no effect
+
+        old = self.daily.get(day, 0.0)
+        new = old + amount
+        self.daily[day] = new
+
+        for w in WINDOWS:
+            if day > as_of - w:
+                self.sums[w] += amount
+                self.squares[w] += new * new - old * old
+
+    def advance(self, old_as_of, new_as_of):
+        """Slide every window so it ends on ``new_as_of``."""
+        for w in WINDOWS:
+            # Days in (old - w, old] that fall out of (new - w, new]
+            for day in range(old_as_of - w + 1, min(old_as_of, new_as_of - w) + 1):
+                value = self.daily.get(day, 0.0)
+                if value:
+                    self.sums[w] -= value
+                    self.squares[w] -= value * value
+
+        horizon = new_as_of - max(WINDOWS)
+        for day in [d for d in self.daily if d <= horizon]:
+            del self.daily[day]
+
+    def window(self, w, as_of):
+        """(days, sum, mean, variance) — days capped at the key's history."""
+        if self.first is None:
+            return 0, 0.0, 0.0, 0.0
+
+        days = max(1, min(w, as_of - self.first + 1))
+        total = self.sums[w]
+        mean = total / days
+        variance = 0.0
+        if days > 1:
+            variance = max(0.0, (self.squares[w] - total * total / days) / (days - 1))
+        return days, total, mean, variance
+
+
+class RollingStats:
+
+    def __init__(self):
+        self._states = {name: {} for name in SOURCES}       # source -> key -> state
+        self._as_of = dict.fromkeys(SOURCES)                 # source -> day ordinal
+        self._cursors = {name: FrameCursor(spec[3]) for name, spec in SOURCES.items()}
+        self._forecasts = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Updates
+    # -------------------------------------------------
+    def add(self, source, keys, day, amount):
+        """Apply one row (``day`` as date / Timestamp) — O(1) per key."""
+        ordinal = pd.Timestamp(day).toordinal()
+        with self._lock:
+            self._add(source, keys, ordinal, float(amount))
+            self._forecasts.pop(source, None)
+
+    def _add(self, source, keys, ordinal, amount):
+        states = self._states[source]
+        as_of = self._as_of[source]
+
+        if as_of is None:
+            as_of = self._as_of[source] = ordinal
+        elif ordinal > as_of:
+            for state in states.values():
+                state.advance(as_of, ordinal)
+            as_of = self._as_of[source] = ordinal
+
+        for key in keys:
+            state = states.get(key)
+            if state is None:
+                state = states[key] = RollingState()
+            state.add(ordinal, amount, as_of)
+
+    def sync(self, source, frame, version):
+        """
+        Bring ``source`` up to the cached ``frame``.  Only rows appended
+        since the last sync are applied when everything before them is
+        unchanged; anything else rebuilds once.
+        """
+        date_col, amount_col, key_fn, _ = SOURCES[source]
+        cursor = self._cursors[source]
+
+        with self._lock:
+            pending = cursor.pending(frame, version)
+            if pending is None:
+                return
+
+            new_rows, appended = pending
+            if not appended:
+                self._states[source] = {}
+                self._as_of[source] = None
+
+            if not new_rows.empty:
+                self._apply(source, new_rows, date_col, amount_col, key_fn)
+
+            cursor.advance(frame, version)
+            self._forecasts.pop(source, None)
+
+    def _apply(self, source, rows, date_col, amount_col, key_fn):
+        if len(rows) > max(WINDOWS):
+            # Bulk load: pre-aggregate per key + day, then apply in day order
+            records = []
+            for r in rows.to_dict("records"):
+                day = r[date_col].toordinal()
+                for key in key_fn(r):
+                    records.append((day, key, r[amount_col]))
+
+            daily = (
+                pd.DataFrame(records, columns=["day", "key", "amount"])
+                .groupby(["day", "key"], sort=True)["amount"].sum()
+            )
+            for (day, key), amount in daily.items():
+                self._add(source, [key], day, float(amount))
+            return
+
+        for r in rows.to_dict("records"):
+            self._add(source, key_fn(r), r[date_col].toordinal(), float(r[amount_col]))
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def as_of(self, source):
+        ordinal = self._as_of[source]
+        return None if ordinal is None else pd.Timestamp.fromordinal(ordinal).date()
+
+    def stats(self, source, dimension=None):
+        """Rolling sum / mean / variance per key and window."""
+        rows = []
+        with self._lock:
+            as_of = self._as_of[source]
+            if as_of is None:
+                return pd.DataFrame()
+
+            for (dim, name), state in self._states[source].items():
+                if dimension is not None and dim != dimension:
+                    continue
+                for w in WINDOWS:
+                    days, total, mean, variance = state.window(w, as_of)
+                    rows.append({
+                        "Dimension": dim,
+                        "Key": name,
+                        "Window": f"{w} days",
+                        "Days": days,
+                        "Sum": round(total, 2),
+                        "Mean": round(mean, 2),
+                        "Std Dev": round(math.sqrt(variance), 2),
+                    })
+
+        return pd.DataFrame(rows)
+
+    def forecast(self, source):
+        """Next-day and next-week forecast per key (memoized per data change)."""
+        with self._lock:
+            cached = self._forecasts.get(source)
+            if cached is not None:
+                return cached.copy()
+
+            as_of = self._as_of[source]
+            rows = []
+            for (dim, name), state in self._states.get(source, {}).items():
+                if as_of is None:
+                    break
+
+                day_mean = sum(
+                    weight * state.window(w, as_of)[2]
+                    for w, weight in FORECAST_WEIGHTS.items()
+                )
+                sd = math.sqrt(state.window(FORECAST_SPREAD_WINDOW, as_of)[3])
+
+                rows.append({
+                    "Dimension": dim,
+                    "Key": name,
+                    "Next Day": round(day_mean, 2),
+                    "Next Day Low": round(max(0.0, day_mean - FORECAST_Z * sd), 2),
+                    "Next Day High": round(day_mean + FORECAST_Z * sd, 2),
+                    "Next Week": round(7 * day_mean, 2),
+                    "Next Week Low": round(
+                        max(0.0, 7 * day_mean - FORECAST_Z * sd * math.sqrt(7)), 2
+                    ),
+                    "Next Week High": round(
+                        7 * day_mean + FORECAST_Z * sd * math.sqrt(7), 2
+                    ),
+                })
+
+            result = pd.DataFrame(rows)
+            self._forecasts[source] = result
+            return result.copy()
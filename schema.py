@@ -0,0 +1,224 @@
+"""
+Canonical storage encoding for the four sheets, and its validator.
+
+Rows are written as:
+
+- dates        ISO ``YYYY-MM-DD`` (``STORED_DATE_FMT``)
+- timestamps   ISO ``YYYY-MM-DD HH:MM`` (``STORED_DATETIME_FMT``)
+- amounts      numbers rounded to 2 places (never "1,500" strings)
+- choices      one of the fixed entry-form values, loaded as pandas
+               categoricals (integer codes in memory)
+
+``validate_rows`` guards every write path (entry forms, ledger, bulk
+import); it normalizes what it can and raises ``SchemaError`` for the
+rest, so nothing malformed reaches a sheet to be dropped on read.
+``parse_dates`` reads ISO columns in one vectorized pass and only falls
+back to the legacy DD/MM/YYYY formats for rows not migrated yet
+(``migrate_encoding.py``).
+"""
+import pandas as pd
+
+from constants import (
+    DATE_FMT, DATETIME_FMT, STORED_DATE_FMT, STORED_DATETIME_FMT,
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET,
+    EXPENSE_CATEGORIES, PAYMENT_MODES, EXPENSE_BY,
+    SALES_SLOTS, ABSENT_MARK, PRESENT_MARK,
+)
+
+STORES = list(dict.fromkeys(store for store, _ in SALES_SLOTS))
+SLOTS = list(dict.fromkeys(slot for _, slot in SALES_SLOTS))
+MARKS = [ABSENT_MARK, PRESENT_MARK]
+
+# Column kinds: "date", "datetime", "amount", "text" or a list of choices
+COLUMNS = {
+    EXPENSE_SHEET: {
+        "Date & Time": "datetime",
+        "Category": EXPENSE_CATEGORIES,
+        "Sub-Category": "text",
+        "Expense Amount": "amount",
+        "Payment Mode": PAYMENT_MODES,
+        "Expense By": EXPENSE_BY,
+    },
+    ATTENDANCE_SHEET: {
+        "Date": "date",
+        "Employee Name": "text",
+        "Morning": MARKS,
+        "Night": MARKS,
+        "Entry Timestamp": "datetime",
+    },
+    SALES_SHEET: {
+        "Date": "date",
+        "Store": STORES,
+        "Slot": SLOTS,
+        "Cash Total": "amount",
+        "Entry Timestamp": "datetime",
+    },
+    BALANCE_SHEET: {
+        "Date": "date",
+        "Opening Balance": "amount",
+        "Total Sales": "amount",
+        "Total Expense": "amount",
+        "Closing Balance": "amount",
+        "Entry Timestamp": "datetime",
+    },
+}
+
+STORED_FORMATS = {"date": STORED_DATE_FMT, "datetime": STORED_DATETIME_FMT}
+LEGACY_FORMATS = {"date": DATE_FMT, "datetime": DATETIME_FMT}
+
+# Columns that may be left blank
+OPTIONAL = {"Sub-Category", "Entry Timestamp"}
+
+
+class SchemaError(ValueError):
+    """Rows that do not fit the storage encoding (one message per problem)."""
+
+    def __init__(self, sheet, problems):
+        self.sheet = sheet
+        self.problems = problems
+        super().__init__(f"{sheet}: " + "; ".join(problems))
+
+
+# =================================================
+# ✍️ ENCODE
+# =================================================
+def encode_date(value):
+    return value.strftime(STORED_DATE_FMT)
+
+
+def encode_datetime(value):
+    return value.strftime(STORED_DATETIME_FMT)
+
+
+def date_keys(day):
+    """
+    Every spelling of ``day`` a Date cell may hold — ISO, plus the legacy
+    DD/MM/YYYY until ``migrate_encoding.py`` has run — for ``find_rows``.
+    """
+    return (day.strftime(STORED_DATE_FMT), day.strftime(DATE_FMT))
+
+
+def _parse_one(value, kind):
+    """Stored string (or legacy / date object) → Timestamp, or None."""
+    if hasattr(value, "strftime"):
+        return pd.Timestamp(value)
+
+    text = str(value).strip()
+    for fmt in (STORED_FORMATS[kind], LEGACY_FORMATS[kind]):
+        try:
+            return pd.to_datetime(text, format=fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _amount(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(float(value), 2)
+    return round(float(str(value).replace(",", "").strip()), 2)
+
+
+def normalize_cell(kind, value):
+    """Canonical value for one cell; raises ValueError when impossible."""
+    if isinstance(kind, list):
+        text = "" if value is None else str(value).strip()
+        if text not in kind:
+            raise ValueError(f"{text!r} is not one of {', '.join(kind)}")
+        return text
+
+    if kind in STORED_FORMATS:
+        parsed = _parse_one(value, kind)
+        if parsed is None or pd.isna(parsed):
+            raise ValueError(f"{value!r} is not a {kind}")
+        return parsed.strftime(STORED_FORMATS[kind])
+
+    if kind == "amount":
+        try:
+            amount = _amount(value)
+        except ValueError:
+            raise ValueError(f"{value!r} is not a number") from None
+        if amount != amount:    # NaN
+            raise ValueError("amount is empty")
+        return amount
+
+    return "" if value is None else str(value).strip()
+
+
+def normalize_row(sheet, row):
+    """
+    ``(row, problems)`` — the row in the storage encoding, with every cell
+    that cannot be encoded left as it was and listed in ``problems`` as
+    ``(column, message)``.
+    """
+    columns = list(COLUMNS[sheet].items())
+    row = list(row)[:len(columns)] + [""] * (len(columns) - len(row))
+
+    clean, problems = [], []
+    for (col, kind), value in zip(columns, row):
+        if col in OPTIONAL and (value is None or str(value).strip() == ""):
+            clean.append("")
+            continue
+        try:
+            clean.append(normalize_cell(kind, value))
+        except ValueError as exc:
+            clean.append(value)
+            problems.append((col, str(exc)))
+    return clean, problems
+
+
+def validate_rows(sheet, rows):
+    """
+    Normalized copies of ``rows`` (lists in header order) for ``sheet``;
+    raises ``SchemaError`` listing every cell that cannot be encoded.
+    """
+    out, problems = [], []
+    for n, row in enumerate(rows, start=1):
+        clean, row_problems = normalize_row(sheet, row)
+        out.append(clean)
+        problems.extend(f"row {n} {col}: {message}" for col, message in row_problems)
+
+    if problems:
+        raise SchemaError(sheet, problems)
+    return out
+
+
+# =================================================
+# 📥 DECODE (READ PATH)
+# =================================================
+def parse_dates(values, kind="date"):
+    """
+    Vectorized ISO parse of a date / datetime column.  Rows still in the
+    legacy DD/MM/YYYY layout (not migrated yet) are parsed separately.
+    """
+    values = pd.Series(values)
+    parsed = pd.to_datetime(values, format=STORED_FORMATS[kind], errors="coerce")
+
+    legacy = parsed.isna() & values.notna() & (values.astype(str) != "")
+    if legacy.any():
+        parsed[legacy] = pd.to_datetime(
+            values[legacy], format=LEGACY_FORMATS[kind], errors="coerce"
+        )
+    return parsed
+
+
+def parse_amounts(values):
+    """Numbers pass straight through; legacy "1,500" strings are cleaned."""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    numbers = pd.to_numeric(values, errors="coerce")
+    text = numbers.isna() & values.notna() & (values.astype(str) != "")
+    if text.any():
+        numbers[text] = pd.to_numeric(
+            values[text].astype(str).str.replace(",", "").str.strip(),
+            errors="coerce"
+        )
+    return numbers
+
+
+def as_category(values, choices):
+    """Categorical with the fixed choices first (stable codes) + any extras."""
+    values = pd.Series(values).astype(str).str.strip()
+    extras = sorted(set(values.unique()) - set(choices))
+    return pd.Categorical(values, categories=list(choices) + extras)
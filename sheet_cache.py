@@ -0,0 +1,304 @@
+"""
+Process-wide cache of typed worksheet frames with a background refresher.
+
+Reads are stale-while-revalidate: ``read`` returns the cached frame at
+once and, when it was written through the app or is older than
+``max_age``, leaves the refetch to the ``CacheRefresher`` thread.  Only
+a completely cold sheet (no snapshot, never fetched) is fetched on the
+request path.
+
+With a ``TailProbe`` the refresher checks every warm sheet for changes
+made outside the app in one small batched request and downloads only
+the sheets that moved.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+
+from aggregations import frame_version
+from frames import PARSERS
+
+# Full refetch interval for a sheet nobody has written to through the app
+MAX_AGE = 5 * 60
+
+# With a change probe, full refetches are only a safety net for edits
+# above the probed tail (e.g. someone fixing an old row by hand)
+PROBED_MAX_AGE = 60 * 60
+
+# How often the refresher thread wakes up to look for work
+POLL_INTERVAL = 15
+
+# Trailing rows covered by the probe checksum
+TAIL_ROWS = 5
+
+# Amounts come back as numbers (not "1,500"); date cells as their text
+VALUE_RENDER = {
+    "value_render_option": "UNFORMATTED_VALUE",
+    "date_time_render_option": "FORMATTED_STRING",
+}
+
+
+def records_from_values(values):
+    """``get_all_values`` rows → ``get_all_records``-style dicts."""
+    if not values:
+        return []
+
+    header = values[0]
+    return [dict(zip(header, row)) for row in values[1:]]
+
+
+def read_values(worksheet):
+    """Every row of ``worksheet``, rendered the way the cache reads it."""
+    return worksheet.get_all_values(**VALUE_RENDER)
+
+
+def read_records(worksheet):
+    """
+    Records read and rendered exactly like the cache's, so frames parsed
+    by the headless jobs match the live ones (and their versions).
+    """
+    return records_from_values(read_values(worksheet))
+
+
+def _tail_checksum(rows):
+    digest = hashlib.sha1()
+    for row in rows:
+        cells = [str(v) for v in row]
+        while cells and cells[-1] == "":
+            cells.pop()
+        digest.update(repr(cells).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# =================================================
+# 🔎 CHANGE PROBE
+# =================================================
+@dataclass(frozen=True)
+class ProbeState:
+    row_count: int          # rows incl. header at the last full fetch
+    tail: str               # checksum of the last TAIL_ROWS rows
+
+
+class TailProbe:
+    """
+    Detects changed sheets from row count + a checksum of the tail rows.
+
+    Each probe is a single ``values_batch_get`` covering, for every
+    sheet, its last ``tail`` rows plus the row after them: an append
+    shows up as an extra row, a delete as a missing one, and an
+    overwrite (delete + append with a new timestamp) as a new checksum.
+    """
+
+    def __init__(self, spreadsheet, worksheets, tail=TAIL_ROWS):
+        self.spreadsheet = spreadsheet
+        self.titles = {name: ws.title for name, ws in worksheets.items()}
+        self.tail = tail
+
+    def observe(self, values):
+        return ProbeState(
+            row_count=len(values),
+            tail=_tail_checksum(values[1:][-self.tail:]),
+        )
+
+    def _window(self, state):
+        first = max(2, state.row_count - self.tail + 1)
+        return first, state.row_count + 1
+
+    def changed(self, states):
+        """Names in ``{name: ProbeState}`` whose sheet no longer matches."""
+        if not states:
+            return []
+
+        names = list(states)
+        ranges = []
+        for name in names:
+            first, last = self._window(states[name])
+            title = self.titles[name].replace("'", "''")
+            ranges.append(f"'{title}'!{first}:{last}")
+
+        response = self.spreadsheet.values_batch_get(ranges, params={
+            "valueRenderOption": VALUE_RENDER["value_render_option"],
+            "dateTimeRenderOption": VALUE_RENDER["date_time_render_option"],
+        })
+
+        changed = []
+        for name, value_range in zip(names, response.get("valueRanges", [])):
+            state = states[name]
+            first, _ = self._window(state)
+            rows = value_range.get("values", [])
+
+            expected = state.row_count - first + 1
+            if len(rows) != expected or _tail_checksum(rows) != state.tail:
+                changed.append(name)
+
+        return changed
+
+
+# =================================================
+# 🗄️ SHEET CACHE
+# =================================================
+@dataclass
+class CacheEntry:
+    frame: object
+    version: object
+    fetched_at: float
+    probe_state: ProbeState = None
+
+
+class SheetCache:
+
+    def __init__(self, worksheets, parsers=PARSERS, probe=None, max_age=None):
+        self._worksheets = worksheets
+        self._parsers = parsers
+        self.probe = probe
+
+        if max_age is None:
+            max_age = PROBED_MAX_AGE if probe is not None else MAX_AGE
+        self.max_age = max_age
+
+        self._entries = {}
+        self._written_at = {}
+        self._locks = {name: threading.Lock() for name in worksheets}
+        self._wakeup = threading.Event()
+
+    @property
+    def names(self):
+        return list(self._worksheets)
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def read(self, name):
+        """(frame, version) — never waits on Sheets unless the sheet is cold."""
+        entry = self._entries.get(name)
+
+        if entry is None:
+            return self._fetch(name, only_if_missing=True)
+
+        if self._is_due(name, entry):
+            self._wakeup.set()
+
+        return entry.frame, entry.version
+
+    def get(self, name):
+        return self.read(name)[0]
+
+    # -------------------------------------------------
+    # Writes / seeding
+    # -------------------------------------------------
+    def seed(self, name, frame, fetched_at=None):
+        """Install a precomputed frame (e.g. from the nightly snapshot)."""
+        self._entries.setdefault(name, CacheEntry(
+            frame=frame,
+            version=frame_version(frame),
+            fetched_at=fetched_at if fetched_at is not None else time.time(),
+        ))
+
+    def invalidate(self, *names):
+        """Mark sheets written through the app; the refresher refetches them."""
+        written_at = time.time()
+        for name in names:
+            self._written_at[name] = written_at
+        self._wakeup.set()
+
+    def refresh(self, name):
+        return self._fetch(name)
+
+    def poll(self, on_error=None):
+        """
+        Refetch every sheet that is cold, expired, written through the app
+        or changed; returns the names refetched.  App writes are always
+        refetched (they may touch rows above the probed tail); the probe
+        only looks for writes made outside the app, in one batched
+        request for all remaining warm sheets.
+        """
+        fetch = []
+        probe_states = {}
+
+        for name in self._worksheets:
+            entry = self._entries.get(name)
+
+            if entry is None or self._expired(entry) or self._written(name, entry):
+                fetch.append(name)
+            elif self.probe is not None:
+                if entry.probe_state is None:
+                    fetch.append(name)      # seeded from a snapshot → no baseline
+                else:
+                    probe_states[name] = entry.probe_state
+
+        if probe_states:
+            try:
+                fetch.extend(self.probe.changed(probe_states))
+            except Exception as exc:
+                if on_error is None:
+                    raise
+                on_error("probe", exc)
+
+        refreshed = []
+        for name in fetch:
+            try:
+                self._fetch(name)
+                refreshed.append(name)
+            except Exception as exc:
+                if on_error is None:
+                    raise
+                on_error(name, exc)
+
+        return refreshed
+
+    # -------------------------------------------------
+    # Internals
+    # -------------------------------------------------
+    def _expired(self, entry):
+        return time.time() - entry.fetched_at > self.max_age
+
+    def _written(self, name, entry):
+        return entry.fetched_at <= self._written_at.get(name, 0.0)
+
+    def _is_due(self, name, entry):
+        return self._expired(entry) or self._written(name, entry)
+
+    def _fetch(self, name, only_if_missing=False):
+        with self._locks[name]:
+            entry = self._entries.get(name)
+            if only_if_missing and entry is not None:
+                return entry.frame, entry.version
+
+            started = time.time()
+            values = read_values(self._worksheets[name])
+            frame = self._parsers[name](records_from_values(values))
+
+            entry = CacheEntry(
+                frame=frame,
+                version=frame_version(frame),
+                fetched_at=started,
+                probe_state=self.probe.observe(values) if self.probe else None,
+            )
+            self._entries[name] = entry
+
+        return entry.frame, entry.version
+
+
+class CacheRefresher(threading.Thread):
+    """Daemon thread that keeps every sheet of a ``SheetCache`` warm."""
+
+    def __init__(self, cache, poll_interval=POLL_INTERVAL, on_error=None):
+        super().__init__(name="sheet-cache-refresher", daemon=True)
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.on_error = on_error or (lambda name, exc: None)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.cache._wakeup.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.cache._wakeup.clear()
+
+            # Errors keep the stale frame in place until the next poll
+            self.cache.poll(on_error=self.on_error)
+
+            self.cache._wakeup.wait(self.poll_interval)
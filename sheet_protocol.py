@@ -0,0 +1,79 @@
+"""
+Helpers shared by the worksheet-protocol backends.
+
+``local_sheets`` (in-memory) and ``sqlite_sheets`` both mirror the gspread
+subset the app uses; A1 parsing, the trimming of read ranges and the
+``values_batch_get`` response shape live here once so the two behave
+exactly like Sheets — and like each other.
+"""
+import re
+
+_CELL_RE = re.compile(r"^([A-Z]*)(\d*)$")
+
+
+def _col_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index
+
+
+def parse_a1(a1):
+    """``'Sales'!B2:D5`` → (title or None, row1, col1, row2, col2), 1-based.
+
+    Missing bounds (whole rows / columns) come back as None.
+    """
+    title = None
+    if "!" in a1:
+        title, a1 = a1.rsplit("!", 1)
+        title = title.strip("'").replace("''", "'")
+
+    start, _, end = a1.partition(":")
+    end = end or start
+
+    bounds = []
+    for part in (start, end):
+        match = _CELL_RE.match(part.upper())
+        if match is None:
+            raise ValueError(f"Bad A1 range: {a1!r}")
+        letters, digits = match.groups()
+        bounds.append((
+            int(digits) if digits else None,
+            _col_index(letters) if letters else None,
+        ))
+
+    (row1, col1), (row2, col2) = bounds
+    return title, row1, col1, row2, col2
+
+
+def trim_row(row):
+    row = list(row)
+    while row and row[-1] in ("", None):
+        row.pop()
+    return row
+
+
+def trim_range(rows, col1, col2):
+    """Columns ``col1..col2`` of ``rows`` without trailing blanks, as Sheets returns them."""
+    out = [trim_row(r[col1 - 1:col2] if col2 else r[col1 - 1:]) for r in rows]
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+def batch_get(spreadsheet_id, ranges, read_range):
+    """
+    ``values_batch_get`` response for A1 ``ranges``; ``read_range(title,
+    a1)`` returns the values of one range of the sheet called ``title``.
+    """
+    value_ranges = []
+    for a1 in ranges:
+        title, *_ = parse_a1(a1)
+        values = read_range(title, a1.rsplit("!", 1)[-1])
+
+        value_range = {"range": a1}
+        if values:
+            value_range["values"] = values
+        value_ranges.append(value_range)
+
+    return {"spreadsheetId": spreadsheet_id, "valueRanges": value_ranges}
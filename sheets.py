@@ -0,0 +1,30 @@
+"""
+Google Sheets connection shared by the Streamlit app and headless jobs.
+"""
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+
+from constants import (
+    SCOPE, SPREADSHEET_NAME,
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET,
+)
+
+
+def authorize(service_account_info):
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(
+        dict(service_account_info), SCOPE
+    )
+    return gspread.authorize(creds)
+
+
+def open_spreadsheet(service_account_info, name=SPREADSHEET_NAME):
+    return authorize(service_account_info).open(name)
+
+
+def open_worksheets(spreadsheet):
+    return {
+        EXPENSE_SHEET: spreadsheet.sheet1,
+        ATTENDANCE_SHEET: spreadsheet.worksheet(ATTENDANCE_SHEET),
+        SALES_SHEET: spreadsheet.worksheet(SALES_SHEET),
+        BALANCE_SHEET: spreadsheet.worksheet(BALANCE_SHEET),
+    }
@@ -0,0 +1,131 @@
+"""
+Precomputed snapshots written by the nightly close job.
+
+A snapshot holds the typed frames, the warmed aggregation memo and the
+day's close, so the first page load after a quiet night reads results
+from disk instead of fetching and re-aggregating every sheet.
+"""
+import os
+import pickle
+import re
+import time
+
+import pandas as pd
+
+from aggregations import Query
+from constants import DEFAULT_BRANCH
+
+SNAPSHOT_DIR = os.environ.get(
+    "MTC_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots")
+)
+SNAPSHOT_FILE = "latest-{branch}.pkl"
+
+# Snapshot frames are trusted for this long after the job ran
+SNAPSHOT_MAX_AGE = 12 * 60 * 60
+
+
+# =================================================
+# 🔥 ROLLUPS (mirror the analytics pages' queries)
+# =================================================
+def dashboard_queries(today):
+    today_ts = pd.Timestamp(today)
+    week = today.isocalendar()[1]
+
+    this_month = (("year", today.year), ("month", today.month))
+    this_week = (("year", today.year), ("week", week))
+    this_day = (("date_only", today_ts),)
+
+    return {
+        "expenses": [
+            Query("Expense Amount"),
+            Query("Expense Amount", where=this_month),
+            Query("Expense Amount", where=this_week),
+            Query("Expense Amount", where=this_day),
+            Query("Expense Amount", group_by=("Category",)),
+            Query(
+                "Expense Amount",
+                group_by=("Sub-Category",),
+                where=(("Category", "Others"),)
+            ),
+            Query("Expense Amount", bucket="day", where=this_month),
+            Query("Expense Amount", bucket="week", where=this_month),
+            Query("Expense Amount", bucket="month"),
+            Query("Expense Amount", group_by=("Payment Mode",)),
+            Query("Expense Amount", group_by=("Expense By",)),
+        ],
+        "sales": [
+            Query("Cash Total", where=this_month),
+            Query("Cash Total", where=this_day),
+            Query("Cash Total", group_by=("Store",)),
+            Query("Cash Total", group_by=("Store",), agg="daily_mean"),
+            Query("Cash Total", group_by=("Store",), bucket="day", where=this_month),
+            Query("Cash Total", bucket="day", where=this_month),
+        ],
+    }
+
+
+def warm_rollups(engine, today):
+    for name, queries in dashboard_queries(today).items():
+        try:
+            engine.version(name)
+        except KeyError:
+            continue
+
+        for query in queries:
+            engine.run(name, query)
+
+
+# =================================================
+# 💾 SAVE / LOAD
+# =================================================
+def snapshot_path(directory=SNAPSHOT_DIR, branch=DEFAULT_BRANCH):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", branch).strip("-").lower()
+    return os.path.join(directory, SNAPSHOT_FILE.format(branch=slug))
+
+
+def save_snapshot(
+    frames,
+    engine,
+    close,
+    directory=SNAPSHOT_DIR,
+    branch=DEFAULT_BRANCH
+):
+    """Atomically replace the latest snapshot; returns its path."""
+    os.makedirs(directory, exist_ok=True)
+
+    snapshot = {
+        "generated_at": time.time(),
+        "frames": frames,
+        "engine": engine.export_state(),
+        "close": close,
+    }
+
+    path = snapshot_path(directory, branch)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "wb") as fh:
+        pickle.dump(snapshot, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def load_snapshot(
+    directory=SNAPSHOT_DIR,
+    branch=DEFAULT_BRANCH,
+    max_age=SNAPSHOT_MAX_AGE
+):
+    """Latest snapshot of ``branch`` if present and fresh enough, else None."""
+    path = snapshot_path(directory, branch)
+
+    try:
+        with open(path, "rb") as fh:
+            snapshot = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if time.time() - snapshot.get("generated_at", 0) > max_age:
+        return None
+
+    return snapshot
@@ -0,0 +1,300 @@
+"""
+SQLite storage backend speaking the app's worksheet protocol.
+
+``SqliteSpreadsheet`` / ``SqliteWorksheet`` implement the same gspread
+subset as ``local_sheets`` (row numbers, A1 ranges, appends, deletes),
+so the cache, ledger, jobs and app run unchanged — and fully offline —
+on one ``.db`` file per branch.  Each sheet is a table keyed by its
+dense row position (sheet row number - 1, renumbered on delete) with
+indexes on its date, store, slot and employee columns, and ``find_rows``
+answers "rows for this date / store / slot" from an index instead of a
+full download.
+
+    spreadsheet = SqliteSpreadsheet("data/MTC-Digitization.db")
+    worksheets = open_worksheets(spreadsheet)
+"""
+import json
+import sqlite3
+import threading
+
+from constants import (
+    SHEET_HEADERS,
+    EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET,
+)
+from sheet_protocol import batch_get, parse_a1, trim_range
+
+# Indexed column groups per sheet ("_day" = ISO day of column A)
+INDEXES = {
+    EXPENSE_SHEET: [("_day",), ("Category", "_day")],
+    SALES_SHEET: [("Date", "Store", "Slot"), ("_day", "Store")],
+    ATTENDANCE_SHEET: [("Date", "Employee Name"), ("Employee Name", "_day")],
+    BALANCE_SHEET: [("Date",), ("_day",)],
+}
+
+
+MAX_ROWID = 2 ** 63 - 1
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _iso_day(column):
+    # YYYY-MM-DD or DD/MM/YYYY[ HH:MM] → YYYY-MM-DD, so ranges / ordering use the index
+    c = _quote(column)
+    return (
+        f"CASE WHEN substr({c}, 5, 1) = '-' THEN substr({c}, 1, 10) "
+        f"ELSE substr({c}, 7, 4) || '-' || substr({c}, 4, 2) || '-' || substr({c}, 1, 2) END"
+    )
+
+
+class SqliteWorksheet:
+
+    def __init__(self, spreadsheet, title, header):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.header = list(header)
+        self._table = _quote(title)
+        self._cols = ", ".join(_quote(c) for c in self.header)
+
+    @property
+    def _conn(self):
+        return self.spreadsheet._conn
+
+    @property
+    def _lock(self):
+        return self.spreadsheet._lock
+
+    @property
+    def row_count(self):
+        with self._lock:
+            (count,) = self._conn.execute(
+                f"SELECT COALESCE(MAX(_row), 0) FROM {self._table}"
+            ).fetchone()
+        return count + 1
+
+    def _clean(self, row):
+        return ["" if v is None else v for v in row]
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def get_all_values(self, **kwargs):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._cols} FROM {self._table} ORDER BY _row"
+            ).fetchall()
+        return [list(self.header)] + [self._clean(r) for r in rows]
+
+    def get_all_records(self):
+        return [dict(zip(self.header, row)) for row in self.get_all_values()[1:]]
+
+    def get_values(self, a1):
+        _, row1, col1, row2, col2 = parse_a1(a1)
+        row1 = row1 or 1
+        col1 = col1 or 1
+
+        out = []
+        if row1 == 1:
+            out.append(self.header)
+
+        # Sheet row n is _row n - 1 → a rowid range, whatever its offset
+        first = max(row1, 2) - 1
+        last = MAX_ROWID if row2 is None else row2 - 1
+        if last >= first:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {self._cols} FROM {self._table} "
+                    "WHERE _row BETWEEN ? AND ? ORDER BY _row",
+                    (first, last)
+                ).fetchall()
+            out.extend(self._clean(r) for r in rows)
+
+        return trim_range(out, col1, col2)
+
+    def batch_get(self, ranges, **kwargs):
+        with self._lock:
+            return [self.get_values(a1) for a1 in ranges]
+
+    def col_values(self, col):
+        name = _quote(self.header[col - 1])
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {name} FROM {self._table} ORDER BY _row"
+            ).fetchall()
+
+        values = [self.header[col - 1]] + ["" if r[0] is None else r[0] for r in rows]
+        while values and values[-1] in ("", None):
+            values.pop()
+        return values
+
+    def find_rows(self, **criteria):
+        """
+        ``[(sheet row number, values)]`` of rows whose header columns
+        equal ``criteria`` (e.g. ``Date="2025-02-01", Store="Main"``; a
+        tuple matches any of its items), answered from the sheet's indexes.
+        """
+        clauses, params = [], []
+        for col, value in criteria.items():
+            values = list(value) if isinstance(value, tuple) else [value]
+            clauses.append(f"{_quote(col)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        where = " AND ".join(clauses) or "1"
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT _row + 1, {self._cols} FROM {self._table} "
+                f"WHERE {where} ORDER BY _row",
+                params
+            ).fetchall()
+
+        return [(row[0], self._clean(row[1:])) for row in rows]
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+    def _fit(self, row):
+        row = list(row)[:len(self.header)]
+        return row + [""] * (len(self.header) - len(row))
+
+    def append_row(self, values, **kwargs):
+        self.append_rows([values])
+
+    def append_rows(self, values, **kwargs):
+        placeholders = ", ".join("?" * len(self.header))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO {self._table} ({self._cols}) VALUES ({placeholders})",
+                [self._fit(r) for r in values]
+            )
+
+    def update(self, a1, values, **kwargs):
+        _, row1, col1, _, _ = parse_a1(a1)
+        row1 = row1 or 1
+        col1 = col1 or 1
+        if row1 < 2:
+            raise ValueError("The header row is fixed in the SQLite backend")
+
+        with self._lock, self._conn:
+            (count,) = self._conn.execute(
+                f"SELECT COALESCE(MAX(_row), 0) FROM {self._table}"
+            ).fetchone()
+
+            for offset, new_row in enumerate(values):
+                cells = list(new_row)[:len(self.header) - col1 + 1]
+                position = row1 - 1 + offset
+
+                if position > count:
+                    # Writing past the last row grows the sheet, as in Sheets
+                    row = [""] * (col1 - 1) + cells
+                    self._conn.execute(
+                        f"INSERT INTO {self._table} ({self._cols}) "
+                        f"VALUES ({', '.join('?' * len(self.header))})",
+                        self._fit(row)
+                    )
+                    continue
+
+                assignments = ", ".join(
+                    f"{_quote(self.header[col1 - 1 + i])} = ?" for i in range(len(cells))
+                )
+                if assignments:
+                    self._conn.execute(
+                        f"UPDATE {self._table} SET {assignments} WHERE _row = ?",
+                        [*cells, position]
+                    )
+
+    def add_rows(self, rows):
+        pass        # no grid: tables grow with their rows
+
+    def delete_rows(self, start_index, end_index=None):
+        end_index = end_index or start_index
+        if start_index < 2:
+            raise ValueError("The header row is fixed in the SQLite backend")
+
+        count = end_index - start_index + 1
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM {self._table} WHERE _row BETWEEN ? AND ?",
+                (start_index - 1, end_index - 1)
+            )
+            # Rows below move up, keeping positions dense; negated first so
+            # no key collides halfway through the shift
+            self._conn.execute(
+                f"UPDATE {self._table} SET _row = -(_row - ?) WHERE _row > ?",
+                (count, end_index - 1)
+            )
+            self._conn.execute(f"UPDATE {self._table} SET _row = -_row WHERE _row < 0")
+
+
+class SqliteSpreadsheet:
+
+    def __init__(self, path, title=None, headers=SHEET_HEADERS):
+        self.path = path
+        self.title = title or path
+        self._lock = threading.RLock()
+
+        # One shared connection; WAL lets the nightly job read meanwhile
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        self._worksheets = {}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS _headers (title TEXT PRIMARY KEY, header TEXT)"
+            )
+            for title, header in headers.items():
+                self._create(title, header)
+
+            for title, header in self._conn.execute("SELECT title, header FROM _headers ORDER BY rowid"):
+                self._worksheets[title] = SqliteWorksheet(self, title, json.loads(header))
+
+    def _create(self, title, header):
+        table = _quote(title)
+        columns = ", ".join(_quote(c) for c in header)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "_row INTEGER PRIMARY KEY, "
+            f"{columns}, "
+            f"_day TEXT GENERATED ALWAYS AS ({_iso_day(header[0])}) VIRTUAL)"
+        )
+
+        self._conn.execute(
+            "INSERT OR IGNORE INTO _headers (title, header) VALUES (?, ?)",
+            (title, json.dumps(list(header)))
+        )
+
+        for cols in INDEXES.get(title, []):
+            name = _quote(f"ix_{title}_{'_'.join(cols)}".replace(" ", "_"))
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                f"({', '.join(_quote(c) for c in cols)})"
+            )
+
+    def add_worksheet(self, title, rows=None, **kwargs):
+        header = list((rows or [[]])[0])
+        with self._lock, self._conn:
+            self._create(title, header)
+        ws = self._worksheets[title] = SqliteWorksheet(self, title, header)
+        if rows and len(rows) > 1:
+            ws.append_rows(rows[1:])
+        return ws
+
+    @property
+    def sheet1(self):
+        return next(iter(self._worksheets.values()))
+
+    def worksheet(self, title):
+        return self._worksheets[title]
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def values_batch_get(self, ranges, params=None):
+        return batch_get(
+            self.title, ranges, lambda title, a1: self._worksheets[title].get_values(a1)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,298 @@
+"""
+Pluggable storage for the four sheets.
+
+Every backend speaks the same worksheet protocol (the gspread subset in
+``local_sheets``), so the app, cache, ledger and jobs never know where
+rows live.  The backend is chosen in the Streamlit secrets:
+
+    [storage]
+    backend = "sqlite"          # "sheets" (default) or "sqlite"
+    data_dir = "data"           # one <spreadsheet name>.db per branch
+    sync_to_sheets = true       # mirror local changes to Google Sheets
+    sync_interval = 300         # seconds between mirror passes
+
+With SQLite the app runs fully offline; Sheets becomes an optional sync
+target.  Seed or mirror by hand with:
+
+    python storage.py pull      # Google Sheets → SQLite
+    python storage.py push      # SQLite → Google Sheets
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+
+from branches import BranchSet
+from cli import job_parser, resolve_branches
+from constants import SHEET_HEADERS
+from sheets import open_spreadsheet, open_worksheets
+from sqlite_sheets import SqliteSpreadsheet
+
+BACKENDS = ("sheets", "sqlite")
+DATA_DIR = "data"
+SYNC_INTERVAL = 300
+
+# Seconds between attempts while Google Sheets is unreachable
+SYNC_RETRY = 30
+
+
+def storage_config(secrets):
+    config = dict(secrets.get("storage", {}) or {})
+    config.setdefault("backend", "sheets")
+    config.setdefault("data_dir", DATA_DIR)
+    config.setdefault("sync_to_sheets", False)
+    config.setdefault("sync_interval", SYNC_INTERVAL)
+
+    if config["backend"] not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {config['backend']!r}")
+    return config
+
+
+def sqlite_path(data_dir, spreadsheet_name):
+    return os.path.join(data_dir, f"{spreadsheet_name}.db")
+
+
+# =================================================
+# 🗄️ OPEN
+# =================================================
+def open_sheets_branch_set(secrets, registry, probe=True):
+    return BranchSet.open(secrets["gcp_service_account"], registry, probe=probe)
+
+
+def open_sqlite_branch_set(data_dir, registry, probe=True):
+    os.makedirs(data_dir, exist_ok=True)
+    spreadsheets = {
+        branch: SqliteSpreadsheet(sqlite_path(data_dir, name), title=name)
+        for branch, name in registry.items()
+    }
+    worksheets = {
+        branch: open_worksheets(spreadsheet)
+        for branch, spreadsheet in spreadsheets.items()
+    }
+    return BranchSet.from_worksheets(spreadsheets, worksheets, probe=probe)
+
+
+def open_branch_set(secrets, registry, probe=True):
+    """``BranchSet`` on the configured backend."""
+    config = storage_config(secrets)
+    if config["backend"] == "sqlite":
+        return open_sqlite_branch_set(config["data_dir"], registry, probe=probe)
+    return open_sheets_branch_set(secrets, registry, probe=probe)
+
+
+# =================================================
+# 🔎 LOOKUPS
+# =================================================
+def find_rows(worksheet, **criteria):
+    """
+    ``[(sheet row number, values)]`` of rows whose columns equal
+    ``criteria`` (a tuple value matches any of its items) — an indexed
+    query where the backend has one, one full read otherwise.
+    """
+    native = getattr(worksheet, "find_rows", None)
+    if native is not None:
+        return native(**criteria)
+
+    values = worksheet.get_all_values()
+    if not values:
+        return []
+
+    header = values[0]
+    wanted = [
+        (header.index(col), {str(v) for v in (value if isinstance(value, tuple) else (value,))})
+        for col, value in criteria.items()
+    ]
+    return [
+        (idx, row)
+        for idx, row in enumerate(values[1:], start=2)
+        if all(i < len(row) and str(row[i]) in accepted for i, accepted in wanted)
+    ]
+
+
+def ensure_rows(worksheet, rows):
+    """
+    Grow ``worksheet`` to at least ``rows`` rows before a range write.
+    Sheets rejects an update past the grid (1,000 rows on a new sheet)
+    and only appends grow it.  gspread caches the size from when the sheet
+    was opened, so it is re-read first.
+    """
+    spreadsheet = getattr(worksheet, "spreadsheet", None)
+    current = spreadsheet.worksheet(worksheet.title) if spreadsheet is not None else worksheet
+    if current.row_count < rows:
+        worksheet.add_rows(rows - current.row_count)
+
+
+# =================================================
+# 🔁 SHEETS SYNC
+# =================================================
+def _digest(values):
+    return hashlib.sha1(repr(values).encode("utf-8")).hexdigest()
+
+
+def copy_sheet(source, target, target_values=None):
+    """Make ``target`` hold exactly ``source``'s rows (one write + one delete)."""
+    values = source.get_all_values()
+    if target_values is None:
+        target_values = target.get_all_values()
+
+    if values != target_values:
+        if len(values) > 1:
+            ensure_rows(target, len(values))
+            target.update(f"A2:{chr(ord('A') + len(values[0]) - 1)}{len(values)}", values[1:])
+        if len(target_values) > len(values):
+            target.delete_rows(len(values) + 1, len(target_values))
+    return values
+
+
+def pull_from_sheets(sheets_worksheets, local_worksheets):
+    """Replace every local sheet with its Google Sheets contents."""
+    for name, source in sheets_worksheets.items():
+        target = local_worksheets[name]
+
+        # Records come back numericised → amounts land as numbers
+        rows = [
+            [record.get(col, "") for col in target.header]
+            for record in source.get_all_records()
+        ]
+
+        if target.row_count > 1:
+            target.delete_rows(2, target.row_count)
+        if rows:
+            target.append_rows(rows)
+
+
+class SheetsSync(threading.Thread):
+    """
+    Daemon thread mirroring local sheets to Google Sheets when they change.
+
+    ``open_remote()`` returns the Google worksheets.  It is called from the
+    thread and retried every ``retry`` seconds until it succeeds, so an
+    offline start never blocks or crashes the app.  ``error`` holds the
+    latest failure (None after a clean pass) for the app to show.
+    """
+
+    def __init__(self, local_worksheets, open_remote, interval=SYNC_INTERVAL,
+                 retry=SYNC_RETRY, on_error=None):
+        super().__init__(name="sheets-sync", daemon=True)
+        self.local = local_worksheets
+        self.open_remote = open_remote
+        self.remote = None
+        self.interval = interval
+        self.retry = min(retry, interval)
+        self.on_error = on_error
+        self.error = None
+        self.synced_at = None
+        self._pushed = {}           # sheet -> digest of the last mirrored rows
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _failed(self, name, exc):
+        self.error = f"{name}: {exc}"
+        if self.on_error is not None:
+            self.on_error(name, exc)
+
+    def push(self):
+        if self.remote is None:
+            try:
+                self.remote = self.open_remote()
+            except Exception as exc:
+                self._failed("open", exc)
+                return []
+
+        pushed = []
+        failed = False
+        for name, local in self.local.items():
+            try:
+                values = local.get_all_values()
+                digest = _digest(values)
+                if self._pushed.get(name) == digest:
+                    continue
+
+                copy_sheet(local, self.remote[name])
+                self._pushed[name] = digest
+                pushed.append(name)
+            except Exception as exc:
+                failed = True
+                self._failed(name, exc)
+
+        if not failed:
+            self.error = None
+            self.synced_at = time.time()
+        return pushed
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.push()
+            self._stop_event.wait(self.retry if self.error else self.interval)
+
+
+def start_sheets_sync(secrets, registry, branch_set):
+    """
+    Start mirroring a SQLite ``branch_set`` to Sheets when configured.
+    Spreadsheets are opened by the sync threads, not here.
+    """
+    config = storage_config(secrets)
+    if config["backend"] != "sqlite" or not config["sync_to_sheets"]:
+        return {}
+
+    def opener(name):
+        return lambda: open_worksheets(
+            open_spreadsheet(secrets["gcp_service_account"], name)
+        )
+
+    threads = {}
+    for branch in branch_set.names:
+        threads[branch] = SheetsSync(
+            branch_set.worksheets[branch],
+            opener(registry[branch]),
+            interval=config["sync_interval"],
+        )
+        threads[branch].start()
+    return threads
+
+
+# =================================================
+# 🖥️ CLI
+# =================================================
+def parse_args(argv=None):
+    parser = job_parser(
+        __doc__, "Branch to copy (repeatable; default: every registered branch)"
+    )
+    parser.add_argument("direction", choices=["pull", "push"])
+    parser.add_argument("--data-dir", help="SQLite directory (default: [storage] data_dir)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    secrets, registry = resolve_branches(args)
+    if registry is None:
+        return 2
+
+    data_dir = args.data_dir or storage_config(secrets)["data_dir"]
+    local = open_sqlite_branch_set(data_dir, registry, probe=False)
+    remote = open_sheets_branch_set(secrets, registry, probe=False)
+
+    for branch in registry:
+        if args.direction == "pull":
+            pull_from_sheets(remote.worksheets[branch], local.worksheets[branch])
+        else:
+            for name in SHEET_HEADERS:
+                copy_sheet(local.worksheets[branch][name], remote.worksheets[branch][name])
+
+        rows = {
+            name: ws.row_count - 1 for name, ws in local.worksheets[branch].items()
+        }
+        print(f"[{branch}] {args.direction}: " + ", ".join(
+            f"{name} {count:,}" for name, count in rows.items()
+        ))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
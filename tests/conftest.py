@@ -0,0 +1,88 @@
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import ABSENT_MARK, PRESENT_MARK, STORED_DATE_FMT, STORED_DATETIME_FMT  # noqa: E402
+from frames import PARSERS  # noqa: E402
+from local_sheets import LocalSpreadsheet  # noqa: E402
+from sheets import open_worksheets  # noqa: E402
+
+STORES = (("Bigstreet", "Morning"), ("Main", "Full Day"))
+EMPLOYEES = ("Ravi", "Mani", "Latha")
+
+
+@pytest.fixture
+def spreadsheet():
+    return LocalSpreadsheet.with_default_layout()
+
+
+@pytest.fixture
+def worksheets(spreadsheet):
+    return open_worksheets(spreadsheet)
+
+
+@pytest.fixture
+def make_frame():
+    """``make_frame(sheet, rows)`` → the typed frame the app reads for ``rows``."""
+    def make(sheet, rows):
+        worksheet = LocalSpreadsheet.with_default_layout().worksheet(sheet)
+        worksheet.append_rows(rows)
+        return PARSERS[sheet](worksheet.get_all_records())
+    return make
+
+
+@pytest.fixture
+def sales_rows():
+    """
+    ``sales_rows(days)`` → Sales rows, one per store / slot per day with a
+    random amount; ``missing`` is the share of entries left out.
+    """
+    def make(days, start=date(2025, 1, 1), stores=STORES, missing=0.0, seed=0):
+        rng = np.random.default_rng(seed)
+        rows = []
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).strftime(STORED_DATE_FMT)
+            for store, slot in stores:
+                if rng.random() >= missing:
+                    rows.append([day, store, slot, int(rng.integers(500, 5000)), ""])
+        return rows
+    return make
+
+
+@pytest.fixture
+def expense_rows():
+    """``expense_rows(amounts)`` → Sheet1 rows, one per amount on consecutive days."""
+    def make(amounts, start=datetime(2025, 3, 1, 9, 30), category="Milk", sub="", by="RK"):
+        return [
+            [
+                (start + timedelta(days=offset)).strftime(STORED_DATETIME_FMT),
+                category, sub, amount, "Cash", by,
+            ]
+            for offset, amount in enumerate(amounts)
+        ]
+    return make
+
+
+@pytest.fixture
+def attendance_rows():
+    """
+    ``attendance_rows(days)`` → Attendance rows for every employee per day;
+    each shift is marked absent with probability ``absent``.
+    """
+    def make(days, start=date(2024, 11, 1), names=EMPLOYEES, absent=0.2, seed=0):
+        rng = np.random.default_rng(seed)
+        rows = []
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).strftime(STORED_DATE_FMT)
+            for name in names:
+                morning, night = (
+                    ABSENT_MARK if rng.random() < absent else PRESENT_MARK for _ in range(2)
+                )
+                rows.append([day, name, morning, night, ""])
+        return rows
+    return make
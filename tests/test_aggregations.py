@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregations import AggregationEngine, Query
+
+
+def _sales(days, start="2024-12-01", seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days, freq="D")
+    frame = pd.DataFrame({
+        "date": np.repeat(dates, 3),
+        "Store": np.tile(["Bigstreet", "Main", "Orders"], days),
+        "Cash Total": rng.integers(500, 5000, size=3 * days).astype(float),
+    })
+    return frame[rng.random(len(frame)) > 0.1].reset_index(drop=True)
+
+
+@pytest.fixture
+def engine():
+    engine = AggregationEngine()
+    engine.register("sales", _sales(90), date_col="date", version="v1")
+    return engine
+
+
+def test_grouped_totals_match_pandas(engine):
+    frame = _sales(90)
+
+    result = engine.run("sales", Query("Cash Total", group_by=("Store",))).set_index("Store")
+    expected = frame.groupby("Store")["Cash Total"].sum()
+    pd.testing.assert_series_equal(
+        result["Cash Total"].sort_index(), expected, check_names=False
+    )
+
+    mean = engine.run("sales", Query("Cash Total", group_by=("Store",), agg="mean"))
+    assert mean.set_index("Store")["Cash Total"].to_dict() == pytest.approx(
+        frame.groupby("Store")["Cash Total"].mean().to_dict()
+    )
+
+    count = engine.run("sales", Query("Cash Total", group_by=("Store",), agg="count"))
+    assert count.set_index("Store")["Cash Total"].to_dict() == (
+        frame.groupby("Store").size().to_dict()
+    )
+
+    assert engine.scalar("sales", Query("Cash Total")) == pytest.approx(frame["Cash Total"].sum())
+
+
+def test_buckets_and_filters_match_pandas(engine):
+    frame = _sales(90)
+    frame = frame.assign(year=frame["date"].dt.year, month=frame["date"].dt.month)
+
+    monthly = engine.run("sales", Query("Cash Total", bucket="month"))
+    expected = frame.groupby(["year", "month"])["Cash Total"].sum()
+    assert list(zip(monthly["year"], monthly["month"])) == sorted(expected.index, reverse=True)
+    assert monthly.set_index(["year", "month"])["Cash Total"].to_dict() == expected.to_dict()
+
+    january = (("year", 2025), ("month", 1), ("Store", "Main"))
+    daily = engine.run("sales", Query("Cash Total", bucket="day", where=january))
+    inside = frame[(frame["year"] == 2025) & (frame["month"] == 1) & (frame["Store"] == "Main")]
+    assert dict(zip(daily["date_only"], daily["Cash Total"])) == dict(
+        zip(inside["date"].dt.date, inside["Cash Total"])
+    )
+
+    # Mean of daily totals counts each day once, however many rows it has
+    daily_mean = engine.scalar("sales", Query("Cash Total", agg="daily_mean"))
+    assert daily_mean == pytest.approx(frame.groupby("date")["Cash Total"].sum().mean())
+
+
+def test_results_are_memoized_per_version(engine):
+    query = Query("Cash Total", group_by=("Store",))
+    first = engine.run("sales", query)
+
+    assert engine.register("sales", _sales(90), date_col="date", version="v1") == "v1"
+    assert engine.run("sales", query).equals(first)
+
+    # Results are copies: callers may modify them freely
+    first.loc[0, "Cash Total"] = -1
+    assert engine.run("sales", query).loc[0, "Cash Total"] != -1
+
+
+def test_register_new_version_drops_old_results(engine):
+    query = Query("Cash Total", group_by=("Store",), bucket="day")
+    engine.run("sales", query)
+
+    grown = _sales(120)
+    engine.register("sales", grown, date_col="date", version="v2")
+    assert engine.version("sales") == "v2"
+
+    result = engine.run("sales", query)
+    assert len(result) == grown.groupby(["Store", "date"]).ngroups
+    assert result["Cash Total"].sum() == pytest.approx(grown["Cash Total"].sum())
+
+    # Without a version the content decides
+    assert engine.register("sales", grown, date_col="date") != "v2"
+
+
+def test_unknown_bucket_or_aggregation():
+    with pytest.raises(ValueError):
+        Query("Cash Total", bucket="fortnight")
+    with pytest.raises(ValueError):
+        Query("Cash Total", agg="median")
@@ -0,0 +1,68 @@
+import math
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from anomalies import MIN_HISTORY, ExpenseMonitor, RunningStats
+from constants import EXPENSE_SHEET
+
+
+@pytest.fixture
+def frame_of(make_frame):
+    return lambda rows: make_frame(EXPENSE_SHEET, rows)
+
+
+def test_running_stats_match_pandas():
+    values = [2.1, 2.5, 2.4, 2.9, 2.2]
+    stats = RunningStats()
+    for v in values:
+        stats.add(v)
+
+    assert stats.count == 5
+    assert stats.mean == pytest.approx(sum(values) / 5)
+    assert stats.sd == pytest.approx(float(pd.Series(values).std()))
+
+
+def test_flags_an_extra_zero(expense_rows, frame_of):
+    rows = expense_rows([400, 450, 420, 480, 500, 430, 460, 440, 470, 410])
+    monitor = ExpenseMonitor()
+    monitor.sync(frame_of(rows), "v1")
+
+    assert monitor.check("Milk", "", 450) is None
+    flag = monitor.check("Milk", "", 4500)
+    assert flag is not None and flag.amount == 4500
+    assert math.isclose(flag.typical, 445, rel_tol=0.05)
+
+
+def test_needs_history_before_flagging(expense_rows, frame_of):
+    monitor = ExpenseMonitor()
+    monitor.sync(frame_of(expense_rows([400] * (MIN_HISTORY - 1))), "v1")
+    assert monitor.check("Milk", "", 40000) is None
+
+
+def test_appended_rows_are_not_counted_twice(expense_rows, frame_of):
+    rows = expense_rows([400] * 10)
+    monitor = ExpenseMonitor()
+    monitor.sync(frame_of(rows), "v1")
+
+    # Saved through the form, then brought back by the refetch
+    saved = expense_rows([410], start=datetime(2025, 3, 29, 10, 0))
+    monitor.add_rows(saved)
+    monitor.sync(frame_of(rows + saved), "v2")
+    assert monitor._stats[("Milk",)].count == 11
+
+    # Another writer's row only arrives with the refetch
+    other = expense_rows([420], start=datetime(2025, 3, 29, 11, 0), by="AR")
+    monitor.sync(frame_of(rows + saved + other), "v3")
+    assert monitor._stats[("Milk",)].count == 12
+
+    # An edit above the tail rebuilds from scratch
+    edited = [r[:] for r in rows + saved + other]
+    edited[0][3] = 4000
+    monitor.sync(frame_of(edited), "v4")
+
+    rebuilt = ExpenseMonitor()
+    rebuilt.sync(frame_of(edited), "v1")
+    assert monitor._stats[("Milk",)].count == rebuilt._stats[("Milk",)].count == 12
+    assert monitor._stats[("Milk",)].mean == pytest.approx(rebuilt._stats[("Milk",)].mean)
@@ -0,0 +1,70 @@
+import pytest
+
+from branches import BRANCH_COL, BranchSet, load_branch_registry
+from constants import DEFAULT_BRANCH, EXPENSE_SHEET, SALES_SHEET, SPREADSHEET_NAME
+from local_sheets import LocalSpreadsheet
+from sheets import open_worksheets
+from snapshots import snapshot_path
+
+BRANCHES = ("Main Branch", "Anna Nagar")
+
+
+def test_registry_keeps_declared_order():
+    secrets = {"branches": {"Main Branch": "MTC-Digitization", "Anna Nagar": "MTC-AnnaNagar"}}
+    assert list(load_branch_registry(secrets)) == ["Main Branch", "Anna Nagar"]
+
+
+@pytest.mark.parametrize("secrets", [{}, {"branches": {}}])
+def test_registry_falls_back_to_one_branch(secrets):
+    assert load_branch_registry(secrets) == {DEFAULT_BRANCH: SPREADSHEET_NAME}
+
+
+def test_snapshot_files_use_branch_slugs(tmp_path):
+    assert snapshot_path(str(tmp_path), "Anna Nagar") == str(tmp_path / "latest-anna-nagar.pkl")
+    assert snapshot_path(str(tmp_path), " T. Nagar #2 ").endswith("latest-t-nagar-2.pkl")
+
+
+@pytest.fixture
+def branch_set(sales_rows):
+    spreadsheets = {branch: LocalSpreadsheet.with_default_layout() for branch in BRANCHES}
+    worksheets = {branch: open_worksheets(s) for branch, s in spreadsheets.items()}
+
+    worksheets["Main Branch"][SALES_SHEET].append_rows(sales_rows(3))
+    worksheets["Anna Nagar"][SALES_SHEET].append_rows(
+        sales_rows(2, stores=(("Main", "Full Day"),), seed=1)
+    )
+    return BranchSet.from_worksheets(spreadsheets, worksheets, probe=False)
+
+
+def test_consolidated_read_stacks_every_branch(branch_set):
+    stacked, version = branch_set.consolidated.read(SALES_SHEET)
+
+    assert branch_set.names == list(BRANCHES)
+    assert stacked.groupby(BRANCH_COL).size().to_dict() == {"Main Branch": 6, "Anna Nagar": 2}
+    for branch in BRANCHES:
+        own = branch_set.caches[branch].get(SALES_SHEET)
+        mine = stacked[stacked[BRANCH_COL] == branch]
+        assert mine["Cash Total"].sum() == own["Cash Total"].sum()
+
+    # Same branch versions → the same stacked frame
+    again, same = branch_set.consolidated.read(SALES_SHEET)
+    assert again is stacked and same == version
+
+
+def test_consolidated_read_follows_one_branch(branch_set, sales_rows):
+    _, before = branch_set.consolidated.read(SALES_SHEET)
+
+    branch_set.worksheets["Anna Nagar"][SALES_SHEET].append_rows(
+        sales_rows(1, stores=(("Orders", "Full Day"),), seed=2)
+    )
+    branch_set.caches["Anna Nagar"].refresh(SALES_SHEET)
+
+    stacked, after = branch_set.consolidated.read(SALES_SHEET)
+    assert after != before
+    assert dict(after)["Main Branch"] == dict(before)["Main Branch"]
+    assert (stacked[BRANCH_COL] == "Anna Nagar").sum() == 3
+
+
+def test_consolidated_read_skips_empty_branches(branch_set):
+    stacked, _ = branch_set.consolidated.read(EXPENSE_SHEET)
+    assert stacked.empty
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from bulk_import import ERROR_COL, import_file, iter_chunks
+from constants import ATTENDANCE_SHEET, BALANCE_SHEET, EXPENSE_SHEET, SALES_SHEET
+
+NOW = "2025-03-15 10:00"
+
+SALES_CSV = """Date,Store,Slot,Cash Total
+14/03/2025,Bigstreet,Morning,"4,200"
+14/03/2025,Main,Full Day,6100
+2025-03-15,Orders,Full Day,900
+15/03/2025,Orders,Full Day,900
+15/03/2025,Nowhere,Full Day,10
+"""
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_sales_import_is_idempotent(tmp_path, worksheets):
+    path = _write(tmp_path, "sales.csv", SALES_CSV)
+    rejects = tmp_path / "rejects.csv"
+
+    assert import_file(worksheets, "sales", path, NOW, rejects_path=str(rejects)) == (3, 2)
+    assert "already recorded" in rejects.read_text(encoding="utf-8")
+
+    # Second run: every row is already in the sheet
+    assert import_file(worksheets, "sales", path, NOW) == (0, 5)
+    assert worksheets[SALES_SHEET].row_count == 4
+
+    balance = worksheets[BALANCE_SHEET].get_all_records()
+    assert [r["Total Sales"] for r in balance] == [10300, 900]
+
+
+def test_attendance_import_skips_recorded_days(tmp_path, worksheets):
+    worksheets[ATTENDANCE_SHEET].append_rows([["14/03/2025", "Ravi", "✖", "✔", NOW]])
+    path = _write(tmp_path, "att.csv", (
+        "Date,Employee Name,Morning,Night\n"
+        "2025-03-14,Ravi,✔,✔\n"
+        "2025-03-14,Mani,✔,✖\n"
+    ))
+
+    assert import_file(worksheets, "attendance", path, NOW) == (1, 1)
+    assert worksheets[ATTENDANCE_SHEET].row_count == 3
+
+
+def test_excel_blank_header_keeps_columns_aligned(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Date", None, "Store", "Slot", "Cash Total", None])
+    sheet.append(["14/03/2025", "note", "Main", "Full Day", 6100])
+    path = str(tmp_path / "sales.xlsx")
+    workbook.save(path)
+
+    chunk = next(iter_chunks(path))
+    assert list(chunk.columns) == ["Date", "Unnamed: 1", "Store", "Slot", "Cash Total"]
+    assert chunk.loc[0, "Store"] == "Main"
+    assert chunk.loc[0, "Cash Total"] == 6100
+
+
+def test_rejects_keep_the_reason(tmp_path, worksheets):
+    path = _write(tmp_path, "sales.csv", SALES_CSV)
+    rejects = tmp_path / "rejects.csv"
+    import_file(worksheets, "sales", path, NOW, rejects_path=str(rejects), dry_run=True)
+
+    lines = rejects.read_text(encoding="utf-8").splitlines()
+    assert lines[0].endswith(ERROR_COL)
+    assert len(lines) == 3
+
+
+def test_excel_datetimes_are_stored_as_iso(tmp_path, worksheets):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Date", "Store", "Slot", "Cash Total", "Entry Timestamp"])
+    sheet.append([datetime(2025, 3, 14), "Main", "Full Day", 6100, datetime(2025, 3, 14, 21, 5)])
+    sheet.append([datetime(2025, 3, 15), "Main", "Full Day", 5200, None])
+    path = str(tmp_path / "sales.xlsx")
+    workbook.save(path)
+
+    assert import_file(worksheets, "sales", path, NOW) == (2, 0)
+    assert worksheets[SALES_SHEET].get_all_values()[1:] == [
+        ["2025-03-14", "Main", "Full Day", 6100.0, "2025-03-14 21:05"],
+        ["2025-03-15", "Main", "Full Day", 5200.0, NOW],
+    ]
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Date & Time", "Category", "Sub-Category", "Expense Amount",
+                  "Payment Mode", "Expense By"])
+    sheet.append([datetime(2025, 3, 14, 9, 30), "Milk", None, 450, "Cash", "RK"])
+    path = str(tmp_path / "expenses.xlsx")
+    workbook.save(path)
+
+    assert import_file(worksheets, "expenses", path, NOW) == (1, 0)
+    assert worksheets[EXPENSE_SHEET].get_all_values()[1][:4] == [
+        "2025-03-14 09:30", "Milk", "", 450.0
+    ]
+
+
+def test_csv_legacy_timestamps_are_converted(tmp_path, worksheets):
+    path = _write(tmp_path, "sales.csv", (
+        "Date,Store,Slot,Cash Total,Entry Timestamp\n"
+        "03/01/2020,Main,Full Day,6100,03/01/2020 21:00\n"
+        "04/01/2020,Main,Full Day,5200,2020-01-04 20:45\n"
+        "05/01/2020,Main,Full Day,4800,last tuesday\n"
+    ))
+    rejects = tmp_path / "rejects.csv"
+
+    assert import_file(worksheets, "sales", path, NOW, rejects_path=str(rejects)) == (2, 1)
+    assert [r[4] for r in worksheets[SALES_SHEET].get_all_values()[1:]] == [
+        "2020-01-03 21:00", "2020-01-04 20:45"
+    ]
+    assert "Entry Timestamp: 'last tuesday' is not a datetime" in rejects.read_text(encoding="utf-8")
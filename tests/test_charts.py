@@ -0,0 +1,68 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import charts
+from aggregations import AggregationEngine
+from charts import ChartRenderer, ChartSpec, downsample, fallback_frame
+from constants import SALES_SHEET
+
+
+@pytest.fixture
+def engine(make_frame, sales_rows):
+    stores = (("Main", "Full Day"), ("Orders", "Full Day"))
+    rows = sales_rows(800, start=date(2024, 1, 1), stores=stores)
+    engine = AggregationEngine()
+    engine.register("sales", make_frame(SALES_SHEET, rows), date_col="date")
+    return engine
+
+
+def test_downsample_keeps_ends_and_peaks():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[500] = 100.0
+
+    idx = downsample(x, y, max_points=50)
+    assert len(idx) <= 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert 500 in idx
+    assert list(downsample(x[:10], y[:10], max_points=50)) == list(range(10))
+
+
+def test_renderer_caches_per_version(engine):
+    renderer = ChartRenderer()
+    spec = ChartSpec("sales", "Cash Total", "Sales", line_by="Store")
+
+    png = renderer.get(engine, spec, wait=30)
+    assert png.startswith(b"\x89PNG")
+    assert renderer.get(engine, spec, wait=0) is png
+
+    empty = ChartSpec("sales", "Cash Total", "Sales", start=pd.Timestamp("2030-01-01").date())
+    assert renderer.get(engine, empty, wait=30) == b""
+
+
+def test_failed_render_raises_and_retries(engine, monkeypatch):
+    renderer = ChartRenderer()
+    spec = ChartSpec("sales", "Cash Total", "Sales")
+
+    def broken(lines, title):
+        raise RuntimeError("no fonts")
+
+    monkeypatch.setattr(charts, "render_png", broken)
+    with pytest.raises(RuntimeError):
+        renderer.get(engine, spec, wait=30)
+
+    monkeypatch.undo()
+    assert renderer.get(engine, spec, wait=30).startswith(b"\x89PNG")
+
+
+def test_fallback_frame(engine):
+    spec = ChartSpec("sales", "Cash Total", "Sales", line_by="Store")
+    frame = fallback_frame(engine, spec, max_points=100)
+
+    assert list(frame.columns) == ["Main", "Orders", "Total"]
+    assert len(frame) <= 100
+    assert frame.index[0] == pd.Timestamp("2024-01-01")
+    assert frame.index[-1] == pd.Timestamp("2024-01-01") + pd.Timedelta(days=799)
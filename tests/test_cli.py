@@ -0,0 +1,54 @@
+import pytest
+
+import bulk_import
+import migrate_encoding
+import nightly_close
+import reconcile
+import storage
+from cli import resolve_branches
+
+SECRETS = """
+[branches]
+"Main Branch" = "MTC-Digitization"
+"Anna Nagar" = "MTC-Digitization-AnnaNagar"
+"""
+
+
+@pytest.fixture
+def secrets_file(tmp_path):
+    path = tmp_path / "secrets.toml"
+    path.write_text(SECRETS, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("parse_args, extra", [
+    (nightly_close.parse_args, []),
+    (reconcile.parse_args, ["--apply"]),
+    (migrate_encoding.parse_args, ["--dry-run"]),
+    (storage.parse_args, ["pull"]),
+])
+def test_jobs_share_branch_selection(secrets_file, parse_args, extra):
+    args = parse_args(["--secrets", secrets_file, "--branch", "Anna Nagar", *extra])
+    _, registry = resolve_branches(args)
+    assert registry == {"Anna Nagar": "MTC-Digitization-AnnaNagar"}
+
+    _, registry = resolve_branches(parse_args(["--secrets", secrets_file, *extra]))
+    assert list(registry) == ["Main Branch", "Anna Nagar"]
+
+
+def test_unknown_branch_is_reported(secrets_file, capsys):
+    args = reconcile.parse_args(["--secrets", secrets_file, "--branch", "Nowhere"])
+    assert resolve_branches(args)[1] is None
+    assert "Unknown branch: Nowhere" in capsys.readouterr().err
+
+    assert reconcile.main(["--secrets", secrets_file, "--branch", "Nowhere"]) == 2
+
+
+def test_bulk_import_takes_one_branch(secrets_file):
+    args = bulk_import.parse_args(["sales", "x.csv", "--secrets", secrets_file])
+    assert list(resolve_branches(args)[1]) == ["Main Branch", "Anna Nagar"]
+
+    args = bulk_import.parse_args(
+        ["sales", "x.csv", "--secrets", secrets_file, "--branch", "Anna Nagar"]
+    )
+    assert list(resolve_branches(args)[1]) == ["Anna Nagar"]
@@ -0,0 +1,165 @@
+from datetime import date
+
+import pytest
+
+from constants import BALANCE_SHEET, EXPENSE_SHEET, SALES_SHEET
+from entries import record_expenses, record_sales
+from ledger import new_submission_key
+from local_sheets import LocalAPIError, RequestMeter, SheetsLimits
+
+DAY = date(2025, 3, 14)
+NOW = "2025-03-14 21:00"
+
+
+def _throttle_writes(spreadsheet, writes_per_minute=0):
+    spreadsheet.meter = RequestMeter(SheetsLimits(
+        reads_per_minute=1000, writes_per_minute=writes_per_minute, latency=(0, 0)
+    ))
+
+
+def _expense_rows():
+    return [["2025-03-14 09:30", "Milk", "", 450, "Cash", "RK"]]
+
+
+def _sales_rows():
+    return [
+        ["2025-03-14", "Bigstreet", "Morning", 4200, NOW],
+        ["2025-03-14", "Main", "Full Day", 6100, NOW],
+    ]
+
+
+def test_expense_retry_after_429_is_saved(spreadsheet, worksheets):
+    key = new_submission_key()
+
+    _throttle_writes(spreadsheet)
+    with pytest.raises(LocalAPIError):
+        record_expenses(
+            worksheets[EXPENSE_SHEET], worksheets[BALANCE_SHEET], key, _expense_rows(), DAY, NOW
+        )
+    assert worksheets[EXPENSE_SHEET].row_count == 1
+
+    spreadsheet.meter = None
+    assert record_expenses(
+        worksheets[EXPENSE_SHEET], worksheets[BALANCE_SHEET], key, _expense_rows(), DAY, NOW
+    )
+    assert worksheets[EXPENSE_SHEET].row_count == 2
+    assert worksheets[BALANCE_SHEET].get_all_records()[0]["Total Expense"] == 450
+
+    # A repeat of the saved submission is still refused
+    assert not record_expenses(
+        worksheets[EXPENSE_SHEET], worksheets[BALANCE_SHEET], key, _expense_rows(), DAY, NOW
+    )
+    assert worksheets[EXPENSE_SHEET].row_count == 2
+
+
+def test_expense_rows_are_not_written_twice_when_the_ledger_fails(spreadsheet, worksheets):
+    key = new_submission_key()
+
+    # The append goes through, the Daily_Balance insert is throttled
+    _throttle_writes(spreadsheet, writes_per_minute=1)
+    with pytest.raises(LocalAPIError):
+        record_expenses(
+            worksheets[EXPENSE_SHEET], worksheets[BALANCE_SHEET], key, _expense_rows(), DAY, NOW
+        )
+
+    spreadsheet.meter = None
+    assert not record_expenses(
+        worksheets[EXPENSE_SHEET], worksheets[BALANCE_SHEET], key, _expense_rows(), DAY, NOW
+    )
+    assert worksheets[EXPENSE_SHEET].row_count == 2
+
+
+def test_sales_retry_after_429_is_saved(spreadsheet, worksheets):
+    key = new_submission_key()
+
+    _throttle_writes(spreadsheet)
+    with pytest.raises(LocalAPIError):
+        record_sales(
+            worksheets[SALES_SHEET], worksheets[BALANCE_SHEET], key, _sales_rows(), DAY, NOW
+        )
+
+    spreadsheet.meter = None
+    assert record_sales(
+        worksheets[SALES_SHEET], worksheets[BALANCE_SHEET], key, _sales_rows(), DAY, NOW
+    )
+    assert worksheets[SALES_SHEET].row_count == 3
+    assert worksheets[BALANCE_SHEET].get_all_records()[0]["Total Sales"] == 10300
+
+
+def test_sales_overwrite_adds_only_the_difference(worksheets):
+    record_sales(
+        worksheets[SALES_SHEET], worksheets[BALANCE_SHEET],
+        new_submission_key(), _sales_rows(), DAY, NOW
+    )
+    record_sales(
+        worksheets[SALES_SHEET], worksheets[BALANCE_SHEET],
+        new_submission_key(), [["2025-03-14", "Main", "Full Day", 7000, NOW]], DAY, NOW
+    )
+
+    assert worksheets[SALES_SHEET].row_count == 3
+    assert worksheets[BALANCE_SHEET].get_all_records()[0]["Total Sales"] == 11200
+
+
+class _FailingSheet:
+    """Sales sheet whose ``method`` raises the next ``times`` calls."""
+
+    def __init__(self, sheet, method, times=1):
+        self._sheet = sheet
+        self._method = method
+        self.times = times
+
+    def __getattr__(self, name):
+        attr = getattr(self._sheet, name)
+        if name != self._method:
+            return attr
+
+        def call(*args, **kwargs):
+            if self.times:
+                self.times -= 1
+                raise LocalAPIError(500, "Internal error")
+            return attr(*args, **kwargs)
+        return call
+
+
+def _sales_total(worksheets):
+    return sum(r["Cash Total"] for r in worksheets[SALES_SHEET].get_all_records())
+
+
+def test_failed_overwrite_append_keeps_the_old_rows(worksheets):
+    sales, balance = worksheets[SALES_SHEET], worksheets[BALANCE_SHEET]
+    original = [_sales_rows()[1][:3] + [1000, NOW]]
+    record_sales(sales, balance, new_submission_key(), original, DAY, NOW)
+
+    key = new_submission_key()
+    overwrite = [_sales_rows()[1][:3] + [1200, NOW]]
+    with pytest.raises(LocalAPIError):
+        record_sales(_FailingSheet(sales, "append_rows"), balance, key, overwrite, DAY, NOW)
+
+    assert _sales_total(worksheets) == 1000
+    assert balance.get_all_records()[0]["Total Sales"] == 1000
+
+    # The retry replaces the old row once
+    assert record_sales(sales, balance, key, overwrite, DAY, NOW)
+    assert _sales_total(worksheets) == 1200
+    assert balance.get_all_records()[0]["Total Sales"] == 1200
+
+
+def test_failed_overwrite_delete_is_still_booked(worksheets):
+    sales, balance = worksheets[SALES_SHEET], worksheets[BALANCE_SHEET]
+    record_sales(sales, balance, new_submission_key(), _sales_rows(), DAY, NOW)
+
+    overwrite = [r[:3] + [r[3] + 100, NOW] for r in _sales_rows()]
+    with pytest.raises(LocalAPIError):
+        record_sales(
+            _FailingSheet(sales, "delete_rows"), balance,
+            new_submission_key(), overwrite, DAY, NOW
+        )
+
+    # Old and new rows are both in Sales, and both counted
+    assert sales.row_count == 5
+    assert balance.get_all_records()[0]["Total Sales"] == _sales_total(worksheets) == 10300 + 10500
+
+    # Saving again clears the leftover
+    record_sales(sales, balance, new_submission_key(), overwrite, DAY, NOW)
+    assert sales.row_count == 3
+    assert balance.get_all_records()[0]["Total Sales"] == _sales_total(worksheets) == 10500
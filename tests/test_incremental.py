@@ -0,0 +1,41 @@
+import pandas as pd
+
+from incremental import FrameCursor
+
+
+def _frame(values):
+    return pd.DataFrame({"Date": [f"2025-03-{v:02d}" for v in values], "Amount": values})
+
+
+def test_cursor_appends_then_rebuilds():
+    cursor = FrameCursor(["Date", "Amount"])
+
+    first = _frame([1, 2])
+    rows, appended = cursor.pending(first, "v1")
+    assert not appended and rows is first
+    cursor.advance(first, "v1")
+
+    assert cursor.pending(first, "v1") is None
+
+    grown = _frame([1, 2, 3, 4])
+    rows, appended = cursor.pending(grown, "v2")
+    assert appended and list(rows["Amount"]) == [3, 4]
+    cursor.advance(grown, "v2")
+
+    # Edited with no new rows, or the last synced row replaced → rebuild
+    for edited in (_frame([1, 5, 3, 4]), _frame([1, 2, 3, 7, 6])):
+        rows, appended = cursor.pending(edited, "v3")
+        assert not appended and rows is edited
+
+    deleted = _frame([1, 3])
+    rows, appended = cursor.pending(deleted, "v4")
+    assert not appended and rows is deleted
+
+
+def test_cursor_from_empty():
+    cursor = FrameCursor(["Date", "Amount"])
+    empty = _frame([])
+    cursor.advance(empty, "v1")
+
+    rows, appended = cursor.pending(_frame([1]), "v2")
+    assert appended and list(rows["Amount"]) == [1]
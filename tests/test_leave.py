@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from constants import ABSENT_MARK, ATTENDANCE_SHEET, PRESENT_MARK
+from leave import LeaveCounters
+
+NAMES = ("Ravi", "Mani", "Latha")
+START = date(2024, 11, 1)
+
+
+def _brute(frame, start, end):
+    inside = frame[(frame["date"] >= pd.Timestamp(start)) & (frame["date"] <= pd.Timestamp(end))]
+    shifts = inside.groupby("Employee Name")["absent_shifts"].sum()
+    days = inside[inside["absent_shifts"] > 0].groupby("Employee Name")["date"].nunique()
+    return shifts, days
+
+
+@pytest.fixture
+def frame_of(make_frame):
+    return lambda rows: make_frame(ATTENDANCE_SHEET, rows)
+
+
+@pytest.fixture
+def rows(attendance_rows):
+    return attendance_rows(150, start=START, names=NAMES)
+
+
+def test_ranges_and_months_match_brute_force(rows, frame_of):
+    frame = frame_of(rows)
+    leave = LeaveCounters()
+    leave.sync(frame, "v1")
+
+    for start, end in ((date(2024, 11, 1), date(2025, 3, 30)), (date(2024, 12, 24), date(2025, 1, 6))):
+        shifts, days = _brute(frame, start, end)
+        table = leave.leave_table(start=start, end=end).set_index("Employee")
+        for name in NAMES:
+            assert leave.shifts(name, start, end) == shifts.get(name, 0)
+            assert table.loc[name, "Absent Shifts"] == shifts.get(name, 0)
+            assert table.loc[name, "Leave Days"] == shifts.get(name, 0) / 2
+            assert table.loc[name, "Days Absent"] == days.get(name, 0)
+
+    january = frame[(frame["year"] == 2025) & (frame["month"] == 1)]
+    expected = january.groupby("Employee Name")["absent_shifts"].sum()
+    table = leave.leave_table(year=2025, month=1).set_index("Employee")
+    for name in NAMES:
+        assert leave.month_shifts(name, 2025, 1) == expected[name]
+        assert table.loc[name, "Absent Shifts"] == expected[name]
+
+    monthly = leave.monthly("Ravi", 2025).set_index("Month")
+    assert monthly.loc["January", "Absent Shifts"] == expected["Ravi"]
+    assert monthly.loc["December", "Absent Shifts"] == 0
+
+
+def test_record_day_matches_a_rebuild_without_one(rows, frame_of, monkeypatch):
+    leave = LeaveCounters()
+    leave.sync(frame_of(rows), "v1")
+
+    # A new day, then the same day saved again with changes
+    day = START + timedelta(days=150)
+    first = {"Ravi": (True, True), "Mani": (False, False), "Latha": (True, False)}
+    again = {"Ravi": (False, False), "Mani": (True, True), "Latha": (True, False)}
+    leave.record_day(day, first)
+    leave.record_day(day, again)
+
+    saved = rows + [
+        [day.isoformat(), name, ABSENT_MARK if m else PRESENT_MARK, ABSENT_MARK if n else PRESENT_MARK, ""]
+        for name, (m, n) in again.items()
+    ]
+
+    # The refetched sheet agrees with the counters → no rebuild
+    monkeypatch.setattr(leave, "_rebuild", lambda frame: pytest.fail("rebuilt"))
+    leave.sync(frame_of(saved), "v2")
+    monkeypatch.undo()
+
+    fresh = LeaveCounters()
+    fresh.sync(frame_of(saved), "v1")
+    for start, end in ((START, day), (day, day), (day - timedelta(days=40), day)):
+        pd.testing.assert_frame_equal(
+            leave.leave_table(start=start, end=end), fresh.leave_table(start=start, end=end)
+        )
+    pd.testing.assert_frame_equal(leave.streaks(), fresh.streaks())
+    assert leave.shifts("Mani", day, day) == 2
+
+
+def test_hand_edits_rebuild(rows, frame_of):
+    leave = LeaveCounters()
+    leave.sync(frame_of(rows), "v1")
+
+    edited = [r[:] for r in rows]
+    edited[0][2] = ABSENT_MARK if edited[0][2] == PRESENT_MARK else PRESENT_MARK
+    leave.sync(frame_of(edited), "v2")
+
+    fresh = LeaveCounters()
+    fresh.sync(frame_of(edited), "v1")
+    pd.testing.assert_frame_equal(leave.leave_table(), fresh.leave_table())
+
+
+def test_streaks_and_frequent_absentees(frame_of):
+    rows = []
+    for offset in range(20):
+        day = (START + timedelta(days=offset)).isoformat()
+        ravi = ABSENT_MARK if 3 <= offset <= 7 else PRESENT_MARK        # 5-day run
+        mani = ABSENT_MARK if offset >= 17 else PRESENT_MARK            # still running
+        rows.append([day, "Ravi", ravi, PRESENT_MARK, ""])
+        rows.append([day, "Mani", mani, mani, ""])
+
+    leave = LeaveCounters()
+    leave.sync(frame_of(rows), "v1")
+
+    streaks = leave.streaks().set_index("Employee")
+    assert streaks.loc["Ravi", "Longest Streak"] == 5
+    assert streaks.loc["Ravi", "From"] == START + timedelta(days=3)
+    assert streaks.loc["Ravi", "To"] == START + timedelta(days=7)
+    assert streaks.loc["Ravi", "Current Streak"] == 0
+    assert streaks.loc["Mani", "Current Streak"] == 3
+
+    frequent = leave.frequent_absentees(START, START + timedelta(days=19), min_leave_days=3)
+    assert list(frequent["Employee"]) == ["Mani"]       # 3 full days vs Ravi's 2.5
+
+
+def test_empty(frame_of):
+    leave = LeaveCounters()
+    leave.sync(frame_of([]), "v1")
+    assert leave.leave_table().empty
+    assert leave.streaks().empty
+    assert leave.shifts("Ravi", START, START) == 0
@@ -0,0 +1,205 @@
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from constants import BALANCE_SHEET
+from ledger import (
+    LedgerConflictError, claim_submission, ledger_lock, new_submission_key,
+    release_submission, upsert_daily_balance,
+)
+from schema import SchemaError
+from sqlite_sheets import SqliteSpreadsheet
+
+DAY = date(2025, 3, 14)
+
+
+def _run_concurrently(target, calls):
+    errors = []
+
+    def run(kwargs):
+        try:
+            target(**kwargs)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(kwargs,)) for kwargs in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+class _Proxy:
+
+    def __init__(self, sheet):
+        self._sheet = sheet
+
+    def __getattr__(self, name):
+        return getattr(self._sheet, name)
+
+
+class _SlowSheet(_Proxy):
+    """Balance sheet with a Sheets-like pause before every call."""
+
+    def __getattr__(self, name):
+        time.sleep(random.uniform(0.0, 0.002))
+        return super().__getattr__(name)
+
+
+def test_concurrent_upserts_add_up(worksheets):
+    sheet = _SlowSheet(worksheets[BALANCE_SHEET])
+
+    _run_concurrently(upsert_daily_balance, [
+        dict(balance_sheet=sheet, target_date=DAY, delta_sales=1.0, now_str="2025-03-14 20:00")
+        for _ in range(50)
+    ])
+
+    records = sheet.get_all_records()
+    assert len(records) == 1
+    assert records[0]["Total Sales"] == 50
+    assert records[0]["Closing Balance"] == 50
+
+
+def test_concurrent_upserts_across_days(worksheets):
+    sheet = _SlowSheet(worksheets[BALANCE_SHEET])
+    days = [date(2025, 3, d) for d in (10, 11, 12)]
+
+    _run_concurrently(upsert_daily_balance, [
+        dict(balance_sheet=sheet, target_date=day, delta_sales=10.0, delta_expense=4.0)
+        for day in days
+        for _ in range(10)
+    ])
+
+    records = sheet.get_all_records()
+    assert sorted(r["Date"] for r in records) == ["2025-03-10", "2025-03-11", "2025-03-12"]
+    assert all(r["Total Sales"] == 100 and r["Total Expense"] == 40 for r in records)
+
+
+class _RacingSheet(_Proxy):
+    """Balance sheet where another writer bumps a cell before each version check."""
+
+    def __init__(self, sheet, races, column="C", which=0):
+        super().__init__(sheet)
+        self.races = races
+        self.column = column
+        self.which = which      # 0: the day's row, 1: the previous day's row
+
+    def batch_get(self, ranges, **kwargs):
+        if self.races:
+            self.races -= 1
+            cell = f"{self.column}{ranges[self.which].split(':')[0][1:]}"
+            current = self._sheet.get_values(cell)[0][0]
+            self._sheet.update(cell, [[float(current) + 5]])
+        return self._sheet.batch_get(ranges)
+
+
+def test_upsert_retries_when_the_row_changes(monkeypatch, worksheets):
+    monkeypatch.setattr("ledger.time.sleep", lambda _: None)
+    sheet = worksheets[BALANCE_SHEET]
+    upsert_daily_balance(sheet, DAY, delta_sales=100.0)
+
+    upsert_daily_balance(_RacingSheet(sheet, races=2), DAY, delta_sales=1.0)
+
+    # Both outside writes survive next to ours
+    assert sheet.get_all_records()[0]["Total Sales"] == 111
+
+
+def test_upsert_retries_when_the_previous_day_changes(monkeypatch, worksheets):
+    monkeypatch.setattr("ledger.time.sleep", lambda _: None)
+    sheet = worksheets[BALANCE_SHEET]
+    upsert_daily_balance(sheet, date(2025, 3, 13), delta_sales=50.0)
+    upsert_daily_balance(sheet, DAY, delta_sales=100.0)
+
+    # The day before is closed again (closing 50 → 55) while we add to today
+    upsert_daily_balance(_RacingSheet(sheet, races=1, column="E", which=1), DAY, delta_sales=1.0)
+
+    today = sheet.get_all_records()[1]
+    assert today["Opening Balance"] == 55
+    assert today["Closing Balance"] == 156
+
+
+def test_upsert_gives_up_when_the_row_keeps_changing(monkeypatch, worksheets):
+    monkeypatch.setattr("ledger.time.sleep", lambda _: None)
+    sheet = worksheets[BALANCE_SHEET]
+    upsert_daily_balance(sheet, DAY, delta_sales=100.0)
+
+    with pytest.raises(LedgerConflictError):
+        upsert_daily_balance(_RacingSheet(sheet, races=100), DAY, delta_sales=1.0)
+
+
+def test_ledger_lock_is_shared_per_key(worksheets):
+    sheet = worksheets[BALANCE_SHEET]
+    assert ledger_lock(sheet, "2025-03-14") is ledger_lock(sheet, "2025-03-14")
+    assert ledger_lock(sheet, "2025-03-14") is not ledger_lock(sheet, "2025-03-15")
+    assert ledger_lock(sheet).path is None
+
+
+_HOLD_LOCK = """
+import sys, time
+sys.path.insert(0, {root!r})
+from ledger import ledger_lock
+from sqlite_sheets import SqliteSpreadsheet
+
+sheet = SqliteSpreadsheet({db!r}).worksheet({title!r})
+with ledger_lock(sheet, "2025-03-14"):
+    print("locked", flush=True)
+    time.sleep(1.0)
+"""
+
+
+def test_ledger_lock_waits_for_another_process(tmp_path, monkeypatch):
+    monkeypatch.setattr("ledger.LOCK_DIR", str(tmp_path / "locks"))
+    db = str(tmp_path / "branch.db")
+    sheet = SqliteSpreadsheet(db).worksheet(BALANCE_SHEET)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    other = subprocess.Popen(
+        [sys.executable, "-c", _HOLD_LOCK.format(root=root, db=db, title=BALANCE_SHEET)],
+        stdout=subprocess.PIPE, env=dict(os.environ, MTC_LOCK_DIR=str(tmp_path / "locks")),
+        text=True,
+    )
+    try:
+        assert other.stdout.readline().strip() == "locked"
+        started = time.perf_counter()
+        # Same sheet, another date → same lock file
+        with ledger_lock(sheet, "2025-03-15"):
+            waited = time.perf_counter() - started
+    finally:
+        other.wait(timeout=10)
+        sheet.spreadsheet.close()
+
+    assert waited > 0.5
+
+
+def test_submission_keys():
+    key = new_submission_key()
+    assert claim_submission(key)
+    assert not claim_submission(key)
+
+    release_submission(key)
+    assert claim_submission(key)
+
+
+@pytest.mark.parametrize("existing", [False, True])
+def test_upsert_validates_both_branches(worksheets, existing):
+    sheet = worksheets[BALANCE_SHEET]
+    if existing:
+        upsert_daily_balance(sheet, DAY, delta_sales=100.0, now_str="2025-03-14 20:00")
+
+    with pytest.raises(SchemaError):
+        upsert_daily_balance(sheet, DAY, delta_sales=1.0, now_str="yesterday evening")
+
+
+def test_upsert_update_encodes_the_timestamp(worksheets):
+    sheet = worksheets[BALANCE_SHEET]
+    upsert_daily_balance(sheet, DAY, delta_sales=100.0, now_str="2025-03-14 20:00")
+    upsert_daily_balance(sheet, DAY, delta_sales=1.0, now_str="14/03/2025 21:15")
+
+    assert sheet.get_all_records()[0]["Entry Timestamp"] == "2025-03-14 21:15"
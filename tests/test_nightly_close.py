@@ -0,0 +1,94 @@
+from datetime import date
+
+from aggregations import AggregationEngine
+from constants import ATTENDANCE_SHEET, BALANCE_SHEET, EXPENSE_SHEET, SALES_SHEET
+from ledger import upsert_daily_balance
+from nightly_close import run_close
+from sheet_cache import SheetCache
+from snapshots import load_snapshot
+
+DAY = date(2025, 3, 14)
+NOW = "2025-03-14 23:55"
+
+
+def _seed(worksheets):
+    worksheets[EXPENSE_SHEET].append_rows([
+        ["2025-03-14 09:30", "Milk", "", 450, "Cash", "RK"],
+        ["2025-03-14 11:00", "Gas", 19, 1800, "UPI", "AR"],     # numeric sub-category
+    ])
+    worksheets[SALES_SHEET].append_rows([
+        ["2025-03-14", "Bigstreet", "Morning", 4200, NOW],
+        ["2025-03-14", "Main", "Full Day", 6100, NOW],
+    ])
+    worksheets[ATTENDANCE_SHEET].append_rows([
+        ["2025-03-14", "Ravi", "✖", "✔", NOW],
+        ["2025-03-14", "Mani", "✔", "✔", NOW],
+    ])
+
+
+def test_close_and_snapshot(tmp_path, worksheets):
+    _seed(worksheets)
+
+    close, _ = run_close(worksheets, DAY, NOW, snapshot_dir=tmp_path, branch="Test")
+
+    assert close["Total Sales"] == 10300
+    assert close["Total Expense"] == 2250
+    assert close["Closing Balance"] == 8050
+
+    snapshot = load_snapshot(directory=tmp_path, branch="Test")
+    assert set(snapshot["frames"]) == {EXPENSE_SHEET, ATTENDANCE_SHEET, SALES_SHEET, BALANCE_SHEET}
+    assert list(snapshot["frames"][EXPENSE_SHEET]["Sub-Category"]) == [
+        "Miscellaneous Expenses", "19"
+    ]
+
+
+class _SubmitDuringClose:
+    """Daily_Balance where a Sales submit lands between the close's reads and its write."""
+
+    def __init__(self, worksheets):
+        self._sheet = worksheets[BALANCE_SHEET]
+        self._sales = worksheets[SALES_SHEET]
+        self.submits = 1
+
+    def __getattr__(self, name):
+        return getattr(self._sheet, name)
+
+    def batch_get(self, ranges, **kwargs):
+        if self.submits:
+            self.submits -= 1
+            self._sales.append_rows([["2025-03-14", "Orders", "Full Day", 500, NOW]])
+            upsert_daily_balance(self._sheet, DAY, delta_sales=500.0, now_str=NOW)
+        return self._sheet.batch_get(ranges, **kwargs)
+
+
+def test_close_rereads_after_a_late_submit(tmp_path, worksheets):
+    _seed(worksheets)
+    upsert_daily_balance(worksheets[BALANCE_SHEET], DAY, delta_sales=10300.0, now_str=NOW)
+    worksheets[BALANCE_SHEET] = _SubmitDuringClose(worksheets)
+
+    close, _ = run_close(worksheets, DAY, NOW, snapshot_dir=tmp_path, branch="Test")
+
+    assert close["Total Sales"] == 10800
+    assert worksheets[BALANCE_SHEET].get_all_records()[0]["Total Sales"] == 10800
+
+
+def test_snapshot_memo_survives_the_first_live_read(tmp_path, worksheets):
+    _seed(worksheets)
+    run_close(worksheets, DAY, NOW, snapshot_dir=tmp_path, branch="Test")
+    snapshot = load_snapshot(directory=tmp_path, branch="Test")
+
+    # The app: memo restored from the snapshot, then frames fetched live
+    engine = AggregationEngine()
+    engine.restore_state(snapshot["engine"])
+    cache = SheetCache(worksheets)
+
+    for name, source, date_col in (
+        (EXPENSE_SHEET, "expenses", "datetime"),
+        (SALES_SHEET, "sales", "date"),
+    ):
+        frame, version = cache.read(name)
+        assert version == engine.version(source)
+        engine.register(source, frame, date_col=date_col, version=version)
+
+    assert snapshot["engine"]["results"]
+    assert set(engine.export_state()["results"]) == set(snapshot["engine"]["results"])
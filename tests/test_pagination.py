@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from pagination import Page, filter_rows, paginate
+
+
+@pytest.fixture
+def day_wise():
+    days = pd.date_range("2025-03-01", periods=40, freq="D").date
+    return pd.DataFrame({
+        "Date": [d for d in days for _ in range(3)],
+        "Store": ["Bigstreet", "Main", "Orders"] * 40,
+        "Cash Total": [(i * 37) % 900 for i in range(120)],
+    })
+
+
+def test_pages_cover_every_row_once(day_wise):
+    seen = []
+    for number in range(1, 6):
+        page_df, page = paginate(day_wise, page=number, page_size=25)
+        seen.extend(page_df.to_dict("records"))
+
+        assert page.pages == 5 and page.total == 120
+        assert page.start == (number - 1) * 25 + 1
+        assert page.end == min(number * 25, 120)
+        assert len(page_df) == page.end - page.start + 1
+
+    assert seen == day_wise.to_dict("records")
+
+
+@pytest.mark.parametrize("number, expected", [(0, 1), (-3, 1), (99, 5), ("2", 2)])
+def test_page_number_is_clamped(day_wise, number, expected):
+    _, page = paginate(day_wise, page=number, page_size=25)
+    assert page.number == expected
+
+
+def test_sort_is_stable(day_wise):
+    page_df, _ = paginate(day_wise, page_size=200, sort_by="Store")
+
+    for _, group in page_df.groupby("Store"):
+        assert list(group["Date"]) == sorted(group["Date"])
+
+    page_df, _ = paginate(day_wise, page_size=200, sort_by="Store", ascending=False)
+    assert page_df["Store"].iloc[0] == "Orders"
+    assert list(page_df[page_df["Store"] == "Orders"]["Date"]) == sorted(day_wise["Date"].unique())
+
+
+def test_groups_are_never_split(day_wise):
+    page_df, page = paginate(
+        day_wise, page=2, page_size=7, sort_by="Date", ascending=False, group_col="Date"
+    )
+
+    assert page.total == 40 and page.pages == 6
+    assert page_df["Date"].nunique() == 7
+    assert len(page_df) == 21
+    assert page_df["Date"].iloc[0] == day_wise["Date"].max() - pd.Timedelta(days=7)
+
+
+def test_search_filters_before_paging(day_wise):
+    page_df, page = paginate(day_wise, page_size=10, search="main", search_cols=["Store"])
+    assert page.total == 40
+    assert set(page_df["Store"]) == {"Main"}
+
+    assert filter_rows(day_wise, "  ").equals(day_wise)
+    _, page = paginate(day_wise, search="nowhere")
+    assert page == Page(1, 1, 0, 1, 0)
+    assert page.label == "No matching rows"
+
+
+def test_label():
+    assert Page(2, 5, 120, 26, 50).label == "26–50 of 120 · page 2/5"
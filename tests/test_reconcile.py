@@ -0,0 +1,109 @@
+import time
+from datetime import date, datetime
+
+import pytest
+
+from constants import BALANCE_SHEET, EXPENSE_SHEET, SALES_SHEET
+from frames import balance_frame, expense_frame, sales_frame
+from ledger import rebuild_balance_table, write_balance_table
+from local_sheets import LocalAPIError, LocalSpreadsheet
+from reconcile import audit, reconcile_worksheets
+from sheets import open_worksheets
+from storage import copy_sheet
+
+NOW = "2025-03-20 23:00"
+
+
+def _frames(worksheets):
+    return (
+        sales_frame(worksheets[SALES_SHEET].get_all_records()),
+        expense_frame(worksheets[EXPENSE_SHEET].get_all_records()),
+        balance_frame(worksheets[BALANCE_SHEET].get_all_records()),
+    )
+
+
+def _seed(worksheets, sales_rows, expense_rows, days):
+    worksheets[SALES_SHEET].append_rows(
+        sales_rows(days, start=date(2015, 1, 1), stores=(("Main", "Full Day"),))
+    )
+    worksheets[EXPENSE_SHEET].append_rows(
+        expense_rows([400 + d % 90 for d in range(days)], start=datetime(2015, 1, 1, 10, 0))
+    )
+
+    sales_df, expense_df, _ = _frames(worksheets)
+    table = rebuild_balance_table(sales_df, expense_df)
+    write_balance_table(worksheets[BALANCE_SHEET], table, now_str="2015-01-01 22:00")
+
+
+def test_consistent_ledger_is_clean(worksheets, sales_rows, expense_rows):
+    _seed(worksheets, sales_rows, expense_rows, 30)
+    result = audit(*_frames(worksheets))
+    assert result.clean and result.days == 30
+
+
+def test_drift_is_found_and_corrected(worksheets, sales_rows, expense_rows):
+    _seed(worksheets, sales_rows, expense_rows, 60)
+    balance = worksheets[BALANCE_SHEET]
+
+    # Backdated expense that never cascaded + a hand-edited closing
+    worksheets[EXPENSE_SHEET].append_rows(
+        expense_rows([1200], start=datetime(2015, 1, 10, 18, 0), category="Gas", by="AR")
+    )
+    balance.update("E40", [[1.0]])
+    # Duplicate row for a day that already has one
+    balance.append_rows([balance.get_values("A5:F5")[0]])
+
+    result = audit(*_frames(worksheets))
+    assert not result.clean
+    assert result.duplicates == 1
+    assert result.differences["date"].min().date() == date(2015, 1, 10)
+    assert set(result.differences["Column"]) >= {"Total Expense", "Closing Balance", "Opening Balance"}
+
+    applied = reconcile_worksheets(worksheets, NOW, apply=True)
+    assert applied.days_off == result.days_off
+
+    after = audit(*_frames(worksheets))
+    assert after.clean
+    assert balance.row_count == 61
+
+    # Unchanged days keep their timestamp, corrected ones are restamped
+    records = balance.get_all_records()
+    assert records[0]["Entry Timestamp"] == "2015-01-01 22:00"
+    assert records[9]["Entry Timestamp"] == NOW
+
+
+def test_ten_year_ledger(worksheets, sales_rows, expense_rows):
+    _seed(worksheets, sales_rows, expense_rows, 3650)
+    worksheets[SALES_SHEET].append_rows(
+        sales_rows(1, start=date(2016, 6, 1), stores=(("Orders", "Full Day"),))
+    )
+
+    frames = _frames(worksheets)
+    started = time.perf_counter()
+    result = audit(*frames)
+    elapsed = time.perf_counter() - started
+
+    assert result.days == 3650
+    assert result.differences["date"].min().date() == date(2016, 6, 1)
+    assert elapsed < 5.0        # ~0.1s here; generous for slow runners
+
+    reconcile_worksheets(worksheets, NOW, apply=True)
+    assert audit(*_frames(worksheets)).clean
+
+
+def test_table_larger_than_the_sheet_grid(worksheets, sales_rows, expense_rows):
+    # A new Google sheet has 1,000 rows; range writes past them fail
+    grid = open_worksheets(LocalSpreadsheet.with_default_layout(grid_rows=1000))
+    with pytest.raises(LocalAPIError, match="exceeds grid limits"):
+        grid[SALES_SHEET].update("A1001", [["2015-01-01"]])
+
+    _seed(grid, sales_rows, expense_rows, 1500)
+    assert grid[BALANCE_SHEET].row_count == 1501
+    assert audit(*_frames(grid)).days == 1500
+
+    # Mirroring the same sheets into a fresh spreadsheet grows it as well
+    _seed(worksheets, sales_rows, expense_rows, 1500)
+    mirror = open_worksheets(LocalSpreadsheet.with_default_layout(grid_rows=1000))
+    for name in (SALES_SHEET, BALANCE_SHEET):
+        copy_sheet(worksheets[name], mirror[name])
+        assert mirror[name].get_all_values() == worksheets[name].get_all_values()
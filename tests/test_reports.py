@@ -0,0 +1,93 @@
+import io
+import re
+from datetime import date
+
+import pytest
+from openpyxl import load_workbook
+
+from aggregations import AggregationEngine
+from constants import ATTENDANCE_SHEET, EXPENSE_SHEET, SALES_SHEET
+from reports import PDF_ROWS_PER_PAGE, report_tables, to_excel, to_pdf
+
+
+@pytest.fixture
+def frames(make_frame, sales_rows, expense_rows, attendance_rows):
+    return {
+        "sales": make_frame(SALES_SHEET, sales_rows(75, start=date(2025, 1, 1))),
+        "expenses": make_frame(EXPENSE_SHEET, (
+            expense_rows([400 + i for i in range(75)])
+            + expense_rows([1800] * 10, category="Gas", by="AR")
+        )),
+        "attendance": make_frame(ATTENDANCE_SHEET, attendance_rows(75, start=date(2025, 1, 1))),
+    }
+
+
+@pytest.fixture
+def engine(frames):
+    engine = AggregationEngine()
+    engine.register("sales", frames["sales"], date_col="date")
+    engine.register("expenses", frames["expenses"], date_col="datetime")
+    return engine
+
+
+def test_tables_match_the_period(engine, frames):
+    tables = report_tables(engine, frames["attendance"], 2025, 3)
+
+    sales = frames["sales"][frames["sales"]["date"].dt.month == 3]
+    expenses = frames["expenses"][frames["expenses"]["datetime"].dt.month == 3]
+
+    summary = tables["Summary"].set_index("Metric")["Value"]
+    assert summary["Period"] == "March 2025"
+    assert summary["Total Sales"] == pytest.approx(sales["Cash Total"].sum())
+    assert summary["Total Expense"] == pytest.approx(expenses["Expense Amount"].sum())
+
+    assert list(tables) == [
+        "Summary", "Category", "Payment Mode", "Expense By", "Store",
+        "Day-wise Profit", "Leave Days",
+    ]
+    assert tables["Category"].set_index("Category")["Expense Amount"].to_dict() == (
+        expenses.groupby("Category", observed=True)["Expense Amount"].sum().to_dict()
+    )
+
+    daily = tables["Day-wise Profit"]
+    assert len(daily) == 31         # sales stop on Mar 16, expenses run all month
+    assert daily["Profit / Loss"].sum() == pytest.approx(
+        sales["Cash Total"].sum() - expenses["Expense Amount"].sum()
+    )
+
+    attendance = frames["attendance"]
+    march = attendance[attendance["month"] == 3]
+    assert tables["Leave Days"]["Leave Days"].sum() == march["leave_days"].sum()
+
+
+def test_year_report_without_expenses(frames):
+    engine = AggregationEngine()
+    engine.register("sales", frames["sales"], date_col="date")
+
+    tables = report_tables(engine, None, 2025)
+    assert list(tables) == ["Summary", "Store", "Day-wise Profit"]
+    assert tables["Summary"].set_index("Metric")["Value"]["Total Expense"] == 0
+    assert len(tables["Day-wise Profit"]) == 75
+
+
+def test_excel_has_one_sheet_per_table(engine, frames):
+    tables = report_tables(engine, frames["attendance"], 2025)
+    workbook = load_workbook(io.BytesIO(to_excel(tables)))
+
+    assert workbook.sheetnames == list(tables)
+    for title, df in tables.items():
+        rows = list(workbook[title].iter_rows(values_only=True))
+        assert list(rows[0]) == list(df.columns)
+        assert len(rows) == len(df) + 1
+
+
+def test_pdf_pages_long_tables(engine, frames):
+    tables = report_tables(engine, frames["attendance"], 2025)
+    pdf = to_pdf(tables, "Monisha Tiffin Center – 2025")
+
+    assert pdf.startswith(b"%PDF")
+    pages = sum(
+        max(1, -(-len(df) // PDF_ROWS_PER_PAGE)) for df in tables.values()
+    )
+    assert len(re.findall(rb"/Type\s*/Page\b", pdf)) == pages
+    assert pages > len(tables)      # 75 days of profit span several pages
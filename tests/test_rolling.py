@@ -0,0 +1,88 @@
+import math
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from constants import SALES_SHEET
+from rolling import WINDOWS, RollingStats
+
+
+@pytest.fixture
+def rows(sales_rows):
+    return sales_rows(200, missing=0.1)
+
+
+@pytest.fixture
+def frame_of(make_frame):
+    return lambda rows: make_frame(SALES_SHEET, rows)
+
+
+def _check(stats, frame):
+    as_of = frame["date"].max()
+    table = stats.stats("sales").set_index(["Dimension", "Key", "Window"])
+
+    for dim, key, subset in (
+        ("Total", "All Stores", frame),
+        ("Store", "Main", frame[frame["Store"] == "Main"]),
+    ):
+        daily = subset.groupby(subset["date"].dt.normalize())["Cash Total"].sum()
+        first = daily.index.min()
+        for w in WINDOWS:
+            days = max(1, min(w, (as_of - first).days + 1))
+            window = daily[daily.index > as_of - pd.Timedelta(days=w)]
+            values = window.reindex(
+                pd.date_range(as_of - pd.Timedelta(days=days - 1), as_of), fill_value=0.0
+            )
+            row = table.loc[(dim, key, f"{w} days")]
+            assert row["Sum"] == pytest.approx(values.sum(), abs=0.01)
+            assert row["Mean"] == pytest.approx(values.mean(), abs=0.01)
+            sd = values.std() if days > 1 else 0.0
+            assert row["Std Dev"] == pytest.approx(sd, abs=0.01)
+
+
+def test_windows_match_brute_force(rows, frame_of):
+    stats = RollingStats()
+    stats.sync("sales", frame_of(rows), "v1")
+    _check(stats, frame_of(rows))
+
+
+def test_appends_match_a_rebuild(rows, frame_of):
+    stats = RollingStats()
+    stats.sync("sales", frame_of(rows[:150]), "v1")
+
+    # Row-by-row growth, crossing several days
+    for i, n in enumerate(range(152, len(rows) + 1, 7)):
+        stats.sync("sales", frame_of(rows[:n]), f"v{i + 2}")
+    stats.sync("sales", frame_of(rows), "last")
+
+    _check(stats, frame_of(rows))
+
+
+def test_overwrite_rebuilds(sales_rows, frame_of):
+    rows = sales_rows(120, missing=0.1)
+    stats = RollingStats()
+    stats.sync("sales", frame_of(rows), "v1")
+
+    # Sales overwrite: old row deleted, corrected row appended
+    edited = rows[:10] + rows[11:] + [rows[10][:3] + [99999, ""]]
+    stats.sync("sales", frame_of(edited), "v2")
+    _check(stats, frame_of(edited))
+
+
+def test_forecast_is_memoized_until_the_data_changes(sales_rows, frame_of):
+    rows = sales_rows(100, missing=0.1)
+    stats = RollingStats()
+    stats.sync("sales", frame_of(rows), "v1")
+
+    first = stats.forecast("sales")
+    total = first.set_index(["Dimension", "Key"]).loc[("Total", "All Stores")]
+    assert total["Next Day Low"] <= total["Next Day"] <= total["Next Day High"]
+    assert total["Next Week"] == pytest.approx(7 * total["Next Day"], abs=0.1)
+
+    assert stats.forecast("sales").equals(first)
+    spike = sales_rows(1, start=date(2025, 4, 11), stores=(("Main", "Full Day"),))
+    spike[0][3] = 50000
+    stats.sync("sales", frame_of(rows + spike), "v2")
+    assert not stats.forecast("sales").equals(first)
+    assert not math.isnan(stats.forecast("sales")["Next Day"].sum())
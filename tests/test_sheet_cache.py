@@ -0,0 +1,35 @@
+from constants import BALANCE_SHEET
+from sheet_cache import SheetCache, TailProbe
+
+
+def _balance_rows(days):
+    return [
+        [f"2025-01-{day:02d}", 0, 100, 40, 60 * day, f"2025-01-{day:02d} 22:00"]
+        for day in range(1, days + 1)
+    ]
+
+
+def test_invalidate_refetches_with_probe(spreadsheet, worksheets):
+    worksheets[BALANCE_SHEET].append_rows(_balance_rows(20))
+    cache = SheetCache(worksheets, probe=TailProbe(spreadsheet, worksheets))
+    cache.poll()
+
+    # Backdated upsert: row 3 is far above the probed tail
+    worksheets[BALANCE_SHEET].update("C3:F3", [[500, 40, 520, "2025-02-01 10:00"]])
+    assert cache.poll() == []
+
+    cache.invalidate(BALANCE_SHEET)
+    assert cache.poll() == [BALANCE_SHEET]
+
+    frame, _ = cache.read(BALANCE_SHEET)
+    assert frame.loc[1, "Total Sales"] == 500
+    assert cache.poll() == []
+
+
+def test_probe_detects_appends_outside_the_app(spreadsheet, worksheets):
+    worksheets[BALANCE_SHEET].append_rows(_balance_rows(3))
+    cache = SheetCache(worksheets, probe=TailProbe(spreadsheet, worksheets))
+    cache.poll()
+
+    worksheets[BALANCE_SHEET].append_rows([["2025-01-04", 0, 1, 1, 0, ""]])
+    assert cache.poll() == [BALANCE_SHEET]
@@ -0,0 +1,48 @@
+import pytest
+
+from constants import SALES_SHEET, SHEET_HEADERS
+from local_sheets import LocalSpreadsheet
+from sheet_protocol import parse_a1, trim_range
+from sqlite_sheets import SqliteSpreadsheet
+
+ROWS = [
+    ["2025-03-14", "Bigstreet", "Morning", 4200, ""],
+    ["2025-03-14", "Main", "Full Day", 6100, "2025-03-14 21:00"],
+    ["2025-03-15", "Orders", "Full Day", 900, ""],
+]
+
+
+def test_parse_a1():
+    assert parse_a1("'Daily_Balance'!C12:F12") == ("Daily_Balance", 12, 3, 12, 6)
+    assert parse_a1("A2:B") == (None, 2, 1, None, 2)
+    assert parse_a1("'It''s'!5:7") == ("It's", 5, None, 7, None)
+    with pytest.raises(ValueError):
+        parse_a1("A1:B2:C3")
+
+
+def test_trim_range():
+    assert trim_range([["a", "", ""], ["", ""], []], 1, None) == [["a"]]
+    assert trim_range([["a", "b", "c"]], 2, 2) == [["b"]]
+
+
+@pytest.fixture(params=["local", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "local":
+        spreadsheet = LocalSpreadsheet.with_default_layout()
+    else:
+        spreadsheet = SqliteSpreadsheet(str(tmp_path / "branch.db"), title="MTC-Digitization")
+    spreadsheet.worksheet(SALES_SHEET).append_rows(ROWS)
+    return spreadsheet
+
+
+def test_backends_read_ranges_alike(backend):
+    sales = backend.worksheet(SALES_SHEET)
+
+    assert sales.get_values("A1:E1") == [SHEET_HEADERS[SALES_SHEET]]
+    assert sales.get_values("B2:D3") == [["Bigstreet", "Morning", 4200], ["Main", "Full Day", 6100]]
+    assert sales.get_values("A4:E9") == [["2025-03-15", "Orders", "Full Day", 900]]
+
+    response = backend.values_batch_get(["'Sales'!3:5", "'Daily_Balance'!2:3"])
+    assert response["spreadsheetId"] == "MTC-Digitization"
+    assert response["valueRanges"][0]["values"] == [ROWS[1], ROWS[2][:4]]
+    assert "values" not in response["valueRanges"][1]
@@ -0,0 +1,110 @@
+import time
+from datetime import date
+
+import pytest
+
+from constants import SALES_SHEET
+from local_sheets import LocalSpreadsheet
+from sqlite_sheets import SqliteSpreadsheet
+from storage import SheetsSync, find_rows, open_sqlite_branch_set, start_sheets_sync
+
+STORES = (("Bigstreet", "Morning"), ("Bigstreet", "Night"), ("Main", "Full Day"))
+
+
+@pytest.fixture
+def sqlite_spreadsheet(tmp_path):
+    spreadsheet = SqliteSpreadsheet(str(tmp_path / "branch.db"), title="MTC-Digitization")
+    yield spreadsheet
+    spreadsheet.close()
+
+
+def test_find_rows_matches_a_full_scan(sqlite_spreadsheet, sales_rows):
+    rows = sales_rows(40, start=date(2010, 1, 1), stores=STORES)
+    local = LocalSpreadsheet.with_default_layout()
+    for spreadsheet in (sqlite_spreadsheet, local):
+        sales = spreadsheet.worksheet(SALES_SHEET)
+        sales.append_rows(rows)
+        # Deletes renumber the SQLite rows below them
+        sales.delete_rows(5, 9)
+        sales.delete_rows(30)
+
+    indexed = sqlite_spreadsheet.worksheet(SALES_SHEET)
+    scanned = local.worksheet(SALES_SHEET)
+    day = rows[3 * 19][0]
+
+    for criteria in (
+        {"Date": day},
+        {"Date": day, "Store": "Bigstreet"},
+        {"Date": (rows[3][0], rows[6][0], "1999-01-01"), "Store": "Bigstreet"},
+        {"Date": day, "Store": "Main", "Slot": "Full Day"},
+        {"Date": "1999-01-01"},
+    ):
+        assert indexed.find_rows(**criteria) == find_rows(scanned, **criteria)
+
+    # Row numbers point at the same rows get_values / update / delete use
+    for idx, values in indexed.find_rows(Date=day):
+        assert indexed.get_values(f"A{idx}:E{idx}") == [values[:4]]
+
+
+def test_find_rows_uses_an_index(sqlite_spreadsheet):
+    conn = sqlite_spreadsheet._conn
+    plan = " ".join(
+        str(r[-1]) for r in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT _row FROM "Sales" WHERE "Date" IN (?) AND "Store" IN (?)',
+            ("2010-01-20", "Main")
+        )
+    )
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan
+
+
+def test_find_rows_on_60k_rows(sqlite_spreadsheet, sales_rows):
+    rows = sales_rows(20_000, start=date(1970, 1, 1), stores=STORES)
+    sales = sqlite_spreadsheet.worksheet(SALES_SHEET)
+    sales.append_rows(rows)
+    # Early deletes shift every later row; lookups stay index-only
+    sales.delete_rows(2, 4)
+    rows = rows[3:]
+    assert sales.row_count == 59_998
+
+    started = time.perf_counter()
+    for offset in range(0, 19_999, 1000):
+        found = sales.find_rows(Date=rows[3 * offset][0], Store="Bigstreet")
+        assert [idx for idx, _ in found] == [3 * offset + 2, 3 * offset + 3]
+    elapsed = (time.perf_counter() - started) / 20
+
+    assert elapsed < 0.25       # a few ms here; generous for slow runners
+
+
+def test_sync_opens_sheets_lazily_and_reports_errors(tmp_path, monkeypatch, sales_rows):
+    def offline(*args):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr("storage.open_spreadsheet", offline)
+    branch_set = open_sqlite_branch_set(str(tmp_path), {"Main": "MTC"}, probe=False)
+    secrets = {"storage": {"backend": "sqlite", "sync_to_sheets": True}, "gcp_service_account": {}}
+
+    # Starting offline does not raise; the thread records the failure
+    thread = start_sheets_sync(secrets, {"Main": "MTC"}, branch_set)["Main"]
+    deadline = time.perf_counter() + 5
+    while thread.error is None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    thread.stop()
+    assert thread.error == "open: no network"
+
+    remote = LocalSpreadsheet.with_default_layout()
+    attempts = []
+
+    def open_remote():
+        attempts.append(1)
+        if len(attempts) == 1:
+            offline()
+        return {ws.title: ws for ws in remote.worksheets()}
+
+    local = branch_set.worksheets["Main"]
+    local[SALES_SHEET].append_rows(sales_rows(3))
+    sync = SheetsSync(local, open_remote)
+
+    assert sync.push() == [] and sync.error == "open: no network"
+    assert SALES_SHEET in sync.push()
+    assert sync.error is None and sync.synced_at is not None
+    assert remote.worksheet(SALES_SHEET).get_all_values() == local[SALES_SHEET].get_all_values()